@@ -0,0 +1,124 @@
+"""
+Bytes on the wire and encoding time for /api/calculate and batch responses.
+
+Compares the previous jsonify output (standard library json, sorted keys,
+compact separators) with orjson and MessagePack, each uncompressed, gzip'ed
+and brotli-compressed, for single plans with inline, linked and omitted
+blueprints and for a batch as records and as columns:
+
+    python benchmarks/bench_encoding.py --batch-size 1000 --runs 20
+
+Encoders whose package is not installed are skipped.
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('RESULT_CACHE_SIZE', '0')
+os.environ.setdefault('PROJECT_DB_PATH', '')
+
+import encoding
+from config import Config
+from main import build_plan, estimation_engine
+from preprocessing import DataPreprocessor
+from utils import generate_project_id, get_current_timestamp
+
+
+def stdlib_json(payload):
+    # What jsonify produced before FastJSONProvider
+    return (json.dumps(payload, sort_keys=True, separators=(",", ":")) + "\n").encode()
+
+
+def encoders():
+    available = [("json", stdlib_json)]
+    if encoding.orjson is not None:
+        options = encoding.orjson.OPT_SORT_KEYS | encoding.orjson.OPT_SERIALIZE_NUMPY
+        available.append(("orjson", lambda payload: encoding.orjson.dumps(payload, option=options) + b"\n"))
+    if encoding.msgpack is not None:
+        available.append(("msgpack", lambda payload: encoding.msgpack.packb(payload, use_bin_type=True)))
+    return available
+
+
+def compressors():
+    available = [("identity", lambda data: data), ("gzip", lambda data: gzip.compress(data, compresslevel=Config.GZIP_LEVEL, mtime=0))]
+    if encoding.brotli is not None:
+        available.append(("br", lambda data: encoding.brotli.compress(data, quality=Config.BROTLI_QUALITY)))
+    return available
+
+
+def plan_response(blueprint_mode):
+    inputs = DataPreprocessor.normalize_project({"built_up_area": 1000, "floors": "G+2"})
+    return {
+        "status": "success",
+        "project_id": generate_project_id(),
+        "timestamp": get_current_timestamp(),
+        **build_plan(inputs, blueprint_mode=blueprint_mode)
+    }
+
+
+def batch_response(size, layout):
+    projects = [{"built_up_area": 150 + (i * 37) % 950, "floors": f"G+{(i * 7) % 10}"} for i in range(size)]
+    inputs = estimation_engine.normalize(projects)
+    columns = estimation_engine.to_columns(inputs, estimation_engine.estimate(inputs))
+    response = {"status": "success", "timestamp": get_current_timestamp(), "count": size}
+    if layout == "records":
+        response["results"] = estimation_engine.to_records(columns)
+    else:
+        response["columns"] = columns
+    return response
+
+
+def timed(fn, arg, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn(arg)
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return result, samples[len(samples) // 2] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response encodings and compression")
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--output', help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    payloads = [
+        ("plan, inline svg", plan_response("inline")),
+        ("plan, svg url", plan_response("url")),
+        ("plan, no blueprint", plan_response("none")),
+        (f"batch {args.batch_size}, records", batch_response(args.batch_size, "records")),
+        (f"batch {args.batch_size}, columns", batch_response(args.batch_size, "columns"))
+    ]
+
+    results = []
+    print(f"{'payload':<24} {'encoder':<8} {'compression':<11} {'bytes':>10} {'vs json':>8} {'encode ms':>10} {'compress ms':>12}")
+    for label, payload in payloads:
+        baseline = None
+        for encoder_name, encode in encoders():
+            body, encode_ms = timed(encode, payload, args.runs)
+            for compressor_name, compress in compressors():
+                wire, compress_ms = timed(compress, body, args.runs)
+                if baseline is None:
+                    baseline = len(wire)
+                results.append({
+                    "payload": label, "encoder": encoder_name, "compression": compressor_name,
+                    "bytes": len(wire), "encode_ms": encode_ms, "compress_ms": compress_ms
+                })
+                print(f"{label:<24} {encoder_name:<8} {compressor_name:<11} {len(wire):>10} "
+                      f"{len(wire) / baseline:>8.1%} {encode_ms:>10.3f} {compress_ms:>12.3f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
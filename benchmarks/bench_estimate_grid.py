@@ -0,0 +1,125 @@
+"""
+Latency of live-preview estimates from the precomputed grid (estimate_grid).
+
+Compares, for random whole-sq-yard projects:
+
+- grid lookup vs the full schedule -> resource -> cost computation
+- GET /api/estimate/preview answered from the grid vs computed
+- POST /api/calculate (what the form submits, without AI)
+
+and reports grid build, save and load times:
+
+    python benchmarks/bench_estimate_grid.py --requests 2000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('RESULT_CACHE_SIZE', '0')
+os.environ.setdefault('PROJECT_DB_PATH', '')
+os.environ.setdefault('RATE_LIMIT_PER_SECOND', '0')
+
+import numpy as np
+
+from config import Config
+from estimate_grid import EstimateGrid, compute_preview
+from main import app
+
+
+def percentiles(samples):
+    values = np.array(samples) * 1e6
+    return {
+        "p50_us": round(float(np.percentile(values, 50)), 1),
+        "p95_us": round(float(np.percentile(values, 95)), 1),
+        "p99_us": round(float(np.percentile(values, 99)), 1)
+    }
+
+
+def timed(fn, items):
+    samples = []
+    for item in items:
+        started = time.perf_counter()
+        fn(item)
+        samples.append(time.perf_counter() - started)
+    return percentiles(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark grid-backed estimate previews")
+    parser.add_argument('--calls', type=int, default=50000, help="direct lookups/computations")
+    parser.add_argument('--requests', type=int, default=2000, help="HTTP requests per endpoint")
+    parser.add_argument('--output', help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    grid = EstimateGrid.build()
+    build_ms = (time.perf_counter() - started) * 1000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "grid.npz")
+        started = time.perf_counter()
+        grid.save(path)
+        save_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        EstimateGrid.load(path)
+        load_ms = (time.perf_counter() - started) * 1000
+
+    rng = np.random.default_rng(3)
+    projects = [
+        {"area": float(area), "floors": f"G+{floors}", "daily_wage": float(wage), "cost_per_sq_yard": float(rate), "user_days": None}
+        for area, floors, wage, rate in zip(
+            rng.integers(50, 10001, args.calls), rng.integers(0, grid.max_floors, args.calls),
+            rng.integers(300, 1200, args.calls), rng.integers(800, 4000, args.calls)
+        )
+    ]
+    # Warm both paths before timing
+    for project in projects[:1000]:
+        grid.lookup(project)
+        compute_preview(project)
+
+    results = {
+        "grid": {**grid.stats(), "build_ms": round(build_ms, 1), "save_ms": round(save_ms, 1), "load_ms": round(load_ms, 1)},
+        "direct": {
+            "grid_lookup": timed(grid.lookup, projects),
+            "full_computation": timed(compute_preview, projects)
+        }
+    }
+
+    client = app.test_client()
+    queries = [
+        {"built_up_area": int(p["area"]), "floors": p["floors"],
+         "daily_wage_per_worker": int(p["daily_wage"]), "cost_per_sq_yard": int(p["cost_per_sq_yard"])}
+        for p in projects[:args.requests]
+    ]
+
+    def preview(query):
+        client.get('/api/estimate/preview', query_string=query)
+
+    def calculate(query):
+        client.post('/api/calculate', json=query)
+
+    enabled = Config.ESTIMATE_GRID
+    try:
+        Config.ESTIMATE_GRID = True
+        preview(queries[0])
+        http = {"preview_grid": timed(preview, queries)}
+        Config.ESTIMATE_GRID = False
+        http["preview_computed"] = timed(preview, queries)
+    finally:
+        Config.ESTIMATE_GRID = enabled
+    calculate(queries[0])
+    http["calculate"] = timed(calculate, queries)
+    results["http"] = http
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+"""
+Latency benchmark for each stage of the /api/calculate pipeline.
+
+Reports p50/p95/p99 latency and throughput per stage and can write the
+results as JSON, so runs from two commits can be compared:
+
+    python benchmarks/bench_pipeline.py --output before.json
+    python benchmarks/bench_pipeline.py --compare before.json --threshold 0.15
+
+--compare exits with status 1 if any stage's p50 or p95 got slower than the
+threshold allows. The LLM is stubbed and the result cache is disabled, so the
+end-to-end numbers measure this service alone.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('RESULT_CACHE_SIZE', '0')
+os.environ.setdefault('RATE_LIMIT_PER_SECOND', '0')
+os.environ.setdefault('PROJECT_DB_PATH', '')
+os.environ.setdefault('INSIGHT_CACHE_PATH', '')
+
+from preprocessing import DataPreprocessor
+from schedule_service import ScheduleService
+from resource_service import ResourceService
+from cost_service import CostService
+from ai_service import AIService
+import blueprint_renderer
+
+
+PAYLOADS = [
+    {"built_up_area": 100, "floors": "G+0"},
+    {"built_up_area": "200", "floors": "2", "daily_wage_per_worker": 550},
+    {"built_up_area": 1000, "floors": "G+2", "cost_per_sq_yard": 1800, "construction_days": 240},
+    {"built_up_area": 4500.5, "floors": "g + 4", "daily_wage_per_worker": "700"},
+    {"built_up_area": 12000, "floors": "G+9", "cost_per_sq_yard": 2500}
+]
+
+
+class StubLLM:
+    """Answers instantly so the LLM round trip is excluded from the numbers."""
+    url = "stub://ollama"
+
+    def generate(self, prompt, timeout=30, model=None):
+        return "stubbed"
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(fn, iterations, warmup):
+    """Calls fn() repeatedly and returns latency stats in microseconds."""
+    for i in range(warmup):
+        fn(i)
+    samples = []
+    clock = time.perf_counter_ns
+    for i in range(iterations):
+        started = clock()
+        fn(i)
+        samples.append(clock() - started)
+    samples.sort()
+    total_seconds = sum(samples) / 1e9
+    return {
+        "iterations": iterations,
+        "p50_us": percentile(samples, 0.50) / 1000,
+        "p95_us": percentile(samples, 0.95) / 1000,
+        "p99_us": percentile(samples, 0.99) / 1000,
+        "mean_us": sum(samples) / len(samples) / 1000,
+        "throughput_per_s": iterations / total_seconds if total_seconds else 0.0
+    }
+
+
+def build_stages():
+    schedule_service = ScheduleService()
+    resource_service = ResourceService()
+    cost_service = CostService()
+    ai_service = AIService(llm_client=StubLLM())
+
+    inputs = [DataPreprocessor.normalize_project(p) for p in PAYLOADS]
+    schedules = [schedule_service.generate_schedule(i['area'], i['floors'], i['user_days']) for i in inputs]
+    labors = [resource_service.calculate_labor(i['area'], s['duration_days']) for i, s in zip(inputs, schedules)]
+
+    def pick(items, n):
+        return items[n % len(items)]
+
+    def render_cold(n):
+        blueprint_renderer._render_floor.cache_clear()
+        blueprint_renderer._render_floor_data_uri.cache_clear()
+        i = pick(inputs, n)
+        ai_service._generate_procedural_svg(i['floors'], i['area'])
+
+    def render_warm(n):
+        i = pick(inputs, n)
+        ai_service._generate_procedural_svg(i['floors'], i['area'])
+
+    stages = {
+        "preprocessing": lambda n: DataPreprocessor.normalize_project(pick(PAYLOADS, n)),
+        "schedule": lambda n: schedule_service.generate_schedule(
+            pick(inputs, n)['area'], pick(inputs, n)['floors'], pick(inputs, n)['user_days']
+        ),
+        "materials": lambda n: resource_service.calculate_materials(pick(inputs, n)['area'], pick(inputs, n)['floors']),
+        "labor": lambda n: resource_service.calculate_labor(pick(inputs, n)['area'], pick(schedules, n)['duration_days']),
+        "costs": lambda n: cost_service.calculate_costs(
+            pick(inputs, n)['area'], pick(inputs, n)['cost_per_sq_yard'],
+            pick(labors, n)['total_labor_days'], pick(inputs, n)['daily_wage']
+        ),
+        "svg_render_cold": render_cold,
+        "svg_render_warm": render_warm
+    }
+
+    try:
+        import main
+    except ImportError as e:
+        print(f"Skipping Flask stages ({e})")
+        return stages
+
+    main.ai_service.llm = StubLLM()
+    with main.app.app_context():
+        sample = main.build_plan(inputs[2])
+    response_body = {"status": "success", "project_id": "CONST-BENCH000", "timestamp": "", **sample}
+
+    def serialize(n):
+        with main.app.app_context():
+            main.jsonify(response_body).get_data()
+
+    client = main.app.test_client()
+
+    stages["json_dumps"] = lambda n: json.dumps(response_body)
+    stages["jsonify"] = serialize
+    stages["end_to_end"] = lambda n: client.post('/api/calculate', json=pick(PAYLOADS, n))
+    return stages
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline, threshold):
+    """Prints the change per stage and returns the stages that regressed."""
+    regressions = []
+    print(f"\n{'stage':<18} {'p50 before':>11} {'p50 now':>10} {'change':>8} {'p95 change':>11}")
+    for name, stats in current["stages"].items():
+        old = baseline["stages"].get(name)
+        if not old:
+            continue
+        p50_change = stats["p50_us"] / old["p50_us"] - 1 if old["p50_us"] else 0.0
+        p95_change = stats["p95_us"] / old["p95_us"] - 1 if old["p95_us"] else 0.0
+        flag = ""
+        if p50_change > threshold or p95_change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<18} {old['p50_us']:>11.1f} {stats['p50_us']:>10.1f} "
+              f"{p50_change:>+8.1%} {p95_change:>+11.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the planning pipeline stage by stage")
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--warmup', type=int, default=200)
+    parser.add_argument('--stages', help="comma-separated subset of stages to run")
+    parser.add_argument('--output', help="write results as JSON to this file")
+    parser.add_argument('--compare', help="baseline JSON from an earlier run")
+    parser.add_argument('--threshold', type=float, default=0.10, help="allowed slowdown, e.g. 0.10 for 10%%")
+    args = parser.parse_args()
+
+    stages = build_stages()
+    selected = args.stages.split(",") if args.stages else list(stages)
+
+    results = {
+        "benchmark": "pipeline",
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "stages": {}
+    }
+
+    print(f"{'stage':<18} {'p50 us':>9} {'p95 us':>9} {'p99 us':>9} {'ops/s':>12}")
+    for name in selected:
+        stats = measure(stages[name], args.iterations, args.warmup)
+        results["stages"][name] = stats
+        print(f"{name:<18} {stats['p50_us']:>9.1f} {stats['p95_us']:>9.1f} "
+              f"{stats['p99_us']:>9.1f} {stats['throughput_per_s']:>12,.0f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nRegressed beyond {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Open time and lookup cost of a rate history file (rate_history.RateHistory).
+
+Writes a synthetic multi-region history, then times opening it in a fresh
+process, a single-project lookup and batched phase lookups:
+
+    python benchmarks/bench_rate_history.py --regions 200 --years 20
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from rate_history import RateHistory, synthesize
+
+
+OPEN_SNIPPET = (
+    "import time, sys; sys.path.insert(0, {root!r}); import rate_history; "
+    "t = time.perf_counter(); rate_history.RateHistory({path!r}); print(time.perf_counter() - t)"
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark rate history open and lookup cost")
+    parser.add_argument('--regions', type=int, default=100)
+    parser.add_argument('--years', type=float, default=10)
+    parser.add_argument('--batch', type=int, default=100000)
+    parser.add_argument('--runs', type=int, default=1000)
+    parser.add_argument('--output', help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "history.bin")
+        synthesize(path, args.regions, args.years)
+        size = os.path.getsize(path)
+
+        # Open in a fresh process, so nothing is in this process's caches
+        output = subprocess.check_output([sys.executable, "-c", OPEN_SNIPPET.format(root=ROOT, path=path)])
+        open_ms = float(output) * 1000
+
+        history = RateHistory(path)
+        started = time.perf_counter()
+        for i in range(args.runs):
+            history.effective_rates("2023-03-01", 120 + i % 400, history.regions[i % len(history.regions)])
+        single_us = (time.perf_counter() - started) / args.runs * 1e6
+
+        rng = np.random.default_rng(1)
+        start_days = rng.integers(0, history.days, args.batch)
+        durations = rng.integers(60, 720, args.batch)
+        regions = rng.integers(0, len(history.regions), args.batch)
+        started = time.perf_counter()
+        RateHistory.weighted_rates(history.phase_rates(start_days, durations, regions))
+        batch_us = (time.perf_counter() - started) / args.batch * 1e6
+
+    results = {
+        "regions": args.regions,
+        "days": history.days,
+        "file_mb": round(size / 1e6, 1),
+        "open_ms": round(open_ms, 3),
+        "single_project_us": round(single_us, 1),
+        "batched_us_per_project": round(batch_us, 2)
+    }
+    for name, value in results.items():
+        print(f"{name:>24}: {value}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Scaling benchmark for the activity scheduler (scheduler.ScheduleEngine).
+
+Times network build, critical path and resource leveling for portfolios of
+increasing size, with per-building crews and with one shared crew pool:
+
+    python benchmarks/bench_scheduler.py --sizes 1,10,100,500 --runs 5
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from scheduler import ScheduleEngine
+
+
+SHARED_CREWS = {"masons": 40, "helpers": 60, "steel_workers": 12, "carpenters": 20, "supervisors": 6}
+
+
+def portfolio(size):
+    """Buildings from 150 to 1100 sq yards and G+0 to G+9, deterministic."""
+    return [
+        {"built_up_area": 150 + (i * 37) % 950, "floors": f"G+{(i * 7) % 10}"}
+        for i in range(size)
+    ]
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def measure(engine, projects, crews, runs):
+    timings = {"build": [], "critical_path": [], "level": []}
+    for _ in range(runs):
+        started = time.perf_counter()
+        network = engine.build(projects, crews)
+        built = time.perf_counter()
+        early_start, late_start, total_float, project_end = engine.critical_path(network)
+        analysed = time.perf_counter()
+        start, _ = engine.level(network, late_start)
+        leveled = time.perf_counter()
+        timings["build"].append(built - started)
+        timings["critical_path"].append(analysed - built)
+        timings["level"].append(leveled - analysed)
+
+    stats = {name: median(values) * 1000 for name, values in timings.items()}
+    total = sum(stats.values())
+    makespan = max(s + d for s, d in zip(start, network.duration))
+    return {
+        "activities": len(network),
+        "build_ms": stats["build"],
+        "critical_path_ms": stats["critical_path"],
+        "level_ms": stats["level"],
+        "total_ms": total,
+        "us_per_activity": total * 1000 / len(network),
+        "makespan_days": makespan
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CPM and resource leveling on portfolios")
+    parser.add_argument('--sizes', default="1,10,100,500,1000", help="comma-separated building counts")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--output', help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    engine = ScheduleEngine()
+    results = []
+    print(f"{'buildings':>9} {'crews':>8} {'activities':>10} {'build ms':>9} {'cpm ms':>8} "
+          f"{'level ms':>9} {'total ms':>9} {'us/act':>7} {'makespan':>9}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        projects = portfolio(size)
+        for label, crews in (("own", None), ("shared", SHARED_CREWS)):
+            stats = measure(engine, projects, crews, args.runs)
+            results.append({"buildings": size, "crews": label, **stats})
+            print(f"{size:>9} {label:>8} {stats['activities']:>10} {stats['build_ms']:>9.1f} "
+                  f"{stats['critical_path_ms']:>8.1f} {stats['level_ms']:>9.1f} {stats['total_ms']:>9.1f} "
+                  f"{stats['us_per_activity']:>7.2f} {stats['makespan_days']:>9}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
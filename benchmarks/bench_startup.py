@@ -0,0 +1,121 @@
+"""
+Startup benchmark for the serving modes.
+
+    cold_import   fresh interpreter until `import wsgi` returns (app built, warmed)
+    cold_ready    fresh interpreter until the first /health response
+    fork_ready    fork of a preloaded process until its first /health response,
+                  which is what a gunicorn worker (re)start costs with preload_app
+
+    python benchmarks/bench_startup.py --runs 10 --importtime
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COLD_READY = (
+    "import wsgi\n"
+    "wsgi.application.test_client().get('/health')\n"
+)
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        "runs": len(samples),
+        "p50_ms": percentile(samples, 0.50) * 1000,
+        "p95_ms": percentile(samples, 0.95) * 1000,
+        "max_ms": samples[-1] * 1000
+    }
+
+
+def time_subprocess(code, runs):
+    samples = []
+    env = dict(os.environ, RESULT_CACHE_SIZE="0")
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, check=True)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def time_forked_workers(runs):
+    """Preloads once, then measures fork -> first response in a child each run."""
+    sys.path.insert(0, ROOT)
+    import wsgi
+
+    samples = []
+    for _ in range(runs):
+        read_end, write_end = os.pipe()
+        started = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_end)
+            status = wsgi.application.test_client().get('/health').status_code
+            os.write(write_end, str(status).encode())
+            os._exit(0)
+        os.close(write_end)
+        status = os.read(read_end, 16)
+        samples.append(time.perf_counter() - started)
+        os.close(read_end)
+        os.waitpid(pid, 0)
+        if status != b"200":
+            raise RuntimeError(f"Forked worker answered {status!r}")
+    return samples
+
+
+def slowest_imports(limit):
+    """Top modules by cumulative import time, from python -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import wsgi"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        rows.append((int(cumulative), name))
+    rows.sort(reverse=True)
+    return rows[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure service startup and worker restart time")
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--importtime', action='store_true', help="list the slowest imports")
+    parser.add_argument('--output', help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = {
+        "cold_import": summarize(time_subprocess("import wsgi", args.runs)),
+        "cold_ready": summarize(time_subprocess(COLD_READY, args.runs))
+    }
+    if hasattr(os, "fork"):
+        results["fork_ready"] = summarize(time_forked_workers(args.runs))
+
+    print(f"{'mode':<12} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for name, stats in results.items():
+        print(f"{name:<12} {stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['max_ms']:>9.1f}")
+
+    if args.importtime:
+        print(f"\n{'cumulative ms':>13}  module")
+        for cumulative, name in slowest_imports(15):
+            print(f"{cumulative / 1000:>13.1f}  {name}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
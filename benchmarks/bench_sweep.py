@@ -0,0 +1,77 @@
+"""
+Scaling benchmark for ScenarioSweep: the same grid on 1..N worker processes.
+
+    python benchmarks/bench_sweep.py --max-workers 8 --json sweep_results.json
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from sweep import ScenarioSweep
+
+
+def build_grid(scale):
+    return {
+        "built_up_area": list(np.linspace(50, 10000, 20 * scale)),
+        "floors": ["G+0", "G+1", "G+2", "G+3", "G+4"],
+        "custom_days": [None] + list(range(60, 720, 30)),
+        "custom_workers": [None] + list(range(5, 200, 15)),
+        "daily_wage": list(range(350, 950, 50)),
+        "cost_per_sq_yard": [1200, 1500, 1800, 2200]
+    }
+
+
+def worker_counts(max_workers):
+    counts = [1]
+    while counts[-1] * 2 <= max_workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != max_workers:
+        counts.append(max_workers)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scale', type=int, default=1, help="grid size multiplier")
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunk-size', type=int, default=None)
+    parser.add_argument('--start-method', default=None, help="multiprocessing start method (fork/spawn)")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--json', help="write results to this file")
+    args = parser.parse_args()
+
+    sweep = ScenarioSweep(build_grid(args.scale))
+    print(f"Grid: {sweep.size:,} scenarios, cpu_count={os.cpu_count()}")
+    print(f"{'workers':>8} {'seconds':>10} {'scen/s':>14} {'speedup':>8}")
+
+    rows = []
+    baseline = None
+    for workers in worker_counts(args.max_workers):
+        best = min(
+            (sweep.run(workers=workers, chunk_size=args.chunk_size, start_method=args.start_method)
+             for _ in range(args.repeat)),
+            key=lambda result: result["seconds"]
+        )
+        baseline = baseline or best["seconds"]
+        speedup = baseline / best["seconds"]
+        print(f"{workers:>8} {best['seconds']:>10.3f} {best['throughput']:>14,.0f} {speedup:>7.2f}x")
+        rows.append({
+            "workers": workers,
+            "seconds": best["seconds"],
+            "throughput": best["throughput"],
+            "speedup": speedup,
+            "per_worker": best["workers"]
+        })
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({"benchmark": "sweep", "size": sweep.size, "results": rows}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
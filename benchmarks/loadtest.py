@@ -0,0 +1,354 @@
+"""
+Open-loop load test of the gunicorn deployment against a fake model server.
+
+Requests are sent on a fixed (or Poisson) schedule regardless of how fast
+the server answers, and latency is measured from the scheduled send time,
+so a backed-up server shows up as queueing delay rather than as a slower
+client. Each scenario is one endpoint, one model latency profile, one
+worker count and one request rate:
+
+    calculate           POST /api/calculate, plan only
+    calculate_deferred  POST /api/calculate with "ai_mode": "deferred"
+    batch               POST /api/calculate/batch with --batch-size projects
+    preview             GET /api/estimate/preview
+
+Rates are swept upwards per endpoint/profile/worker count and the sweep
+stops at the first saturated rate: achieved throughput below 95% of the
+offered rate, p99 above --slo-p99-ms, or more than --max-error-rate of
+requests failing. The last rate that held is the saturation point.
+
+    python benchmarks/loadtest.py --endpoints calculate,preview --profiles fast,typical,flaky \\
+        --workers 1,2 --rates 5,10,20,40,80 --duration 20 --output loadtest.json
+
+By default gunicorn is started for each worker count (pinned to --cores CPUs)
+with the fake model server from fake_ollama.py, caches and rate limiting off.
+With --url an already running server is tested instead and --profiles,
+--workers and --cores do not apply.
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import requests
+
+from fake_ollama import FakeOllamaServer
+
+
+# Model server behaviour: latency distribution (see fake_ollama.parse_latency),
+# share of HTTP 500 replies and share of calls that hang past the client timeout
+PROFILES = {
+    "fast": {"latency": "fixed:0.05", "error_rate": 0.0, "timeout_rate": 0.0},
+    "typical": {"latency": "lognormal:0.8,0.5", "error_rate": 0.0, "timeout_rate": 0.0},
+    "slow": {"latency": "lognormal:1.5,0.6", "error_rate": 0.0, "timeout_rate": 0.0},
+    "flaky": {"latency": "lognormal:0.8,0.5", "error_rate": 0.1, "timeout_rate": 0.05}
+}
+
+FLOORS = ["G+0", "G+1", "G+2", "G+3", "G+4", "G+5"]
+
+
+def random_project(rng):
+    # Random areas keep every request off any cache the server may have on
+    return {
+        "built_up_area": round(rng.uniform(100, 10000), 1),
+        "floors": rng.choice(FLOORS),
+        "daily_wage_per_worker": rng.randint(300, 1200),
+        "cost_per_sq_yard": rng.randint(800, 4000)
+    }
+
+
+def make_request(endpoint, rng, batch_size):
+    """(method, path, keyword arguments for requests) for one call."""
+    if endpoint == "calculate":
+        return "POST", "/api/calculate", {"json": random_project(rng)}
+    if endpoint == "calculate_deferred":
+        return "POST", "/api/calculate", {"json": {**random_project(rng), "ai_mode": "deferred"}}
+    if endpoint == "batch":
+        return "POST", "/api/calculate/batch", {"json": {"projects": [random_project(rng) for _ in range(batch_size)]}}
+    if endpoint == "preview":
+        project = random_project(rng)
+        project["built_up_area"] = int(project["built_up_area"])
+        return "GET", "/api/estimate/preview", {"params": project}
+    raise ValueError(f"Unknown endpoint '{endpoint}'")
+
+
+def send_times(rate, duration, arrivals, rng):
+    """Offsets from the start, in seconds, at which requests are due."""
+    if arrivals == "fixed":
+        return list(np.arange(0, duration, 1 / rate))
+    times, t = [], rng.expovariate(rate)
+    while t < duration:
+        times.append(t)
+        t += rng.expovariate(rate)
+    return times
+
+
+class LoadGenerator:
+    def __init__(self, base_url, timeout, max_in_flight):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_in_flight = max_in_flight
+        self._local = threading.local()
+
+    def _session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def _fire(self, due, call, results):
+        method, path, kwargs = call
+        sent = time.perf_counter()
+        try:
+            response = self._session().request(method, self.base_url + path, timeout=self.timeout, **kwargs)
+            response.content
+            outcome = response.status_code
+        except requests.Timeout:
+            outcome = "timeout"
+        except requests.RequestException:
+            outcome = "exception"
+        results.append((outcome, time.perf_counter() - due, sent - due))
+
+    def run(self, calls, offsets):
+        """Sends calls[i] at offsets[i]; returns (results, elapsed seconds)."""
+        results = []
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as pool:
+            start = time.perf_counter()
+            for call, offset in zip(calls, offsets):
+                due = start + offset
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                # Queued behind a full pool still counts from the due time
+                pool.submit(self._fire, due, call, results)
+        return results, time.perf_counter() - start
+
+
+def summarize(results, elapsed, rate, duration):
+    ok = [latency for outcome, latency, _ in results if outcome == 200]
+    statuses = {}
+    for outcome, _, _ in results:
+        if outcome != 200:
+            statuses[str(outcome)] = statuses.get(str(outcome), 0) + 1
+    latencies = np.array([latency for _, latency, _ in results]) * 1000
+    lags = np.array([lag for _, _, lag in results]) * 1000
+    sent = len(results)
+
+    def pct(values, q):
+        return round(float(np.percentile(values, q)), 1) if len(values) else None
+
+    return {
+        "offered_rps": rate,
+        "sent": sent,
+        "ok": len(ok),
+        "failed": statuses,
+        "error_rate": round(1 - len(ok) / sent, 4) if sent else 0.0,
+        # Over the whole run, including the drain after the last send
+        "achieved_rps": round(len(ok) / max(elapsed, duration), 2),
+        "latency_ms": {
+            "p50": pct(latencies, 50), "p90": pct(latencies, 90),
+            "p99": pct(latencies, 99), "max": round(float(latencies.max()), 1) if sent else None
+        },
+        "send_lag_p99_ms": pct(lags, 99)
+    }
+
+
+def is_saturated(summary, slo_p99_ms, max_error_rate):
+    reasons = []
+    if summary["achieved_rps"] < 0.95 * summary["offered_rps"]:
+        reasons.append("throughput")
+    if summary["latency_ms"]["p99"] is None or summary["latency_ms"]["p99"] > slo_p99_ms:
+        reasons.append("p99")
+    if summary["error_rate"] > max_error_rate:
+        reasons.append("errors")
+    return reasons
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class GunicornServer:
+    """gunicorn -c gunicorn.conf.py wsgi:application, pinned to the first cores CPUs."""
+
+    def __init__(self, workers, threads, cores, model_url, workdir):
+        self.port = free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.log_path = os.path.join(workdir, f"gunicorn-{self.port}.log")
+        self.env = dict(
+            os.environ,
+            BIND=f"127.0.0.1:{self.port}",
+            WEB_CONCURRENCY=str(workers),
+            GUNICORN_THREADS=str(threads),
+            GRACEFUL_TIMEOUT="5",
+            OLLAMA_API_URL=model_url,
+            RESULT_CACHE_SIZE="0",
+            INSIGHT_CACHE_SIZE="0",
+            INSIGHT_CACHE_PATH="",
+            RATE_LIMIT_PER_SECOND="0",
+            LOG_SAMPLE_RATE="0",
+            PROJECT_DB_PATH=os.path.join(workdir, f"projects-{self.port}.db")
+        )
+        self.cores = cores
+        self.proc = None
+
+    def _pin(self):
+        os.sched_setaffinity(0, range(self.cores))
+
+    def __enter__(self):
+        log = open(self.log_path, "w")
+        self.proc = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:application"],
+            cwd=ROOT, env=self.env, stdout=log, stderr=subprocess.STDOUT,
+            preexec_fn=self._pin if self.cores else None
+        )
+        log.close()
+        deadline = time.time() + 120
+        while time.time() < deadline:
+            if self.proc.poll() is not None:
+                raise RuntimeError(f"gunicorn exited with {self.proc.returncode}; see {self.log_path}")
+            try:
+                if requests.get(self.url + "/health", timeout=1).status_code == 200:
+                    return self
+            except requests.RequestException:
+                pass
+            time.sleep(0.2)
+        self.__exit__()
+        raise RuntimeError(f"gunicorn did not become healthy; see {self.log_path}")
+
+    def __exit__(self, *exc):
+        self.proc.terminate()
+        try:
+            self.proc.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+
+
+def sweep(generator, endpoint, args, label):
+    """Runs the rates upwards until one saturates; returns (runs, last sustained rate)."""
+    rng = random.Random(args.seed)
+    runs, sustained = [], None
+    for rate in args.rates:
+        offsets = send_times(rate, args.duration, args.arrivals, rng)
+        calls = [make_request(endpoint, rng, args.batch_size) for _ in offsets]
+        results, elapsed = generator.run(calls, offsets)
+        summary = summarize(results, elapsed, rate, args.duration)
+        summary["saturated"] = is_saturated(summary, args.slo_p99_ms, args.max_error_rate)
+        runs.append(summary)
+        print_row(label, summary)
+        if summary["saturated"]:
+            break
+        sustained = rate
+        time.sleep(args.cooldown)
+    return runs, sustained
+
+
+def print_row(label, s):
+    latency = s["latency_ms"]
+    print(f"{label:<40} {s['offered_rps']:>7g} {s['sent']:>6} {s['achieved_rps']:>8.2f} {s['error_rate'] * 100:>6.1f}% "
+          f"{latency['p50'] or 0:>8.1f} {latency['p90'] or 0:>8.1f} {latency['p99'] or 0:>8.1f} {latency['max'] or 0:>9.1f} "
+          f"{s['send_lag_p99_ms'] or 0:>8.1f}  {','.join(s['saturated']) or '-'}", flush=True)
+
+
+def csv_list(cast):
+    return lambda text: [cast(item) for item in text.split(",") if item]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Open-loop load test with a fake model server")
+    parser.add_argument('--endpoints', type=csv_list(str), default=["calculate"])
+    parser.add_argument('--profiles', type=csv_list(str), default=["typical"], help=f"model profiles: {', '.join(PROFILES)}")
+    parser.add_argument('--rates', type=csv_list(float), default=[5, 10, 20, 40, 80], help="requests per second, ascending")
+    parser.add_argument('--workers', type=csv_list(int), default=[1])
+    parser.add_argument('--threads', type=int, default=4, help="gunicorn threads per worker")
+    parser.add_argument('--cores', type=int, help="CPUs gunicorn may use (default: all)")
+    parser.add_argument('--duration', type=float, default=20, help="seconds per rate")
+    parser.add_argument('--cooldown', type=float, default=2, help="seconds between rates")
+    parser.add_argument('--arrivals', choices=["fixed", "poisson"], default="poisson")
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--timeout', type=float, default=10, help="client timeout per request")
+    parser.add_argument('--max-in-flight', type=int, default=256, help="client threads")
+    parser.add_argument('--slo-p99-ms', type=float, default=2500)
+    parser.add_argument('--max-error-rate', type=float, default=0.01)
+    parser.add_argument('--hang', type=float, default=30, help="seconds a model call hangs in timeout profiles")
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--url', help="test this running server instead of starting gunicorn")
+    parser.add_argument('--output', help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    unknown = [p for p in args.profiles if p not in PROFILES]
+    if unknown:
+        parser.error(f"unknown profile(s): {', '.join(unknown)}")
+    if args.cores and args.cores > os.cpu_count():
+        parser.error(f"--cores {args.cores} exceeds the {os.cpu_count()} CPUs available")
+    for endpoint in args.endpoints:
+        make_request(endpoint, random.Random(), 1)
+    args.rates = sorted(args.rates)
+
+    generator = None
+    scenarios = []
+    print(f"{'scenario':<40} {'rps':>7} {'sent':>6} {'ok rps':>8} {'errors':>7} "
+          f"{'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>9} {'lag p99':>8}  saturated")
+
+    if args.url:
+        generator = LoadGenerator(args.url, args.timeout, args.max_in_flight)
+        for endpoint in args.endpoints:
+            runs, sustained = sweep(generator, endpoint, args, endpoint)
+            scenarios.append({"endpoint": endpoint, "url": args.url, "runs": runs, "saturation_rps": sustained})
+    else:
+        cores = args.cores or len(os.sched_getaffinity(0))
+        with tempfile.TemporaryDirectory() as workdir:
+            for profile in args.profiles:
+                for workers in args.workers:
+                    fake = FakeOllamaServer(hang=args.hang, seed=args.seed, **PROFILES[profile]).start()
+                    try:
+                        with GunicornServer(workers, args.threads, args.cores, fake.url, workdir) as server:
+                            generator = LoadGenerator(server.url, args.timeout, args.max_in_flight)
+                            for endpoint in args.endpoints:
+                                label = f"{endpoint}/{profile}/w{workers}/c{cores}"
+                                before = fake.stats()
+                                runs, sustained = sweep(generator, endpoint, args, label)
+                                after = fake.stats()
+                                scenarios.append({
+                                    "endpoint": endpoint, "profile": profile, "workers": workers,
+                                    "threads": args.threads, "cores": cores, "runs": runs,
+                                    "saturation_rps": sustained,
+                                    "saturation_rps_per_worker": round(sustained / workers, 2) if sustained else None,
+                                    "saturation_rps_per_core": round(sustained / cores, 2) if sustained else None,
+                                    "model_server": {key: after[key] - before[key] for key in after}
+                                })
+                    finally:
+                        fake.stop()
+
+    print()
+    for scenario in scenarios:
+        name = "/".join(str(scenario[key]) for key in ("endpoint", "profile", "workers") if key in scenario)
+        if scenario["saturation_rps"] is None:
+            print(f"{name}: saturated at the lowest rate ({args.rates[0]:g} rps)")
+        elif scenario["runs"][-1]["saturated"]:
+            print(f"{name}: holds {scenario['saturation_rps']:g} rps, saturates at {scenario['runs'][-1]['offered_rps']:g} rps "
+                  f"({', '.join(scenario['runs'][-1]['saturated'])})")
+        else:
+            print(f"{name}: holds every rate up to {scenario['saturation_rps']:g} rps")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"settings": vars(args), "scenarios": scenarios}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+import base64
+import math
+from functools import lru_cache
+from urllib.parse import urlencode
+from xml.sax.saxutils import escape
+
+from config import Config
+from dependencies import ConstructionCalculator
+
+
+# Drawing area inside the 800x600 canvas (outer walls)
+PLAN_X, PLAN_Y, PLAN_W, PLAN_H = 50, 50, 700, 500
+
+# Rooms are laid out in two bands; room widths follow their share of the band's area
+LAYOUT_ROWS = [
+    ["Master Bedroom", "Bedroom 2", "Living Hall"],
+    ["Kitchen", "Bathrooms (2)", "Balcony"]
+]
+
+# Template pieces are built once at import time and only formatted per request
+_SVG_HEADER = (
+    '<svg viewBox="0 0 800 600" xmlns="http://www.w3.org/2000/svg" style="background:#1a1a2e;">'
+    f'<rect x="{PLAN_X}" y="{PLAN_Y}" width="{PLAN_W}" height="{PLAN_H}" '
+    'fill="none" stroke="#6C63FF" stroke-width="4"/>'
+)
+_ROOM_TEMPLATE = (
+    '<rect x="{x:.1f}" y="{y:.1f}" width="{w:.1f}" height="{h:.1f}" '
+    'fill="none" stroke="#4a4e69" stroke-width="2"/>'
+    '<text x="{tx:.1f}" y="{ty:.1f}" fill="#a5a6c4" font-family="Arial" font-size="14">{name}</text>'
+    '<text x="{tx:.1f}" y="{dy:.1f}" fill="#6C63FF" font-family="Arial" font-size="12">{dims} | {sqft} sq ft</text>'
+)
+_SVG_FOOTER = (
+    '<text x="400" y="580" text-anchor="middle" fill="#6C63FF" font-size="12">'
+    'GENERATED BLUEPRINT | {floor_name} | {floors} | {sqft} SQ FT</text></svg>'
+)
+
+
+def floor_name(index):
+    return "Ground Floor" if index == 0 else f"Floor {index}"
+
+
+def plan_floor_name(index, count):
+    """Floor name on a plan; past MAX_BLUEPRINT_FLOORS one typical plan stands for the rest."""
+    limit = max(1, Config.MAX_BLUEPRINT_FLOORS)
+    if count > limit and index >= limit - 1:
+        return f"Floors {limit - 1}-{count - 1} (Typical)"
+    return floor_name(index)
+
+
+class BlueprintRenderer:
+    """
+    Draws one SVG plan per floor with rooms scaled to the areas from
+    ConstructionCalculator.generate_blueprint_data.
+    """
+
+    def floor_count(self, area, floors):
+        return max(1, ConstructionCalculator(area, floors).floors)
+
+    def plan_floors(self, area, floors):
+        """
+        (floor_index, floor_name, floors_covered) for each plan to draw. Up to
+        MAX_BLUEPRINT_FLOORS floors get their own plan; above that the last
+        plan is one typical floor standing for all the remaining ones.
+        """
+        count = self.floor_count(area, floors)
+        limit = max(1, Config.MAX_BLUEPRINT_FLOORS)
+        drawn = min(count, limit)
+        return [
+            (index, plan_floor_name(index, count), count - drawn + 1 if index == drawn - 1 else 1)
+            for index in range(drawn)
+        ]
+
+    def render_floor(self, area, floors, floor_index=0):
+        """Returns the raw SVG markup for one floor."""
+        return _render_floor(float(area), str(floors), int(floor_index))
+
+    def render_all(self, area, floors):
+        return [
+            self.render_floor(area, floors, index)
+            for index, _, _ in self.plan_floors(area, floors)
+        ]
+
+    def render_floor_data_uri(self, area, floors, floor_index=0):
+        """Same drawing as render_floor, as an inline data URI."""
+        return _render_floor_data_uri(float(area), str(floors), int(floor_index))
+
+    @staticmethod
+    def to_data_uri(svg):
+        encoded = base64.b64encode(svg.encode('utf-8')).decode('ascii')
+        return f"data:image/svg+xml;base64,{encoded}"
+
+    @staticmethod
+    def url_for(area, floors, floor_index):
+        query = urlencode({"area": area, "floors": floors, "floor": floor_index})
+        return f"/api/blueprint.svg?{query}"
+
+
+@lru_cache(maxsize=512)
+def _render_floor(area, floors, floor_index):
+    blueprint = ConstructionCalculator(area, floors).generate_blueprint_data()
+    room_areas = {room['room']: room['area_sqft'] for room in blueprint['layout']}
+    total_sqft = sum(room_areas.values()) or 1
+
+    # Real-world size of the plan, keeping the canvas aspect ratio
+    plate_sqft = area * 9
+    plate_h_ft = math.sqrt(plate_sqft * PLAN_H / PLAN_W)
+    plate_w_ft = plate_sqft / plate_h_ft if plate_h_ft else 0
+
+    parts = [_SVG_HEADER]
+    y = PLAN_Y
+    for row in LAYOUT_ROWS:
+        row_sqft = sum(room_areas[name] for name in row) or 1
+        h = PLAN_H * row_sqft / total_sqft
+        x = PLAN_X
+        for name in row:
+            w = PLAN_W * room_areas[name] / row_sqft
+            dims = f"{round(plate_w_ft * w / PLAN_W)}' x {round(plate_h_ft * h / PLAN_H)}'"
+            parts.append(_ROOM_TEMPLATE.format(
+                x=x, y=y, w=w, h=h,
+                tx=x + 10, ty=y + 25, dy=y + 42,
+                name=name.upper(), dims=dims, sqft=room_areas[name]
+            ))
+            x += w
+        y += h
+
+    parts.append(_SVG_FOOTER.format(
+        floor_name=escape(plan_floor_name(floor_index, max(1, blueprint['floors']))).upper(),
+        floors=escape(floors),
+        sqft=round(plate_sqft)
+    ))
+    return "".join(parts)
+
+
+@lru_cache(maxsize=512)
+def _render_floor_data_uri(area, floors, floor_index):
+    return BlueprintRenderer.to_data_uri(_render_floor(area, floors, floor_index))
@@ -0,0 +1,135 @@
+"""
+Streaming bulk estimation for large project portfolios.
+
+Rows are read lazily from CSV or JSONL and priced in fixed-size chunks with
+EstimationEngine, and one NDJSON line is written per input row, so memory use
+stays flat however large the file is. A bad row gets an inline error line and
+the stream carries on.
+
+    python bulk_estimation.py portfolio.csv -o priced.ndjson
+    cat portfolio.jsonl | python bulk_estimation.py - --format jsonl
+"""
+import argparse
+import csv
+import itertools
+import json
+import sys
+
+from config import Config
+from estimation_engine import EstimationEngine
+from preprocessing import DataPreprocessor
+
+
+def iter_csv_rows(text_stream):
+    """Yields one dict per CSV row. Blank cells are treated as missing fields."""
+    for row in csv.DictReader(text_stream):
+        yield {key: value for key, value in row.items() if key and value not in (None, "")}
+
+
+def iter_jsonl_rows(text_stream):
+    """Yields one dict per JSONL line. Lines that do not parse are yielded as ValueError."""
+    for line in text_stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield ValueError(f"Invalid JSON: {e}")
+            continue
+        yield row if isinstance(row, dict) else ValueError("Expected a JSON object")
+
+
+def iter_rows(text_stream, fmt):
+    if fmt == "csv":
+        return iter_csv_rows(text_stream)
+    if fmt == "jsonl":
+        return iter_jsonl_rows(text_stream)
+    raise ValueError(f"Unsupported format: {fmt}")
+
+
+def estimate_stream(rows, chunk_size=Config.BULK_CHUNK_SIZE, include_schedule=False, engine=None):
+    """
+    Prices rows chunk by chunk and yields NDJSON text, one chunk per yield.
+    Each line carries the 1-based input row number and the row's "id" if it had one.
+    """
+    engine = engine or EstimationEngine()
+    row_numbers = itertools.count(1)
+
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            return
+
+        lines = [None] * len(chunk)
+        numbers = [next(row_numbers) for _ in chunk]
+        valid_positions = []
+        valid_inputs = []
+
+        # 1. Preprocessing, with failures reported per row
+        for position, row in enumerate(chunk):
+            try:
+                if isinstance(row, Exception):
+                    raise row
+                valid_inputs.append(DataPreprocessor.normalize_project(row))
+                valid_positions.append(position)
+            except (ValueError, TypeError, AttributeError) as e:
+                lines[position] = _error_line(numbers[position], row, e)
+
+        # 2-4. Schedule, resources and costs for the whole chunk at once
+        if valid_inputs:
+            inputs = engine.columns_from_inputs(valid_inputs)
+            columns = engine.to_columns(inputs, engine.estimate(inputs))
+            records = engine.to_records(columns, include_schedule=include_schedule)
+            for position, project, record in zip(valid_positions, valid_inputs, records):
+                out = {"row": numbers[position], "status": "success"}
+                if "id" in chunk[position]:
+                    out["id"] = chunk[position]["id"]
+                out["inputs"] = _input_summary(project)
+                out.update(record)
+                lines[position] = json.dumps(out)
+
+        yield "\n".join(lines) + "\n"
+
+
+def _input_summary(inputs):
+    return {
+        "built_up_area": inputs['area'],
+        "floors": inputs['floors'],
+        "daily_wage_per_worker": inputs['daily_wage'],
+        "cost_per_sq_yard": inputs['cost_per_sq_yard'],
+        "construction_days": inputs['user_days']
+    }
+
+
+def _error_line(number, row, error):
+    out = {"row": number, "status": "error", "error": str(error)}
+    if isinstance(row, dict) and "id" in row:
+        out["id"] = row["id"]
+    return json.dumps(out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream NDJSON estimates for a CSV or JSONL portfolio")
+    parser.add_argument('input', help="input file, or - for stdin")
+    parser.add_argument('-o', '--output', default='-', help="output file (default: stdout)")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help="input format (default: from file extension)")
+    parser.add_argument('--chunk-size', type=int, default=Config.BULK_CHUNK_SIZE)
+    parser.add_argument('--include-schedule', action='store_true')
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("jsonl" if args.input.endswith((".jsonl", ".ndjson")) else "csv")
+    source = sys.stdin if args.input == '-' else open(args.input, 'r', newline='', encoding='utf-8', errors='replace')
+    sink = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        for text in estimate_stream(iter_rows(source, fmt), args.chunk_size, args.include_schedule):
+            sink.write(text)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -2,13 +2,121 @@ import os
 
 class Config:
     # Flask Settings
-    DEBUG = True
-    PORT = 5000
+    DEBUG = os.getenv('FLASK_DEBUG', 'true').lower() == 'true'  # dev server only
+    PORT = int(os.getenv('PORT', 5000))
+
+    # Batch Estimation
+    MAX_BATCH_SIZE = int(os.getenv('MAX_BATCH_SIZE', 50000))
+    BULK_CHUNK_SIZE = int(os.getenv('BULK_CHUNK_SIZE', 2000))
+    MAX_BULK_CHUNK_SIZE = int(os.getenv('MAX_BULK_CHUNK_SIZE', 10000))  # upper bound for ?chunk_size=
+    BULK_SPOOL_BYTES = 8 * 1024 * 1024  # uploads larger than this are spooled to disk
+
+    # Metrics (/metrics endpoint and stage timers)
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+
+    # Logging: JSON lines on stdout, written by a background thread
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))  # records beyond this are dropped
+    LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', 0.01))  # share of requests with a summary line
+    LOG_SLOW_REQUEST_MS = float(os.getenv('LOG_SLOW_REQUEST_MS', 1000))  # always logged, with inputs
+    LOG_SLOW_INPUT_BYTES = int(os.getenv('LOG_SLOW_INPUT_BYTES', 4096))  # larger bodies are logged by size
+    REQUEST_ID_HEADER = os.getenv('REQUEST_ID_HEADER', 'X-Request-Id')
+
+    # Blueprints: floors drawn individually; taller buildings get one typical upper floor
+    MAX_BLUEPRINT_FLOORS = int(os.getenv('MAX_BLUEPRINT_FLOORS', 10))
+
+    # Parameter Sweeps
+    SWEEP_WORKERS = int(os.getenv('SWEEP_WORKERS', os.cpu_count() or 1))
+    SWEEP_CHUNK_SIZE = int(os.getenv('SWEEP_CHUNK_SIZE', 250000))
+    SWEEP_START_METHOD = os.getenv('SWEEP_START_METHOD', 'spawn')
+    MAX_SWEEP_SIZE = int(os.getenv('MAX_SWEEP_SIZE', 5000000))
+    MAX_SWEEP_OUTPUT_SIZE = int(os.getenv('MAX_SWEEP_OUTPUT_SIZE', 100000))  # scenarios returned column by column
+
+    # Estimate Grid (/api/estimate/preview): precomputed pipeline output per floor count and area
+    ESTIMATE_GRID = os.getenv('ESTIMATE_GRID', '0') == '1'  # off: computing a preview is as fast
+    ESTIMATE_GRID_PATH = os.getenv('ESTIMATE_GRID_PATH', '')  # empty builds it in memory at startup
+    ESTIMATE_GRID_MAX_FLOORS = int(os.getenv('ESTIMATE_GRID_MAX_FLOORS', 10))
+    ESTIMATE_GRID_AREA_STEP = float(os.getenv('ESTIMATE_GRID_AREA_STEP', 1))  # sq yards between nodes; whole areas are exact at 1
+
+    # Activity Scheduler (/api/schedule)
+    MAX_SCHEDULE_PROJECTS = int(os.getenv('MAX_SCHEDULE_PROJECTS', 2000))
+    # Activities per request (8 per building plus 8 per floor); also bounds /api/portfolio and /api/optimize
+    MAX_SCHEDULE_ACTIVITIES = int(os.getenv('MAX_SCHEDULE_ACTIVITIES', 200000))
+    MAX_CREW_SIZE = int(os.getenv('MAX_CREW_SIZE', 10000))  # workers per trade in "crews" and per building in "workers"
+
+    # Portfolio Estimates (/api/portfolio)
+    MAX_PORTFOLIO_BUILDINGS = int(os.getenv('MAX_PORTFOLIO_BUILDINGS', 2000))
+    # Default shared crew pool, in multiples of the largest building's crew
+    PORTFOLIO_CREW_TEAMS = int(os.getenv('PORTFOLIO_CREW_TEAMS', 4))
+
+    # Crew Optimizer (/api/optimize)
+    SITE_COST_PER_DAY = float(os.getenv('SITE_COST_PER_DAY', 2000))  # INR per day the site is open
+    SITE_SQ_YARDS_PER_WORKER = float(os.getenv('SITE_SQ_YARDS_PER_WORKER', 50))  # density cap
     
     # Ollama AI Settings
-    OLLAMA_API_URL = os.getenv('OLLAMA_API_URL', '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')
+    OLLAMA_API_URL = os.getenv('OLLAMA_API_URL', 'http://localhost:11434/api/generate')
     # Using the model specified in your PDF (Page 8)
     MODEL_ID = "granite:3.3-2b" 
+    # Max simultaneous requests sent to the model server
+    LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', 4))
+    # Circuit breaker: open after this many consecutive failures, then probe in the background
+    LLM_BREAKER_FAILURES = int(os.getenv('LLM_BREAKER_FAILURES', 3))
+    LLM_BREAKER_PROBE_INTERVAL = float(os.getenv('LLM_BREAKER_PROBE_INTERVAL', 5))  # seconds
+    LLM_PROBE_TIMEOUT = float(os.getenv('LLM_PROBE_TIMEOUT', 1))  # seconds
+    # Seconds to wait for each streamed chunk before giving up on the model server
+    LLM_STREAM_TIMEOUT = int(os.getenv('LLM_STREAM_TIMEOUT', 30))
+    # Background AI results kept for /api/ai-analysis/<job_id>
+    AI_JOB_LIMIT = int(os.getenv('AI_JOB_LIMIT', 1000))
+
+    # AI analysis cache, shared by projects in the same area/floors/duration bucket
+    INSIGHT_CACHE_SIZE = int(os.getenv('INSIGHT_CACHE_SIZE', 4096))  # 0 disables it
+    INSIGHT_CACHE_TTL = int(os.getenv('INSIGHT_CACHE_TTL', 7 * 86400))  # seconds
+    INSIGHT_CACHE_PATH = os.getenv('INSIGHT_CACHE_PATH', 'data/insight_cache.json')  # empty keeps it in memory
+    INSIGHT_AREA_BAND = int(os.getenv('INSIGHT_AREA_BAND', 100))  # sq yards per bucket
+    INSIGHT_DAYS_BAND = int(os.getenv('INSIGHT_DAYS_BAND', 30))  # days per bucket
+    INSIGHT_CACHE_SAVE_DELAY = float(os.getenv('INSIGHT_CACHE_SAVE_DELAY', 5))  # seconds new entries wait to be written
+    # JSON list of {"area", "floors", "days"} whose analyses are generated at startup
+    INSIGHT_WARMUP_FILE = os.getenv('INSIGHT_WARMUP_FILE', '')
+
+    # Response compression: gzip, or brotli when installed (0 bytes disables it)
+    COMPRESSION_MIN_BYTES = int(os.getenv('COMPRESSION_MIN_BYTES', 1024))
+    GZIP_LEVEL = int(os.getenv('GZIP_LEVEL', 6))
+    BROTLI_QUALITY = int(os.getenv('BROTLI_QUALITY', 4))  # 0-11; low values suit per-request compression
+
+    # Result Cache for /api/calculate (size 0 disables it)
+    RESULT_CACHE_SIZE = int(os.getenv('RESULT_CACHE_SIZE', 1024))
+    RESULT_CACHE_TTL = int(os.getenv('RESULT_CACHE_TTL', 3600))  # seconds
+    RESULT_CACHE_DIR = os.getenv('RESULT_CACHE_DIR')  # optional on-disk backing store
+    # Longest a request waits on an identical in-flight call before running it itself
+    SINGLE_FLIGHT_WAIT_TIMEOUT = float(os.getenv('SINGLE_FLIGHT_WAIT_TIMEOUT', 30))  # seconds; 0 waits forever
+
+    # Project Store (SQLite, WAL mode) behind /api/projects; off unless PROJECT_DB_PATH is set,
+    # e.g. data/projects.db. Rows are never expired, so prune the file as needed
+    PROJECT_DB_PATH = os.getenv('PROJECT_DB_PATH', '')
+    PROJECT_DB_POOL_SIZE = int(os.getenv('PROJECT_DB_POOL_SIZE', 4))
+    PROJECT_PAGE_SIZE = int(os.getenv('PROJECT_PAGE_SIZE', 50))
+    MAX_PROJECT_PAGE_SIZE = 500
+
+    # What-if Plan Sessions (/api/plan-sessions)
+    PLAN_SESSION_LIMIT = int(os.getenv('PLAN_SESSION_LIMIT', 1000))
+    PLAN_SESSION_IDLE_SECONDS = int(os.getenv('PLAN_SESSION_IDLE_SECONDS', 1800))
+
+    # Per-client token bucket on /api/calculate and the AI analysis paths, keyed on the caller's address (off unless a rate is set)
+    RATE_LIMIT_PER_SECOND = float(os.getenv('RATE_LIMIT_PER_SECOND', 0))
+    RATE_LIMIT_BURST = int(os.getenv('RATE_LIMIT_BURST', 30))
+    RATE_LIMIT_CLIENTS = int(os.getenv('RATE_LIMIT_CLIENTS', 10000))  # buckets kept, least recent dropped
+    # Comma-separated proxy addresses whose RATE_LIMIT_CLIENT_HEADER names the real client
+    RATE_LIMIT_TRUSTED_PROXIES = frozenset(
+        address.strip() for address in os.getenv('RATE_LIMIT_TRUSTED_PROXIES', '').split(',') if address.strip()
+    )
+    RATE_LIMIT_CLIENT_HEADER = os.getenv('RATE_LIMIT_CLIENT_HEADER', 'X-Forwarded-For')
+
+    # Monte Carlo cost risk (/api/risk)
+    RISK_DRAWS = int(os.getenv('RISK_DRAWS', 100000))
+    RISK_MAX_DRAWS = int(os.getenv('RISK_MAX_DRAWS', 1000000))
+    RISK_SEED = int(os.getenv('RISK_SEED', 42))  # fixed, so the same project always gets the same profile
+    RISK_HISTOGRAM_BINS = int(os.getenv('RISK_HISTOGRAM_BINS', 30))
+    MAX_RISK_PROJECTS = int(os.getenv('MAX_RISK_PROJECTS', 1000))
 
     # Construction Defaults (INR) - Based on PDF Page 9 screenshots
     DEFAULT_DAILY_WAGE = 500
@@ -25,4 +133,10 @@ class Config:
     QTY_STEEL_PER_SQ_YARD = 25.0    # kg per sq yard
     QTY_CEMENT_PER_SQ_YARD = 0.4    # bags per sq yard
     QTY_SAND_PER_SQ_YARD = 0.08     # tons per sq yard
-    QTY_WATER_PER_SQ_YARD = 500.0   # liters per sq yard
\ No newline at end of file
+    QTY_WATER_PER_SQ_YARD = 500.0   # liters per sq yard
+
+    # Optional JSON file overriding any rate table field (see rate_table.py)
+    RATE_TABLE_PATH = os.getenv('RATE_TABLE_PATH')
+    # Optional daily rate history for phase-by-phase repricing (see rate_history.py)
+    RATE_HISTORY_PATH = os.getenv('RATE_HISTORY_PATH', '')
+    RATE_HISTORY_DEFAULT_REGION = os.getenv('RATE_HISTORY_DEFAULT_REGION', '')
\ No newline at end of file
@@ -1,3 +1,5 @@
+import rate_table
+
 class CostService:
     def calculate_costs(self, built_up_area, cost_per_sq_yard, total_labor_days, daily_wage):
         """
@@ -18,7 +20,7 @@ class CostService:
         
         # 3. Overhead Calculation (10% standard)
         subtotal = material_cost + labor_cost
-        overhead_cost = subtotal * 0.10
+        overhead_cost = subtotal * rate_table.current().overhead_rate
         
         # 4. Total Calculation
         total_project_cost = material_cost + labor_cost + overhead_cost
@@ -1,17 +1,24 @@
-import requests
 import json
+import logging
 import math
-from config import Config
+import rate_table
+from preprocessing import DataPreprocessor
+from insight_cache import get_insight_cache
+from llm_client import LLMResponseError, get_llm_client
+from metrics import AI_FALLBACKS
+
+logger = logging.getLogger(__name__)
 
 class ConstructionCalculator:
-    def __init__(self, built_up_area, floors_str, custom_days=None, custom_workers=None, daily_wage=None, cost_per_sq_yard=None):
+    def __init__(self, built_up_area, floors_str, custom_days=None, custom_workers=None, daily_wage=None, cost_per_sq_yard=None, rates=None):
+        self.rates = rates or rate_table.current()
         self.area = float(built_up_area)
-        self.floors = self._parse_floors(floors_str)
+        self.floors = DataPreprocessor.count_floors(floors_str)
         self.total_construction_area = self.area * self.floors
         
-        # Use custom values if provided, else defaults from Config
-        self.daily_wage = float(daily_wage) if daily_wage else Config.DEFAULT_DAILY_WAGE
-        self.base_cost_sq_yard = float(cost_per_sq_yard) if cost_per_sq_yard else Config.DEFAULT_COST_PER_SQ_YARD
+        # Use custom values if provided, else defaults from the rate table
+        self.daily_wage = float(daily_wage) if daily_wage else self.rates.default_daily_wage
+        self.base_cost_sq_yard = float(cost_per_sq_yard) if cost_per_sq_yard else self.rates.default_cost_per_sq_yard
         
         # Auto-calculate timeline if not provided (approx 10 days per 100 sq yards per floor)
         calculated_days = math.ceil((self.total_construction_area / 100) * 10)
@@ -22,35 +29,29 @@ class ConstructionCalculator:
         total_man_days_needed = (self.total_construction_area * 1.5) # Factor for labor intensity
         self.workers = int(custom_workers) if custom_workers else max(5, math.ceil(total_man_days_needed / self.days))
 
-    def _parse_floors(self, floors_str):
-        """Parses 'G+2' to integer 3, or '2' to integer 2."""
-        s = str(floors_str).upper().strip()
-        if "G+" in s:
-            try:
-                add = int(s.split('+')[1])
-                return add + 1 # G(1) + 2 = 3 floors
-            except:
-                return 1
-        try:
-            return int(s)
-        except:
-            return 1
-
     def calculate_materials(self):
         """Calculates material quantities based on thumb rules."""
+        rates = self.rates
         return {
-            "steel_tons": round((self.total_construction_area * Config.QTY_STEEL_PER_SQ_YARD) / 1000, 2),
-            "cement_bags": round(self.total_construction_area * Config.QTY_CEMENT_PER_SQ_YARD),
-            "sand_tons": round(self.total_construction_area * Config.QTY_SAND_PER_SQ_YARD, 2),
-            "water_liters": round(self.total_construction_area * Config.QTY_WATER_PER_SQ_YARD)
+            "steel_tons": round((self.total_construction_area * rates.steel_kg_per_sq_yard) / 1000, 2),
+            "cement_bags": round(self.total_construction_area * rates.cement_bags_per_sq_yard),
+            "sand_tons": round(self.total_construction_area * rates.sand_tons_per_sq_yard, 2),
+            "water_liters": round(self.total_construction_area * rates.water_liters_per_sq_yard)
         }
 
-    def calculate_costs(self, materials):
-        """Calculates detailed cost breakdown."""
+    def calculate_costs(self, materials, material_rates=None):
+        """
+        Calculates detailed cost breakdown.
+        material_rates ({"steel_per_ton", "cement_per_bag", "sand_per_ton"})
+        replaces the flat table rates, e.g. with RateHistory.effective_rates().
+        """
+        rates = self.rates
+        unit_rates = material_rates or {}
+
         # Material Costs
-        steel_cost = materials['steel_tons'] * Config.RATE_STEEL_PER_TON
-        cement_cost = materials['cement_bags'] * Config.RATE_CEMENT_PER_BAG
-        sand_cost = materials['sand_tons'] * Config.RATE_SAND_PER_TON
+        steel_cost = materials['steel_tons'] * unit_rates.get('steel_per_ton', rates.steel_per_ton)
+        cement_cost = materials['cement_bags'] * unit_rates.get('cement_per_bag', rates.cement_per_bag)
+        sand_cost = materials['sand_tons'] * unit_rates.get('sand_per_ton', rates.sand_per_ton)
         
         # Estimate other material costs (bricks, paint, wood) as a factor of base structure
         other_material_cost = (steel_cost + cement_cost + sand_cost) * 0.5
@@ -61,7 +62,7 @@ class ConstructionCalculator:
         labor_cost = total_labor_days * self.daily_wage
 
         # Overhead
-        overhead_cost = (total_material_cost + labor_cost) * (Config.DEFAULT_OVERHEAD_PERCENTAGE / 100)
+        overhead_cost = (total_material_cost + labor_cost) * rates.overhead_rate
         
         total_project_cost = total_material_cost + labor_cost + overhead_cost
 
@@ -142,25 +143,37 @@ class ConstructionCalculator:
 
 class AIPlanner:
     @staticmethod
-    def get_analysis(project_data):
-        """Interacts with local Ollama instance (Granite 3.3 2B)."""
-        prompt = (
+    def build_prompt(project_data):
+        return (
             f"Act as a senior construction engineer. Analyze a project with these details: "
             f"Area: {project_data['area']} sq yards, Floors: {project_data['floors']}, "
             f"Timeline: {project_data['days']} days. "
             f"Provide a brief 3-point summary of risks and 3 recommendations for optimization."
         )
 
-        payload = {
-            "model": Config.MODEL_ID,
-            "prompt": prompt,
-            "stream": False
-        }
+    @staticmethod
+    def generate_analysis(project_data):
+        """One uncached model call; raises LLMError if the model is unavailable."""
+        return get_llm_client().generate(AIPlanner.build_prompt(project_data), timeout=30)
 
+    @staticmethod
+    def get_analysis(project_data):
+        """
+        Interacts with local Ollama instance (Granite 3.3 2B).
+        Projects in the same area/floors/duration bucket share one cached answer.
+        """
         try:
-            response = requests.post(Config.OLLAMA_API_URL, json=payload, timeout=30)
-            if response.status_code == 200:
-                return response.json().get('response', 'Analysis complete.')
-            return f"AI Service Error: {response.text}"
+            text = get_insight_cache().get_or_generate(project_data, AIPlanner.generate_analysis)
+            return text or 'Analysis complete.'
+        except LLMResponseError as e:
+            AI_FALLBACKS.inc(call="analysis")
+            return str(e)
         except Exception as e:
-            return "AI Analysis unavailable (Ollama may not be running)."
\ No newline at end of file
+            AI_FALLBACKS.inc(call="analysis")
+            logger.warning("AI analysis unavailable (%s), using fallback text.", e)
+            return "AI Analysis unavailable (Ollama may not be running)."
+
+    @staticmethod
+    def submit_analysis(project_data):
+        """Starts get_analysis() on the shared LLM pool and returns a Future."""
+        return get_llm_client().spawn(AIPlanner.get_analysis, project_data)
\ No newline at end of file
@@ -0,0 +1,142 @@
+"""
+Response encodings chosen from the request headers.
+
+- FastJSONProvider: app.json backed by orjson when it is installed, with the
+  same sorted keys and compact separators as Flask's default provider.
+- render(): MessagePack instead of JSON for clients that send
+  "Accept: application/msgpack" (needs msgpack).
+- compress(): gzip, or brotli when installed and accepted, for responses
+  above Config.COMPRESSION_MIN_BYTES.
+
+orjson, msgpack and brotli are optional. Without them JSON goes through the
+standard library and gzip is the only compression offered.
+"""
+import gzip
+
+from flask import current_app, jsonify, request
+from flask.json.provider import DefaultJSONProvider
+
+from config import Config
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+MSGPACK_MIMETYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+COMPRESSIBLE_MIMETYPES = {
+    "application/json", "application/msgpack", "application/x-ndjson",
+    "image/svg+xml", "text/plain", "text/html", "text/csv"
+}
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes with orjson when available."""
+
+    def _orjson_options(self, indent=False):
+        options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        # orjson takes no json.dumps arguments beyond indentation/separators
+        if orjson is None or set(kwargs) - {"indent", "separators"}:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._orjson_options(bool(kwargs.get("indent")))).decode()
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=self.default, option=self._orjson_options(indent)) + b"\n"
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def _msgpack_default(obj):
+    # numpy scalars and arrays that were not converted with .tolist()
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not MessagePack serializable")
+
+
+def wants_msgpack():
+    if msgpack is None:
+        return False
+    accept = request.accept_mimetypes
+    best = accept.best_match(MSGPACK_MIMETYPES + ("application/json",))
+    return best in MSGPACK_MIMETYPES and accept[best] > accept["application/json"]
+
+
+def render(payload, status=200):
+    """
+    The response for payload in the format the client asked for: MessagePack
+    if it prefers it over JSON and msgpack is installed, JSON otherwise.
+    """
+    if wants_msgpack():
+        response = current_app.response_class(
+            msgpack.packb(payload, default=_msgpack_default, use_bin_type=True),
+            status=status,
+            mimetype="application/msgpack"
+        )
+    else:
+        response = jsonify(payload)
+        response.status_code = status
+    response.vary.add("Accept")
+    return response
+
+
+def choose_encoding(accept_encodings):
+    """Best content coding the client accepts and this build supports, or None."""
+    offered = ("br", "gzip") if brotli is not None else ("gzip",)
+    return accept_encodings.best_match(offered)
+
+
+def compress(response):
+    """
+    after_request hook: compresses buffered, compressible responses of at
+    least Config.COMPRESSION_MIN_BYTES. Streams (NDJSON, SSE) are left alone
+    so their chunks still reach the client as they are produced.
+    """
+    if (
+        Config.COMPRESSION_MIN_BYTES <= 0
+        or response.direct_passthrough
+        or response.is_streamed
+        or response.status_code < 200
+        or response.status_code in (204, 304)
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    data = response.get_data()
+    if len(data) < Config.COMPRESSION_MIN_BYTES:
+        return response
+
+    coding = choose_encoding(request.accept_encodings)
+    if coding == "br":
+        body = brotli.compress(data, quality=Config.BROTLI_QUALITY)
+    elif coding == "gzip":
+        body = gzip.compress(data, compresslevel=Config.GZIP_LEVEL, mtime=0)
+    else:
+        return response
+
+    response.set_data(body)
+    response.headers["Content-Encoding"] = coding
+    return response
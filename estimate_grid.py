@@ -0,0 +1,364 @@
+"""
+Precomputed estimate table for live previews (/api/estimate/preview).
+
+Without a fixed duration, every number ScheduleService, ResourceService
+and CostService produce depends only on the area and the floor count,
+apart from the costs, which are also linear in the wage and the rate per
+sq yard. So the grid holds the pipeline output for every floor count
+1..max_floors at area nodes every area_step sq yards across the whole
+clamped range (DataPreprocessor.validate_area: 50 to 10000). Costs are
+stored once per unit rate and once per unit wage and scaled at lookup.
+
+A lookup only answers an area that falls exactly on a node (every whole
+sq yard with the default step of 1), where the result is the pipeline's.
+Interpolating between nodes would put stepped values (whole bags,
+man-days) and the costs derived from them off by up to a step, so
+fractional areas are misses. So are requests with a fixed
+construction_days, more floors than the grid holds, or a rate table other
+than the one the grid was built from; callers fall back to
+compute_preview(). `verify` checks the hits against the full computation.
+
+The grid is off by default (ESTIMATE_GRID=1 turns it on): the full
+computation is a few microseconds per preview already, while the grid costs
+each worker a build of about 100 ms and a few MB.
+
+    python estimate_grid.py build data/estimate_grid.npz
+    python estimate_grid.py verify --samples 20000
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import threading
+import time
+
+import numpy as np
+
+import rate_table
+from config import Config
+from cost_service import CostService
+from estimation_engine import EstimationEngine
+from preprocessing import DataPreprocessor
+from resource_service import ResourceService
+from schedule_service import ScheduleService
+
+
+logger = logging.getLogger(__name__)
+
+MIN_AREA = 50.0
+MAX_AREA = 10000.0
+
+# Preview fields that do not depend on the wage or the rate per sq yard, with
+# the rounding the services apply (None: whole number)
+FIELDS = (
+    ("duration_days", None),
+    ("duration_weeks", None),
+    ("duration_months", 1),
+    ("steel_tons", 1),
+    ("cement_bags", None),
+    ("sand_tons", 1),
+    ("water_liters", None),
+    ("total_workers_required", None),
+    ("total_labor_days", None)
+)
+COST_FIELDS = ("material_cost", "labor_cost", "overhead_cost", "total_project_cost")
+# Costs are stored per unit rate per sq yard and per unit daily wage
+COLUMNS = (
+    tuple(name for name, _ in FIELDS)
+    + tuple(f"{name}/rate" for name in COST_FIELDS)
+    + tuple(f"{name}/wage" for name in COST_FIELDS)
+)
+_COST_KEYS = tuple((name, f"{name}/rate", f"{name}/wage") for name in COST_FIELDS)
+
+_schedule_service = ScheduleService()
+_resource_service = ResourceService()
+_cost_service = CostService()
+
+
+def compute_preview(inputs):
+    """The preview fields from the full pipeline, for one normalized project."""
+    area, floors = inputs['area'], inputs['floors']
+    schedule = _schedule_service.generate_schedule(area, floors, inputs['user_days'])
+    materials = _resource_service.calculate_materials(area, floors)
+    labor = _resource_service.calculate_labor(area, schedule['duration_days'])
+    costs = _cost_service.calculate_costs(area, inputs['cost_per_sq_yard'], labor['total_labor_days'], inputs['daily_wage'])
+    preview = {
+        "duration_days": schedule['duration_days'],
+        "duration_weeks": schedule['duration_weeks'],
+        "duration_months": schedule['duration_months'],
+        "total_workers_required": labor['total_workers_required'],
+        "total_labor_days": labor['total_labor_days']
+    }
+    preview.update(materials)
+    for name in COST_FIELDS:
+        preview[name] = costs[name]
+    return preview
+
+
+class EstimateGrid:
+    """
+    The table is split by what each column varies with, which the build
+    finds from the data: columns that only change with the floor count
+    (the timeline), columns that only change with the area (man-days, costs
+    per unit rate or wage) and the rest, per floor count and area node.
+    """
+
+    def __init__(self, by_floor, by_area, by_both, names, max_floors, area_step, rate_version):
+        self.by_floor = by_floor  # (floors, columns)
+        self.by_area = by_area  # (area nodes, columns)
+        self.by_both = by_both  # (floors, area nodes, columns)
+        self.names = names  # {"floor": [...], "area": [...], "both": [...]} column names
+        # Position of every column in the concatenated (floor, area, both) row
+        position = {name: i for i, name in enumerate(names["floor"] + names["area"] + names["both"])}
+        self._fields = [(name, position[name], digits) for name, digits in FIELDS]
+        self._costs = [(name, position[per_rate], position[per_wage]) for name, per_rate, per_wage in _COST_KEYS]
+        self.max_floors = max_floors
+        self.area_step = area_step
+        self.rate_version = rate_version
+        self.nodes = by_area.shape[0]
+        self._step = (MAX_AREA - MIN_AREA) / (self.nodes - 1)
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def build(cls, max_floors=None, area_step=None, rates=None):
+        """Runs the vectorized pipeline once for every (floors, area node)."""
+        max_floors = int(max_floors or Config.ESTIMATE_GRID_MAX_FLOORS)
+        area_step = float(area_step or Config.ESTIMATE_GRID_AREA_STEP)
+        if max_floors < 1 or area_step <= 0:
+            raise ValueError("max_floors must be at least 1 and area_step positive")
+        rates = rates or rate_table.current()
+
+        nodes = math.ceil((MAX_AREA - MIN_AREA) / area_step) + 1
+        n = max_floors * nodes
+        inputs = {
+            "area": np.tile(np.linspace(MIN_AREA, MAX_AREA, nodes), max_floors),
+            "floors": None,
+            "num_floors": np.repeat(np.arange(1, max_floors + 1), nodes),
+            "daily_wage": np.zeros(n),
+            "cost_per_sq_yard": np.ones(n),
+            "user_days": np.zeros(n, dtype=np.int64)
+        }
+        engine = EstimationEngine()
+        per_rate = engine.estimate(inputs, rates)
+        inputs["daily_wage"], inputs["cost_per_sq_yard"] = np.ones(n), np.zeros(n)
+        per_wage = engine.estimate(inputs, rates)
+
+        columns = [per_rate[name] for name, _ in FIELDS]
+        columns += [per_rate[name] for name in COST_FIELDS]
+        columns += [per_wage[name] for name in COST_FIELDS]
+        values = np.stack([np.asarray(column, dtype=np.float64) for column in columns], axis=1)
+        values = values.reshape(max_floors, nodes, len(columns))
+
+        floor_only = np.all(values == values[:, :1, :], axis=(0, 1))
+        area_only = np.all(values == values[:1, :, :], axis=(0, 1)) & ~floor_only
+        both = ~(floor_only | area_only)
+        names = {
+            "floor": [COLUMNS[j] for j in np.flatnonzero(floor_only)],
+            "area": [COLUMNS[j] for j in np.flatnonzero(area_only)],
+            "both": [COLUMNS[j] for j in np.flatnonzero(both)]
+        }
+        return cls(
+            _frozen(values[:, 0][:, floor_only]),
+            _frozen(values[0][:, area_only]),
+            _frozen(values[:, :, both]),
+            names, max_floors, area_step, rates.version
+        )
+
+    def lookup(self, inputs, rates=None):
+        """
+        Preview fields for one normalized project (as compute_preview), or
+        None if the grid cannot answer it.
+        """
+        rates = rates or rate_table.current()
+        num_floors = DataPreprocessor.count_floors(inputs['floors'])
+        position = (min(max(inputs['area'], MIN_AREA), MAX_AREA) - MIN_AREA) / self._step
+        index = int(position)
+        if (inputs['user_days'] or not 1 <= num_floors <= self.max_floors or rates.version != self.rate_version
+                or MIN_AREA + index * self._step != inputs['area']):
+            self.misses += 1
+            return None
+        self.hits += 1
+
+        v = (self.by_floor[num_floors - 1].tolist() + self.by_area[index].tolist()
+             + self.by_both[num_floors - 1][index].tolist())
+
+        preview = {name: round(v[i], digits) for name, i, digits in self._fields}
+        rate, wage = inputs['cost_per_sq_yard'], inputs['daily_wage']
+        for name, per_rate, per_wage in self._costs:
+            preview[name] = round(rate * v[per_rate] + wage * v[per_wage], 2)
+        return preview
+
+    def verify(self, samples=10000, seed=0):
+        """
+        Compares lookups with compute_preview() on random projects, half on
+        whole sq yards and half fractional. Returns, for each half, how many
+        lookups the grid answered and how many of those matched exactly,
+        per-field mismatch counts and largest absolute errors, and the
+        average time of each path.
+        """
+        rng = np.random.default_rng(seed)
+        areas = rng.uniform(MIN_AREA, MAX_AREA, samples)
+        areas[::2] = np.round(areas[::2])
+        floors = rng.integers(1, self.max_floors + 1, samples)
+        wages = rng.uniform(300, 1200, samples).round()
+        rates_per_yard = rng.uniform(800, 4000, samples).round()
+
+        exact = {"whole": [0, 0, 0], "fractional": [0, 0, 0]}  # [exact, answered, total]
+        mismatches = {}
+        grid_seconds = full_seconds = 0.0
+        for area, num_floors, wage, rate in zip(areas.tolist(), floors.tolist(), wages.tolist(), rates_per_yard.tolist()):
+            inputs = {"area": area, "floors": f"G+{num_floors - 1}", "daily_wage": wage, "cost_per_sq_yard": rate, "user_days": None}
+            started = time.perf_counter()
+            got = self.lookup(inputs)
+            grid_seconds += time.perf_counter() - started
+            started = time.perf_counter()
+            expected = compute_preview(inputs)
+            full_seconds += time.perf_counter() - started
+
+            kind = exact["whole" if area == int(area) else "fractional"]
+            kind[2] += 1
+            if got is None:
+                continue
+            kind[1] += 1
+            differences = {name: abs(got[name] - value) for name, value in expected.items() if got[name] != value}
+            if not differences:
+                kind[0] += 1
+            for name, error in differences.items():
+                entry = mismatches.setdefault(name, {"count": 0, "max_abs_error": 0})
+                entry["count"] += 1
+                entry["max_abs_error"] = max(entry["max_abs_error"], round(error, 4))
+
+        return {
+            "samples": samples,
+            "exact": {
+                kind: {"exact": hits, "answered": answered, "total": total}
+                for kind, (hits, answered, total) in exact.items()
+            },
+            "mismatches": dict(sorted(mismatches.items())),
+            "grid_us_per_lookup": round(grid_seconds / samples * 1e6, 2),
+            "full_us_per_estimate": round(full_seconds / samples * 1e6, 2)
+        }
+
+    def save(self, path):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        meta = json.dumps({
+            "max_floors": self.max_floors,
+            "area_step": self.area_step,
+            "rate_version": self.rate_version,
+            "names": self.names
+        })
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, by_floor=self.by_floor, by_area=self.by_area, by_both=self.by_both, meta=np.array(meta))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Reads a saved grid. Raises ValueError if its columns are not this version's."""
+        with np.load(path) as data:
+            meta = json.loads(str(data['meta']))
+            tables = [_frozen(data[name]) for name in ("by_floor", "by_area", "by_both")]
+        names = meta['names']
+        if sorted(names["floor"] + names["area"] + names["both"]) != sorted(COLUMNS):
+            raise ValueError(f"{path} was built with different columns")
+        return cls(*tables, names, meta['max_floors'], meta['area_step'], meta['rate_version'])
+
+    def stats(self):
+        return {
+            "max_floors": self.max_floors,
+            "area_step": self.area_step,
+            "nodes": self.nodes,
+            "bytes": self.by_floor.nbytes + self.by_area.nbytes + self.by_both.nbytes,
+            "rate_version": self.rate_version,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+def _frozen(array):
+    array = np.ascontiguousarray(array)
+    array.setflags(write=False)
+    return array
+
+
+_shared_grid = None
+_shared_lock = threading.Lock()
+
+
+def get_estimate_grid():
+    """
+    The process-wide grid, or None if ESTIMATE_GRID is off. Loaded from
+    ESTIMATE_GRID_PATH when that file matches the current rate table and
+    settings, otherwise built (and saved there); rebuilt after a rate table
+    reload.
+    """
+    global _shared_grid
+    if not Config.ESTIMATE_GRID:
+        return None
+    grid = _shared_grid
+    version = rate_table.current().version
+    if grid is not None and grid.rate_version == version:
+        return grid
+    with _shared_lock:
+        if _shared_grid is None or _shared_grid.rate_version != version:
+            _shared_grid = _load_or_build()
+        return _shared_grid
+
+
+def estimate_grid_stats():
+    """Status for /health: never builds or loads the grid."""
+    grid = _shared_grid
+    return {
+        "enabled": Config.ESTIMATE_GRID,
+        "built": grid is not None,
+        **(grid.stats() if grid is not None else {})
+    }
+
+
+def _load_or_build():
+    path = Config.ESTIMATE_GRID_PATH
+    if path and os.path.exists(path):
+        try:
+            grid = EstimateGrid.load(path)
+            if (grid.rate_version == rate_table.current().version
+                    and grid.max_floors == Config.ESTIMATE_GRID_MAX_FLOORS
+                    and grid.area_step == Config.ESTIMATE_GRID_AREA_STEP):
+                return grid
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Estimate grid at %s ignored (%s)", path, e)
+    grid = EstimateGrid.build()
+    if path:
+        try:
+            grid.save(path)
+        except OSError as e:
+            logger.error("Estimate grid not saved (%s)", e)
+    return grid
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build and check the precomputed estimate grid")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="build the grid for the current rate table and save it")
+    build.add_argument('output')
+    build.add_argument('--max-floors', type=int)
+    build.add_argument('--area-step', type=float)
+    check = commands.add_parser('verify', help="compare grid lookups with the full computation")
+    check.add_argument('--path', help="saved grid to check (default: build one)")
+    check.add_argument('--max-floors', type=int)
+    check.add_argument('--area-step', type=float)
+    check.add_argument('--samples', type=int, default=10000)
+    check.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        grid = EstimateGrid.build(args.max_floors, args.area_step)
+        grid.save(args.output)
+        print(json.dumps(grid.stats(), indent=2))
+    else:
+        grid = EstimateGrid.load(args.path) if args.path else EstimateGrid.build(args.max_floors, args.area_step)
+        if grid.rate_version != rate_table.current().version:
+            raise SystemExit(f"Grid was built for rate table {grid.rate_version}, current is {rate_table.current().version}")
+        print(json.dumps(grid.verify(args.samples, args.seed), indent=2))
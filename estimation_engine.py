@@ -0,0 +1,220 @@
+import numpy as np
+
+import rate_table
+from preprocessing import DataPreprocessor
+from schedule_service import ScheduleService
+
+
+# Role shares used by ResourceService.calculate_labor
+ROLE_SHARES = [
+    ("Masons", 0.30),
+    ("Helpers", 0.40),
+    ("Steel Workers", 0.10),
+    ("Carpenters", 0.10),
+    ("Supervisors", 0.10)
+]
+
+PHASE_NAMES = [phase["name"] for phase in ScheduleService.PHASES]
+PHASE_WEIGHTS = np.array([phase["weight"] for phase in ScheduleService.PHASES])
+# Share of the duration elapsed before each phase, summed in the same order as ScheduleService
+PHASE_OFFSETS = np.concatenate(([0.0], np.cumsum(PHASE_WEIGHTS[:-1])))
+
+
+def _round_column(values, ndigits):
+    """Python's round() per value, so batch output matches the scalar services exactly."""
+    return [round(v, ndigits) for v in values.tolist()]
+
+
+class EstimationEngine:
+    """
+    Array-based version of the schedule -> resource -> cost pipeline used by
+    /api/calculate. Every input is a column with one entry per project, and
+    every output is computed for all projects in a single pass.
+    """
+
+    def normalize(self, projects):
+        """
+        Runs DataPreprocessor over a list of raw payloads and returns input columns.
+        Raises ValueError naming the first invalid project.
+        """
+        normalized = []
+        for i, raw in enumerate(projects):
+            try:
+                normalized.append(DataPreprocessor.normalize_project(raw))
+            except (ValueError, TypeError, AttributeError) as e:
+                raise ValueError(f"Project {i}: {e}")
+        return self.columns_from_inputs(normalized)
+
+    def columns_from_inputs(self, normalized):
+        """
+        Packs already-normalized projects (see DataPreprocessor.normalize_project)
+        into columns. Raises ValueError naming the first project with a NaN or
+        infinite number, which would otherwise turn into garbage integers.
+        """
+        n = len(normalized)
+        area = np.empty(n, dtype=np.float64)
+        num_floors = np.empty(n, dtype=np.int64)
+        daily_wage = np.empty(n, dtype=np.float64)
+        cost_per_sq_yard = np.empty(n, dtype=np.float64)
+        user_days = np.zeros(n, dtype=np.int64)  # 0 means "auto", as in ScheduleService
+        floors = []
+
+        for i, inputs in enumerate(normalized):
+            area[i] = inputs['area']
+            floors.append(inputs['floors'])
+            num_floors[i] = DataPreprocessor.count_floors(inputs['floors'])
+            daily_wage[i] = inputs['daily_wage']
+            cost_per_sq_yard[i] = inputs['cost_per_sq_yard']
+            if inputs['user_days']:
+                user_days[i] = inputs['user_days']
+
+        finite = np.isfinite(area) & np.isfinite(daily_wage) & np.isfinite(cost_per_sq_yard)
+        if not finite.all():
+            raise ValueError(f"Project {int(np.argmin(finite))}: Invalid numeric input: values must be finite numbers")
+
+        return {
+            "area": area,
+            "floors": floors,
+            "num_floors": num_floors,
+            "daily_wage": daily_wage,
+            "cost_per_sq_yard": cost_per_sq_yard,
+            "user_days": user_days
+        }
+
+    def estimate(self, inputs, rates=None):
+        """Computes timeline, materials, labor and costs for every project at once."""
+        rates = rates or rate_table.current()
+        area = inputs['area']
+        num_floors = inputs['num_floors']
+        user_days = inputs['user_days']
+
+        # 1. Schedule (ScheduleService.generate_schedule)
+        duration_days = np.where(
+            user_days != 0, user_days,
+            rates.base_schedule_days + num_floors * rates.schedule_days_per_floor
+        )
+        duration_weeks = np.ceil(duration_days / 7).astype(np.int64)
+        duration_months = duration_days / 30
+
+        # Start at the cumulative weight, at least one week after the previous phase
+        base_weeks = 1 + np.floor(np.round(duration_weeks[:, None] * PHASE_OFFSETS[None, :], 9)).astype(np.int64)
+        phase_index = np.arange(len(PHASE_OFFSETS))
+        phase_start_weeks = np.maximum.accumulate(base_weeks - phase_index, axis=1) + phase_index
+
+        # 2. Materials (ResourceService.calculate_materials)
+        total_area = area * num_floors
+        steel_tons = total_area * rates.plan_steel_tons_per_sq_yard
+        cement_bags = np.trunc(total_area * rates.plan_cement_bags_per_sq_yard).astype(np.int64)
+        sand_tons = total_area * rates.plan_sand_tons_per_sq_yard
+        water_liters = np.trunc(total_area * rates.plan_water_liters_per_sq_yard).astype(np.int64)
+
+        # 3. Labor (ResourceService.calculate_labor)
+        total_labor_days = np.trunc(area * rates.man_days_per_sq_yard).astype(np.int64)
+        construction_days = np.where(duration_days != 0, duration_days, rates.default_construction_days)
+        workers = np.ceil(total_labor_days / construction_days).astype(np.int64)
+        roles = {
+            role: np.ceil(workers * share).astype(np.int64)
+            for role, share in ROLE_SHARES
+        }
+
+        # 4. Costs (CostService.calculate_costs)
+        material_cost = area * inputs['cost_per_sq_yard']
+        labor_cost = total_labor_days * inputs['daily_wage']
+        overhead_cost = (material_cost + labor_cost) * rates.overhead_rate
+        total_project_cost = material_cost + labor_cost + overhead_cost
+
+        return {
+            "duration_days": duration_days,
+            "duration_weeks": duration_weeks,
+            "duration_months": duration_months,
+            "phase_start_weeks": phase_start_weeks,
+            "steel_tons": steel_tons,
+            "cement_bags": cement_bags,
+            "sand_tons": sand_tons,
+            "water_liters": water_liters,
+            "total_workers_required": workers,
+            "total_labor_days": total_labor_days,
+            "roles": roles,
+            "material_cost": material_cost,
+            "labor_cost": labor_cost,
+            "overhead_cost": overhead_cost,
+            "total_project_cost": total_project_cost
+        }
+
+    def to_columns(self, inputs, result):
+        """Rounds the raw arrays exactly like the scalar services and returns JSON-ready columns."""
+        columns = {
+            "built_up_area": inputs['area'].tolist(),
+            "floors": list(inputs['floors']),
+            "daily_wage": inputs['daily_wage'].tolist(),
+            "cost_per_sq_yard": inputs['cost_per_sq_yard'].tolist(),
+            "duration_days": result['duration_days'].tolist(),
+            "duration_weeks": result['duration_weeks'].tolist(),
+            "duration_months": _round_column(result['duration_months'], 1),
+            "steel_tons": _round_column(result['steel_tons'], 1),
+            "cement_bags": result['cement_bags'].tolist(),
+            "sand_tons": _round_column(result['sand_tons'], 1),
+            "water_liters": result['water_liters'].tolist(),
+            "total_workers_required": result['total_workers_required'].tolist(),
+            "total_labor_days": result['total_labor_days'].tolist(),
+            "material_cost": _round_column(result['material_cost'], 2),
+            "labor_cost": _round_column(result['labor_cost'], 2),
+            "overhead_cost": _round_column(result['overhead_cost'], 2),
+            "total_project_cost": _round_column(result['total_project_cost'], 2)
+        }
+        columns["role_distribution"] = {
+            role: values.tolist() for role, values in result['roles'].items()
+        }
+        columns["schedule_week_number"] = {
+            name: result['phase_start_weeks'][:, index].tolist()
+            for index, name in enumerate(PHASE_NAMES)
+        }
+        return columns
+
+    def to_records(self, columns, include_schedule=True):
+        """Rebuilds the per-project sections returned by /api/calculate from columns."""
+        records = []
+        for i in range(len(columns['duration_days'])):
+            record = {
+                "timeline": {
+                    "duration_days": columns['duration_days'][i],
+                    "duration_weeks": columns['duration_weeks'][i],
+                    "duration_months": columns['duration_months'][i]
+                },
+                "costs": {
+                    "material_cost": columns['material_cost'][i],
+                    "labor_cost": columns['labor_cost'][i],
+                    "overhead_cost": columns['overhead_cost'][i],
+                    "total_project_cost": columns['total_project_cost'][i],
+                    "currency": "INR"
+                },
+                "materials": {
+                    "steel_tons": columns['steel_tons'][i],
+                    "cement_bags": columns['cement_bags'][i],
+                    "sand_tons": columns['sand_tons'][i],
+                    "water_liters": columns['water_liters'][i]
+                },
+                "labor": {
+                    "total_workers_required": columns['total_workers_required'][i],
+                    "total_labor_days": columns['total_labor_days'][i],
+                    "role_distribution": {
+                        role: values[i] for role, values in columns['role_distribution'].items()
+                    }
+                }
+            }
+            if include_schedule:
+                record["schedule"] = [
+                    {
+                        "week_number": columns['schedule_week_number'][phase['name']][i],
+                        "phase_name": phase['name'],
+                        "activities": phase['activities']
+                    }
+                    for phase in ScheduleService.PHASES
+                ]
+            records.append(record)
+        return records
+
+    def run(self, projects):
+        """Convenience wrapper: raw payloads in, JSON-ready columns out."""
+        inputs = self.normalize(projects)
+        return self.to_columns(inputs, self.estimate(inputs))
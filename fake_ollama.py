@@ -0,0 +1,235 @@
+"""
+Minimal stand-in for the Ollama generate API, for local testing without a model.
+
+    python fake_ollama.py --port 11434 --delay 0.5 --chunk-delay 0.05
+
+or from Python:
+
+    with FakeOllamaServer(delay=0.2) as server:
+        client = LLMClient(url=server.url)
+
+For load tests it can behave like a busy or failing model server: a latency
+distribution for each generate call (--latency lognormal:0.8,0.5), a share
+of calls answered with HTTP 500 (--error-rate) and a share that hang for
+--hang seconds so callers time out (--timeout-rate). /api/tags always
+answers at once, as a real server under load still does.
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def parse_latency(spec):
+    """
+    Latency distribution from "fixed:S", "uniform:LOW,HIGH", "normal:MEAN,SD",
+    "lognormal:MEDIAN,SIGMA" or "exponential:MEAN" (seconds). Returns a
+    function of a random.Random that draws one latency, never negative.
+    """
+    kind, _, params = str(spec).partition(":")
+    try:
+        values = [float(v) for v in params.split(",")] if params else []
+    except ValueError:
+        raise ValueError(f"Invalid latency spec '{spec}'")
+    shapes = {
+        "fixed": (1, lambda rng, s: s),
+        "uniform": (2, lambda rng, low, high: rng.uniform(low, high)),
+        "normal": (2, lambda rng, mean, sd: rng.gauss(mean, sd)),
+        "lognormal": (2, lambda rng, median, sigma: median * rng.lognormvariate(0, sigma)),
+        "exponential": (1, lambda rng, mean: rng.expovariate(1 / mean) if mean > 0 else 0.0)
+    }
+    if kind not in shapes or len(values) != shapes[kind][0]:
+        raise ValueError(f"Invalid latency spec '{spec}'; expected one of: {', '.join(shapes)} with its parameters")
+    draw = shapes[kind][1]
+    return lambda rng: max(0.0, draw(rng, *values))
+
+
+class _FakeOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real server
+
+    def do_GET(self):
+        # Model listing; LLMClient probes it to see whether the server is up
+        if self.path != "/api/tags":
+            return self._send(404, {"error": "not found"})
+        self._send(200, {"models": []})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._send(400, {"error": "invalid JSON"})
+
+        if self.path != "/api/generate":
+            return self._send(404, {"error": "not found"})
+
+        server = self.server
+        with server.lock:
+            server.request_count += 1
+            roll = server.rng.random()
+            latency = server.latency(server.rng) if server.latency else server.delay
+        if roll < server.timeout_rate:
+            # Hang past the caller's timeout, then answer anyway
+            with server.lock:
+                server.timeouts_injected += 1
+            time.sleep(server.hang)
+        elif latency:
+            time.sleep(latency)
+        if server.timeout_rate <= roll < server.timeout_rate + server.error_rate:
+            with server.lock:
+                server.errors_injected += 1
+            return self._send(500, {"error": "injected failure"})
+
+        prompt = payload.get('prompt', '')
+        text = server.response_text or f"Fake analysis for: {prompt[:80]}"
+        # Like Ollama, stream unless the request says "stream": false
+        if payload.get('stream', True):
+            return self._stream(payload.get('model', ''), text)
+        self._send(200, {
+            "model": payload.get('model', ''),
+            "response": text,
+            "done": True
+        })
+
+    def _stream(self, model, text):
+        """NDJSON chunks, one word each, sent with chunked transfer encoding."""
+        server = self.server
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        words = [word + " " for word in text.split(" ")]
+        try:
+            for i, word in enumerate(words):
+                if i and server.chunk_delay:
+                    time.sleep(server.chunk_delay)
+                self._write_chunk({"model": model, "response": word, "done": False})
+            self._write_chunk({"model": model, "response": "", "done": True})
+            self.wfile.write(b"0\r\n\r\n")
+            server.completed_streams += 1
+        except (BrokenPipeError, ConnectionResetError):
+            # The client went away mid-stream; stop generating
+            server.cancelled_streams += 1
+            self.close_connection = True
+
+    def _write_chunk(self, body):
+        data = json.dumps(body).encode('utf-8') + b"\n"
+        self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _FakeHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Room for a load test's connection bursts; the default backlog is 5
+    request_queue_size = 128
+
+    def handle_error(self, request, client_address):
+        # Callers giving up mid-reply (timeouts, load tests) are expected
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class FakeOllamaServer:
+    """Runs the fake API on a background thread. Port 0 picks a free port."""
+
+    def __init__(self, host="127.0.0.1", port=0, delay=0.0, response_text=None, chunk_delay=0.0,
+                 latency=None, error_rate=0.0, timeout_rate=0.0, hang=60.0, seed=None):
+        self.httpd = _FakeHTTPServer((host, port), _FakeOllamaHandler)
+        self.httpd.delay = delay
+        # latency: a parse_latency() spec or function; replaces the fixed delay
+        self.httpd.latency = parse_latency(latency) if isinstance(latency, str) else latency
+        self.httpd.error_rate = error_rate
+        self.httpd.timeout_rate = timeout_rate
+        self.httpd.hang = hang
+        self.httpd.rng = random.Random(seed)
+        self.httpd.lock = threading.Lock()
+        self.httpd.errors_injected = 0
+        self.httpd.timeouts_injected = 0
+        self.httpd.response_text = response_text
+        self.httpd.chunk_delay = chunk_delay
+        self.httpd.request_count = 0
+        self.httpd.completed_streams = 0
+        self.httpd.cancelled_streams = 0
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/api/generate"
+
+    @property
+    def request_count(self):
+        return self.httpd.request_count
+
+    @property
+    def completed_streams(self):
+        return self.httpd.completed_streams
+
+    @property
+    def cancelled_streams(self):
+        return self.httpd.cancelled_streams
+
+    def stats(self):
+        return {
+            "requests": self.httpd.request_count,
+            "errors_injected": self.httpd.errors_injected,
+            "timeouts_injected": self.httpd.timeouts_injected,
+            "completed_streams": self.httpd.completed_streams,
+            "cancelled_streams": self.httpd.cancelled_streams
+        }
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Fake Ollama server for local testing")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=11434)
+    parser.add_argument('--delay', type=float, default=0.0, help="seconds to wait before answering")
+    parser.add_argument('--chunk-delay', type=float, default=0.0, help="seconds between streamed chunks")
+    parser.add_argument('--text', help="fixed response text")
+    parser.add_argument('--latency', help="latency distribution, e.g. lognormal:0.8,0.5 (replaces --delay)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="share of calls answered with HTTP 500")
+    parser.add_argument('--timeout-rate', type=float, default=0.0, help="share of calls that hang for --hang seconds")
+    parser.add_argument('--hang', type=float, default=60.0)
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    server = FakeOllamaServer(
+        args.host, args.port, args.delay, args.text, args.chunk_delay,
+        latency=args.latency, error_rate=args.error_rate, timeout_rate=args.timeout_rate,
+        hang=args.hang, seed=args.seed
+    )
+    print(f"Fake Ollama listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.httpd.server_close()
@@ -0,0 +1,37 @@
+"""
+Gunicorn settings for production serving:
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+The app is preloaded in the master (see wsgi.py), then forked into one worker
+per core. Each worker keeps its own metrics, caches and AI jobs, so scrape and
+poll through a sticky route or run a single worker where that matters.
+"""
+import os
+
+from config import Config
+
+bind = os.getenv('BIND', f"0.0.0.0:{Config.PORT}")
+workers = int(os.getenv('WEB_CONCURRENCY', os.cpu_count() or 1))
+# Threads let a worker keep serving while some requests wait on the model server
+worker_class = "gthread"
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+
+# Build the services once, before fork
+preload_app = True
+
+# Slow AI calls time out at 30 s; workers silent for longer are restarted
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+# On SIGTERM/HUP workers stop accepting and finish in-flight requests first
+graceful_timeout = int(os.getenv('GRACEFUL_TIMEOUT', 30))
+keepalive = 5
+
+# Optional periodic recycling; restarts are cheap because workers are forked
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 0))
+
+
+def worker_exit(server, worker):
+    # Cancel queued background AI work; its results would die with this worker
+    from llm_client import get_llm_client
+    get_llm_client().close()
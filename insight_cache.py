@@ -0,0 +1,325 @@
+"""
+Cache of AI project analyses keyed on a bucketed form of the project, so
+nearby projects (1000 and 1005 sq yards, 130 and 135 days) share one model
+call.
+
+A bucket is (area band, floor count, duration band). The cached text is a
+template: the area and day figures of the project that produced it are
+replaced by placeholders and filled back in with each caller's exact numbers.
+Numbers the model derived from them (totals, per-floor figures) are kept as
+written, which is as close as neighbours in one band need to be.
+
+Entries are evicted LRU + TTL and persisted to one JSON file, so a restarted
+server (or every forked worker) starts warm. New entries are written by a
+background timer save_delay seconds after the first unsaved one, and at exit,
+never on the request thread. warm_up() fills the buckets for a list of
+projects ahead of traffic.
+
+    python insight_cache.py data/insight_prompts.json
+"""
+import argparse
+import atexit
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from config import Config
+from preprocessing import DataPreprocessor
+from single_flight import SingleFlight
+
+
+logger = logging.getLogger(__name__)
+
+AREA = "<<area>>"
+DAYS = "<<days>>"
+
+
+def _format_number(value):
+    value = float(value)
+    return str(int(value)) if value.is_integer() else str(round(value, 1))
+
+
+def _number_pattern(value):
+    """Matches value as the model may have written it: 1050, 1,050 or 1050.0."""
+    text = _format_number(value)
+    whole, _, fraction = text.partition(".")
+    grouped = f"{int(whole):,}"
+    forms = {re.escape(whole), re.escape(grouped)}
+    suffix = r"\." + fraction if fraction else r"(?:\.0+)?"
+    return re.compile(r"(?<![\w.,])(?:" + "|".join(sorted(forms, key=len, reverse=True)) + ")" + suffix + r"(?![\w]|[.,]\d)")
+
+
+class InsightCache:
+    def __init__(self, max_entries=4096, ttl_seconds=604800, path=None, area_band=100, days_band=30, save_delay=5.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self.save_delay = save_delay
+        self.area_band = area_band
+        self.days_band = days_band
+        self._entries = OrderedDict()  # bucket key -> (stored_at, template)
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._flight = SingleFlight("insight")
+        self._dirty = False
+        self._save_timer = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if path:
+            self.load()
+
+    def bucket(self, project):
+        """Cache key for a project dict with area, floors and days."""
+        area_band = int(float(project['area']) // self.area_band)
+        num_floors = DataPreprocessor.count_floors(project['floors'])
+        days_band = int(int(project['days']) // self.days_band)
+        return f"{area_band}:{num_floors}:{days_band}"
+
+    @staticmethod
+    def make_template(text, project):
+        """Replaces the project's own area and day figures with placeholders."""
+        text = _number_pattern(project['area']).sub(AREA, text)
+        return _number_pattern(project['days']).sub(DAYS, text)
+
+    @staticmethod
+    def fill(template, project):
+        return template.replace(AREA, _format_number(project['area'])).replace(DAYS, _format_number(project['days']))
+
+    def get(self, project):
+        """Filled text for the project's bucket, or None."""
+        if self.max_entries <= 0:
+            return None
+        key = self.bucket(project)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] <= self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self.fill(entry[1], project)
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+        return None
+
+    def put(self, project, text):
+        """Stores model output produced for this exact project."""
+        if self.max_entries <= 0 or not text:
+            return
+        with self._lock:
+            self._store(self.bucket(project), (time.time(), self.make_template(text, project)))
+        if self.path:
+            self._schedule_save()
+
+    def _schedule_save(self):
+        with self._lock:
+            self._dirty = True
+            if self._save_timer is not None:
+                return
+            if self.save_delay > 0:
+                timer = self._save_timer = threading.Timer(self.save_delay, self.flush)
+                timer.daemon = True
+        if self.save_delay > 0:
+            timer.start()
+        else:
+            self.flush()
+
+    def flush(self):
+        """Writes unsaved entries to the cache file; run by the save timer and at exit."""
+        with self._lock:
+            self._save_timer = None
+            dirty, self._dirty = self._dirty, False
+        if dirty and self.path:
+            self.save()
+
+    def get_or_generate(self, project, generate):
+        """
+        Cached text for the project, or generate(project) on a miss. Concurrent
+        misses for one bucket share a single generate() call; every caller
+        still gets its own numbers filled in. Errors from generate() propagate
+        and nothing is cached.
+        """
+        text = self.get(project)
+        if text is not None:
+            return text
+
+        def produce():
+            text = generate(project)
+            self.put(project, text)
+            return self.make_template(text, project)
+
+        template, _ = self._flight.do(self.bucket(project), produce)
+        return self.fill(template, project)
+
+    def warm_up(self, projects, generate, submit=None):
+        """
+        Generates the buckets of projects that are not cached yet. With submit
+        (e.g. LLMClient.spawn) the calls run concurrently. Returns the number
+        of buckets filled.
+        """
+        pending = {}
+        for project in projects:
+            key = self.bucket(project)
+            with self._lock:
+                cached = key in self._entries
+            if not cached and key not in pending:
+                pending[key] = project
+
+        def attempt(project):
+            try:
+                self.get_or_generate(project, generate)
+                return True
+            except Exception as e:
+                logger.warning("Insight warm-up failed (%s)", e)
+                return False
+
+        if submit is None:
+            return sum(attempt(project) for project in pending.values())
+        futures = [submit(attempt, project) for project in pending.values()]
+        return sum(future.result() for future in futures)
+
+    def _store(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _read_file(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                document = json.load(f)
+            # Keys written with other band widths name different buckets
+            if (document['area_band'], document['days_band']) != (self.area_band, self.days_band):
+                return {}
+            return document['entries']
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+
+    def load(self):
+        """Loads unexpired entries from the cache file, oldest first."""
+        now = time.time()
+        records = sorted(self._read_file().items(), key=lambda item: item[1][0])
+        with self._lock:
+            for key, (stored_at, template) in records:
+                if now - stored_at <= self.ttl_seconds:
+                    self._store(key, (stored_at, template))
+            return len(self._entries)
+
+    def save(self):
+        """
+        Writes the cache file atomically. Entries another process wrote since
+        the last load are merged in first, newest copy winning.
+        """
+        with self._save_lock:
+            on_disk = self._read_file()
+            with self._lock:
+                merged = dict(on_disk)
+                for key, (stored_at, template) in self._entries.items():
+                    if key not in merged or merged[key][0] < stored_at:
+                        merged[key] = [stored_at, template]
+            if len(merged) > self.max_entries:
+                merged = dict(sorted(merged.items(), key=lambda item: item[1][0])[-self.max_entries:])
+
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({"area_band": self.area_band, "days_band": self.days_band, "entries": merged}, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                logger.error("Insight cache write failed (%s)", e)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "area_band": self.area_band,
+                "days_band": self.days_band,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "persistent": bool(self.path),
+                "coalesced": self._flight.stats()['coalesced']
+            }
+
+    def _reset_after_fork(self):
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._flight = SingleFlight("insight")
+        # The parent's timer thread did not survive the fork; unsaved entries are the parent's to write
+        self._save_timer = None
+        self._dirty = False
+
+
+def load_warm_up_file(path):
+    """Projects to warm: a JSON list of {"area", "floors", "days"} objects."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [
+            {"area": DataPreprocessor.validate_area(item['area']), "floors": DataPreprocessor.clean_floor_input(item['floors']), "days": int(item['days'])}
+            for item in json.load(f)
+        ]
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_insight_cache():
+    """Process-wide cache used by AIPlanner."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = InsightCache(
+                max_entries=Config.INSIGHT_CACHE_SIZE,
+                ttl_seconds=Config.INSIGHT_CACHE_TTL,
+                path=Config.INSIGHT_CACHE_PATH or None,
+                area_band=Config.INSIGHT_AREA_BAND,
+                days_band=Config.INSIGHT_DAYS_BAND,
+                save_delay=Config.INSIGHT_CACHE_SAVE_DELAY
+            )
+            atexit.register(_shared_cache.flush)
+        return _shared_cache
+
+
+def _after_fork_in_child():
+    global _shared_lock
+    _shared_lock = threading.Lock()
+    if _shared_cache is not None:
+        _shared_cache._reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+if __name__ == '__main__':
+    from dependencies import AIPlanner
+    from llm_client import get_llm_client
+
+    parser = argparse.ArgumentParser(description="Fill the AI insight cache for a list of projects")
+    parser.add_argument('projects', help='JSON list of {"area", "floors", "days"} objects')
+    args = parser.parse_args()
+
+    cache = get_insight_cache()
+    projects = load_warm_up_file(args.projects)
+    started = time.perf_counter()
+    filled = cache.warm_up(projects, AIPlanner.generate_analysis, submit=get_llm_client().spawn)
+    cache.flush()
+    print(f"Filled {filled} of {len(projects)} projects in {time.perf_counter() - started:.1f}s; "
+          f"{cache.stats()['entries']} buckets cached in {cache.path}")
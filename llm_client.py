@@ -0,0 +1,284 @@
+import asyncio
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from config import Config
+from metrics import LLM_FIRST_TOKEN, LLM_IN_FLIGHT, LLM_LATENCY
+from resilience import CircuitBreaker
+from single_flight import SingleFlight
+
+
+class LLMError(Exception):
+    """Raised when the model server cannot produce a response."""
+
+
+class LLMResponseError(LLMError):
+    """The model server answered, but with a non-200 status."""
+
+
+class LLMUnavailable(LLMError):
+    """The circuit breaker is open; the model server was not contacted."""
+
+
+class LLMClient:
+    """
+    Shared client for the Ollama generate API.
+    Keeps one pooled keep-alive session and caps how many requests
+    are in flight toward the model server at the same time. Identical
+    prompts already in flight are not sent twice. After repeated failures
+    or timeouts a circuit breaker fails calls immediately until a background
+    probe reaches the server again.
+    """
+
+    def __init__(self, url=None, model=None, max_concurrency=None):
+        self.url = url or Config.OLLAMA_API_URL
+        self.model = model or Config.MODEL_ID
+        self.max_concurrency = max_concurrency or Config.LLM_MAX_CONCURRENCY
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._lock = threading.Lock()
+        self._session = None
+        self._executor = None
+        self._flight = SingleFlight("llm")
+        self.breaker = CircuitBreaker(
+            "ollama", self.probe,
+            failure_threshold=Config.LLM_BREAKER_FAILURES,
+            probe_interval=Config.LLM_BREAKER_PROBE_INTERVAL
+        )
+
+    def probe(self):
+        """True if the server answers its model listing; used by the breaker."""
+        from requests import RequestException
+
+        tags_url = self.url.rsplit("/api/", 1)[0] + "/api/tags"
+        try:
+            return self._get_session().get(tags_url, timeout=Config.LLM_PROBE_TIMEOUT).status_code == 200
+        except RequestException:
+            return False
+
+    def _check_breaker(self):
+        if not self.breaker.allow():
+            raise LLMUnavailable("AI backend unavailable (circuit open)")
+
+    def _record(self, error=None):
+        """
+        Feeds the breaker. Failed connections, timeouts and 5xx answers
+        count as failures: a model that hangs would otherwise hold every
+        caller for its full timeout instead of failing fast.
+        """
+        if error is None:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure(error)
+
+    def _get_session(self):
+        # Created lazily so the client can be built before the server forks workers.
+        # requests is imported here too; it is the slowest import of the service.
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._session = session
+            return self._session
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency,
+                    thread_name_prefix="llm"
+                )
+            return self._executor
+
+    def generate(self, prompt, timeout=30, model=None):
+        """Blocking call. Returns the model's text or raises LLMError."""
+        model = model or self.model
+        text, _ = self._flight.do((model, prompt, timeout), self._generate, prompt, timeout, model)
+        return text
+
+    def _generate(self, prompt, timeout, model):
+        from requests import RequestException
+
+        self._check_breaker()
+        if not self._slots.acquire(timeout=timeout):
+            raise LLMError("Model server is at its concurrency limit")
+        try:
+            payload = {
+                "model": model,
+                "prompt": prompt,
+                "stream": False
+            }
+            LLM_IN_FLIGHT.inc()
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                response = self._get_session().post(self.url, json=payload, timeout=timeout)
+                if response.status_code != 200:
+                    error = LLMResponseError(f"AI Service Error: {response.text}")
+                    self._record(error if response.status_code >= 500 else None)
+                    raise error
+                text = response.json().get('response', '')
+                self._record()
+                outcome = "ok"
+                return text
+            except RequestException as e:
+                self._record(e)
+                raise LLMError(str(e))
+            finally:
+                LLM_IN_FLIGHT.dec()
+                LLM_LATENCY.observe(time.perf_counter() - started, outcome=outcome)
+        finally:
+            self._slots.release()
+
+    def stream(self, prompt, timeout=30, model=None):
+        """
+        Generator over the model's text as Ollama streams it, one chunk at a
+        time. The next chunk is only read from the socket when the caller asks
+        for it, so a slow consumer holds back the model server instead of
+        piling up text here. Closing the generator early closes the upstream
+        connection, which makes Ollama stop generating.
+        """
+        from requests import RequestException
+
+        model = model or self.model
+        self._check_breaker()
+        if not self._slots.acquire(timeout=timeout):
+            raise LLMError("Model server is at its concurrency limit")
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "stream": True
+        }
+        LLM_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        outcome = "error"
+        response = None
+        try:
+            response = self._get_session().post(self.url, json=payload, timeout=timeout, stream=True)
+            if response.status_code != 200:
+                error = LLMResponseError(f"AI Service Error: {response.text}")
+                self._record(error if response.status_code >= 500 else None)
+                raise error
+            self._record()
+            first = True
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get('error'):
+                    raise LLMResponseError(f"AI Service Error: {chunk['error']}")
+                text = chunk.get('response', '')
+                if text:
+                    if first:
+                        LLM_FIRST_TOKEN.observe(time.perf_counter() - started)
+                        first = False
+                    yield text
+                if chunk.get('done'):
+                    break
+            outcome = "ok"
+        except GeneratorExit:
+            outcome = "cancelled"
+            raise
+        except RequestException as e:
+            self._record(e)
+            raise LLMError(str(e))
+        except ValueError as e:
+            raise LLMError(str(e))
+        finally:
+            if response is not None:
+                response.close()
+            LLM_IN_FLIGHT.dec()
+            LLM_LATENCY.observe(time.perf_counter() - started, outcome=outcome)
+            self._slots.release()
+
+    def coalescing_stats(self):
+        return self._flight.stats()
+
+    def spawn(self, fn, *args):
+        """
+        Runs fn(*args) on the client's worker pool and returns a Future. The
+        caller's context goes along, so logs from fn carry its trace id.
+        """
+        return self._get_executor().submit(contextvars.copy_context().run, fn, *args)
+
+    def submit(self, prompt, timeout=30, model=None):
+        """Runs generate() in the background and returns a Future."""
+        return self.spawn(self.generate, prompt, timeout, model)
+
+    async def agenerate(self, prompt, timeout=30, model=None):
+        """Awaitable form of generate() for asyncio callers."""
+        return await asyncio.wrap_future(self.submit(prompt, timeout, model))
+
+    def _reset_after_fork(self):
+        # Threads and pooled sockets do not survive fork(); start the child clean
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._lock = threading.Lock()
+        self._session = None
+        self._executor = None
+        self._flight = SingleFlight("llm")
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+class JobStore:
+    """
+    Keeps background AI jobs so the result can be fetched by a follow-up request.
+    The oldest jobs are dropped once max_jobs is reached.
+    """
+
+    def __init__(self, max_jobs=1000):
+        self.max_jobs = max_jobs
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, future):
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._jobs[job_id] = future
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.popitem(last=False)
+        return job_id
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+
+def get_llm_client():
+    """Process-wide client shared by AIService and AIPlanner."""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = LLMClient()
+        return _shared_client
+
+
+def _after_fork_in_child():
+    global _shared_lock
+    _shared_lock = threading.Lock()
+    if _shared_client is not None:
+        _shared_client._reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -1,3 +1,14 @@
+import math
+
+import rate_table
+from config import Config
+from cost_service import CostService
+from preprocessing import DataPreprocessor
+from resource_service import ResourceService
+from schedule_service import ScheduleService
+from scheduler import minimum_duration
+
+
 class ResourceOptimizer:
     """
     Logic to optimize material and labor distribution to reduce costs 
@@ -21,4 +32,180 @@ class ResourceOptimizer:
         """
         ideal_crew = total_labor_days / target_days
         # Site safety/efficiency cap: no more than 1 worker per 50 sq yards simultaneously
-        return max(2, round(ideal_crew))
\ No newline at end of file
+        return max(2, round(ideal_crew))
+
+class CrewOptimizer:
+    """
+    Picks crew size per trade and project duration for the lowest total cost:
+    labor and overhead as in CostService, plus a per-day site cost (equipment,
+    site office, security) for every day the project runs. Crews are paid for
+    every day the project runs, so idle workers show up as cost.
+
+    Each trade has a fixed amount of work (ResourceService man-days split by
+    trade share) and works in parallel with the others, so for a duration T
+    the cheapest crew for a trade is ceil(work / T). The search walks T upward
+    from the shortest feasible build, visiting only the durations where some
+    crew can shrink by one worker. Crews only shrink as T grows, so no later
+    plan finishes sooner than the current one; the search stops once even the
+    smallest possible crew working that long costs more than the best plan
+    found (branch and bound on T).
+    """
+
+    # Share of the man-days done by each productive trade (ResourceService distribution)
+    TRADE_SHARES = (("Masons", 0.30), ("Helpers", 0.40), ("Steel Workers", 0.10), ("Carpenters", 0.10))
+    # One supervisor per this many trade workers (about 10% of the crew)
+    SUPERVISOR_SPAN = 9
+
+    def __init__(self, resource_service=None, cost_service=None, schedule_service=None):
+        self.resource_service = resource_service or ResourceService()
+        self.cost_service = cost_service or CostService()
+        self.schedule_service = schedule_service or ScheduleService()
+
+    def optimize(self, inputs, site_cost_per_day=None, max_days=None, sq_yards_per_worker=None):
+        """
+        inputs are normalized project fields (DataPreprocessor.normalize_project).
+        Options left as None take the Config defaults. Raises ValueError for
+        options that are not finite or out of range, and when no crew fits
+        the density cap and max_days.
+        """
+        site_cost_per_day = Config.SITE_COST_PER_DAY if site_cost_per_day is None else float(site_cost_per_day)
+        sq_yards_per_worker = Config.SITE_SQ_YARDS_PER_WORKER if sq_yards_per_worker is None else float(sq_yards_per_worker)
+        if not (math.isfinite(site_cost_per_day) and site_cost_per_day >= 0):
+            raise ValueError("site_cost_per_day must be a finite number >= 0")
+        if not (math.isfinite(sq_yards_per_worker) and sq_yards_per_worker > 0):
+            raise ValueError("sq_yards_per_worker must be a finite number > 0")
+        if max_days is not None:
+            max_days = float(max_days)
+            if not (math.isfinite(max_days) and max_days >= 1):
+                raise ValueError("max_days must be a finite number >= 1")
+            max_days = int(max_days)
+
+        area = inputs['area']
+        num_floors = DataPreprocessor.count_floors(inputs['floors'])
+        wage = inputs['daily_wage']
+
+        # 1. Work per trade, site density cap and the shortest physically possible build
+        total_man_days = max(1, self.resource_service.calculate_labor(area, inputs['user_days'])['total_labor_days'])
+        share_total = sum(share for _, share in self.TRADE_SHARES)
+        # Rounded so float noise (66.00000000000001) cannot add a worker in ceil()
+        work = [round(total_man_days * share / share_total, 6) for _, share in self.TRADE_SHARES]
+        min_crew = len(work) + 1  # one worker per trade plus a supervisor
+        density_cap = max(min_crew, math.floor(area * num_floors / sq_yards_per_worker))
+        min_days = minimum_duration(num_floors)
+
+        plan = _TradePlan(work, self.SUPERVISOR_SPAN, wage * (1 + rate_table.current().overhead_rate), site_cost_per_day)
+
+        # 2. Shortest duration any crew within the cap can achieve
+        days = max(min_days, math.ceil(max(work) / density_cap))
+        while plan.crew(days)[1] > density_cap:
+            days += 1
+
+        best = None
+        evaluated = 0
+        while not (max_days and days > max_days):
+            candidate = plan.evaluate(days, min_days)
+            evaluated += 1
+            if best is None or candidate[0] < best[0]:
+                best = candidate
+
+            # Bound: longer targets only shrink the crews, so no later plan
+            # finishes sooner than this one actually does
+            if plan.lower_bound(candidate[1], min_crew) >= best[0]:
+                break
+
+            # Next duration at which some trade needs one worker fewer
+            shrinkable = [plan.next_shrink(w, n, days) for w, n in zip(work, candidate[2]) if n > 1]
+            if not shrinkable:
+                break
+            days = min(shrinkable)
+
+        if best is None:
+            raise ValueError(
+                f"No crew can finish within {max_days} days under the density cap of {density_cap} workers"
+            )
+
+        response = self._describe(inputs, best, total_man_days, site_cost_per_day)
+        response.update({
+            "density_cap": density_cap,
+            "minimum_days": min_days,
+            "evaluated_durations": evaluated
+        })
+
+        # 3. The heuristic duration /api/calculate uses, priced with the same model
+        baseline_days = self.schedule_service.generate_schedule(area, inputs['floors'], inputs['user_days'])['duration_days']
+        baseline = plan.evaluate(max(baseline_days, min_days), min_days)
+        response["baseline"] = {
+            "duration_days": baseline[1],
+            "total_workers": baseline[3],
+            "within_density_cap": baseline[3] <= density_cap,
+            "total_cost": self._describe(inputs, baseline, total_man_days, site_cost_per_day)["costs"]["total_cost"]
+        }
+        response["savings"] = round(response["baseline"]["total_cost"] - response["costs"]["total_cost"], 2)
+        return response
+
+    def _describe(self, inputs, plan, total_man_days, site_cost_per_day):
+        _, duration, crew, total_workers = plan
+        paid_man_days = duration * total_workers
+        costs = self.cost_service.calculate_costs(inputs['area'], inputs['cost_per_sq_yard'], paid_man_days, inputs['daily_wage'])
+        costs["site_cost"] = round(duration * site_cost_per_day, 2)
+        costs["total_cost"] = round(costs["total_project_cost"] + costs["site_cost"], 2)
+
+        role_distribution = {role: n for (role, _), n in zip(self.TRADE_SHARES, crew)}
+        role_distribution["Supervisors"] = total_workers - sum(crew)
+        return {
+            "duration_days": duration,
+            "total_workers": total_workers,
+            "role_distribution": role_distribution,
+            "paid_man_days": paid_man_days,
+            "idle_man_days": round(paid_man_days - total_man_days, 2),
+            "costs": costs
+        }
+
+    def optimize_many(self, projects, **options):
+        """Batch mode: raw payloads in, one result per project. Raises ValueError naming the first bad project."""
+        results = []
+        for i, raw in enumerate(projects):
+            try:
+                inputs = DataPreprocessor.normalize_project(raw)
+                results.append(self.optimize(inputs, **options))
+            except (ValueError, TypeError, AttributeError) as e:
+                raise ValueError(f"Project {i}: {e}")
+        return results
+
+
+class _TradePlan:
+    """Cost model of one project for CrewOptimizer: crews per trade for a given duration."""
+
+    def __init__(self, work, supervisor_span, worker_day_cost, site_cost_per_day):
+        self.work = work
+        self.supervisor_span = supervisor_span
+        self.worker_day_cost = worker_day_cost
+        self.site_cost_per_day = site_cost_per_day
+
+    def crew(self, days):
+        crew = [math.ceil(w / days) for w in self.work]
+        trade_workers = sum(crew)
+        return crew, trade_workers + max(1, math.ceil(trade_workers / self.supervisor_span))
+
+    def evaluate(self, days, min_days):
+        """(cost, duration, trade crews, total workers) for the cheapest crew finishing within days."""
+        crew, total_workers = self.crew(days)
+        duration = max(min_days, max(math.ceil(w / n) for w, n in zip(self.work, crew)))
+        return duration * (self.worker_day_cost * total_workers + self.site_cost_per_day), duration, crew, total_workers
+
+    def lower_bound(self, duration, min_crew):
+        """Cheapest any plan lasting at least duration days can be."""
+        return duration * (self.worker_day_cost * min_crew + self.site_cost_per_day)
+
+    @staticmethod
+    def next_shrink(work, workers, days):
+        """
+        Shortest duration after days at which ceil(work / duration) drops below
+        workers. Computed as in crew(), so float rounding cannot skip one.
+        """
+        target = max(days + 1, math.ceil(work / (workers - 1)))
+        while target - 1 > days and math.ceil(work / (target - 1)) < workers:
+            target -= 1
+        while math.ceil(work / target) >= workers:
+            target += 1
+        return target
\ No newline at end of file
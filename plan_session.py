@@ -0,0 +1,182 @@
+"""
+Session-scoped plans for interactive what-if editing.
+
+A PlanSession keeps the normalized inputs and every computed section of a
+plan. Each section declares the inputs and sections it reads, so a partial
+update recomputes only what depends on the changed fields (wage -> costs ->
+insights; area -> everything). A recomputed section that comes out equal to
+its old value does not dirty anything downstream.
+
+The active rate table version is treated as one more input, so an update
+after /api/rates/reload reprices the session. Blueprints are always the
+procedural renderer; the model is not called while a user is editing.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from preprocessing import DataPreprocessor
+import rate_table
+from metrics import SESSION_RECOMPUTES
+
+
+# Raw request fields a session accepts, in /api/calculate naming
+INPUT_FIELDS = ("built_up_area", "floors", "daily_wage_per_worker", "cost_per_sq_yard", "construction_days", "blueprint_mode")
+
+# node -> names it depends on (normalized inputs or other nodes), in topological order
+PLAN_GRAPH = OrderedDict([
+    ("schedule", ("area", "floors", "user_days", "rate_version")),
+    ("materials", ("area", "floors", "rate_version")),
+    ("labor", ("area", "schedule", "rate_version")),
+    ("costs", ("area", "cost_per_sq_yard", "labor", "daily_wage", "rate_version")),
+    ("blueprints", ("area", "floors", "blueprint_mode")),
+    ("insights", ("area", "costs", "schedule"))
+])
+
+
+class PlanSession:
+    """
+    services is any object with schedule_service, resource_service,
+    cost_service and ai_service attributes.
+    """
+
+    def __init__(self, session_id, services):
+        self.session_id = session_id
+        self.services = services
+        self.raw = {}
+        self.inputs = {}
+        self.values = {}
+        self.version = 0
+        self.touched_at = time.time()
+        self.lock = threading.Lock()
+
+    def _normalize(self, raw):
+        inputs = DataPreprocessor.normalize_project(raw)
+        inputs['blueprint_mode'] = "url" if raw.get('blueprint_mode') == 'url' else "inline"
+        inputs['rate_version'] = rate_table.current().version
+        return inputs
+
+    def _compute(self, node, values):
+        services = self.services
+        inputs = self.inputs
+        if node == "schedule":
+            return services.schedule_service.generate_schedule(inputs['area'], inputs['floors'], inputs['user_days'])
+        if node == "materials":
+            return services.resource_service.calculate_materials(inputs['area'], inputs['floors'])
+        if node == "labor":
+            return services.resource_service.calculate_labor(inputs['area'], values['schedule']['duration_days'])
+        if node == "costs":
+            return services.cost_service.calculate_costs(
+                inputs['area'], inputs['cost_per_sq_yard'],
+                values['labor']['total_labor_days'], inputs['daily_wage']
+            )
+        if node == "blueprints":
+            return services.ai_service.generate_blueprints(
+                inputs['floors'], inputs['area'], as_url=inputs['blueprint_mode'] == "url"
+            )
+        if node == "insights":
+            return services.ai_service.get_smart_insights(
+                inputs['area'], values['costs']['total_project_cost'], values['schedule']['duration_weeks']
+            )
+        raise KeyError(node)
+
+    def update(self, changes):
+        """
+        Applies raw field changes and recomputes the dirty sections.
+        Returns (version, changed_sections, recomputed_nodes). Raises ValueError or
+        TypeError on bad input, leaving the session as it was.
+        """
+        unknown = set(changes) - set(INPUT_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+        with self.lock:
+            raw = dict(self.raw)
+            raw.update(changes)
+            inputs = self._normalize(raw)
+            old_inputs = self.inputs
+            self.inputs = inputs
+
+            # 1. Inputs whose normalized value moved
+            changed = {name for name, value in inputs.items() if old_inputs.get(name, object()) != value}
+
+            # 2. Recompute, in graph order, every node that reads something that changed
+            recomputed = []
+            values = dict(self.values)
+            try:
+                for node, dependencies in PLAN_GRAPH.items():
+                    if node in values and not changed.intersection(dependencies):
+                        continue
+                    value = self._compute(node, values)
+                    recomputed.append(node)
+                    SESSION_RECOMPUTES.inc(section=node)
+                    if values.get(node) != value:
+                        values[node] = value
+                        changed.add(node)
+            except Exception:
+                self.inputs = old_inputs
+                raise
+
+            self.raw = raw
+            self.values = values
+            self.version += 1
+            self.touched_at = time.time()
+            return self.version, self.sections(only=changed), recomputed
+
+    def snapshot(self):
+        """(version, inputs, full plan sections) read under the session lock."""
+        with self.lock:
+            return self.version, dict(self.raw), self.sections()
+
+    def sections(self, only=None):
+        """Plan sections in /api/calculate response shape, optionally limited to changed nodes."""
+        values = self.values
+        out = {}
+        if only is None or "schedule" in only:
+            schedule = values['schedule']
+            out["timeline"] = {
+                "duration_days": schedule['duration_days'],
+                "duration_weeks": schedule['duration_weeks'],
+                "duration_months": schedule['duration_months']
+            }
+            out["schedule"] = schedule['schedule']
+        for node in ("costs", "materials", "labor", "blueprints", "insights"):
+            if only is None or node in only:
+                out[node] = values[node]
+        return out
+
+
+class PlanSessionStore:
+    """In-memory sessions with LRU eviction and an idle timeout."""
+
+    def __init__(self, services, max_sessions=1000, idle_seconds=1800):
+        self.services = services
+        self.max_sessions = max_sessions
+        self.idle_seconds = idle_seconds
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, raw):
+        session = PlanSession(uuid.uuid4().hex, self.services)
+        session.update({name: raw[name] for name in INPUT_FIELDS if name in raw})
+        with self._lock:
+            self._sessions[session.session_id] = session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session
+
+    def get(self, session_id):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            if time.time() - session.touched_at > self.idle_seconds:
+                del self._sessions[session_id]
+                return None
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def delete(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
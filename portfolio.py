@@ -0,0 +1,235 @@
+"""
+Portfolio estimates for many buildings on one site (e.g. a gated community).
+
+1. Buildings are grouped into types by their normalized inputs. The
+   schedule -> resource -> cost pipeline runs once per type, and its
+   results are multiplied by the type's count.
+2. Materials are rolled up per material and bought as one order with
+   volume discount tiers. The discounts apply to the material cost in the
+   totals, split between materials by their value at rate table prices.
+3. Crews come from one shared pool (by default PORTFOLIO_CREW_TEAMS times
+   the largest building's crew per trade). ScheduleEngine levels every
+   building's activities against that pool, which staggers the buildings
+   as the crews free up.
+
+Everything except the leveling is linear in the number of types. Leveling
+is a heap pass over the activities, so the total grows roughly linearly
+with the building count.
+"""
+from bisect import bisect_right
+
+import rate_table
+from config import Config
+from dependencies import ConstructionCalculator
+from preprocessing import DataPreprocessor
+from scheduler import ROLES
+
+
+# (minimum quantity, discount) per material, for the combined order
+BULK_DISCOUNT_TIERS = {
+    "steel_tons": ((0, 0.0), (50, 0.02), (200, 0.04), (1000, 0.07)),
+    "cement_bags": ((0, 0.0), (5000, 0.02), (20000, 0.04), (100000, 0.06)),
+    "sand_tons": ((0, 0.0), (2000, 0.01), (10000, 0.03), (50000, 0.05))
+}
+
+# Material quantity -> rate table field with its unit price
+MATERIAL_RATES = {"steel_tons": "steel_per_ton", "cement_bags": "cement_per_bag", "sand_tons": "sand_per_ton"}
+
+COST_FIELDS = ("material_cost", "labor_cost", "overhead_cost", "total_project_cost")
+
+
+def bulk_discount(material, quantity):
+    """Discount rate of the highest tier the quantity reaches."""
+    tiers = BULK_DISCOUNT_TIERS[material]
+    return tiers[bisect_right([minimum for minimum, _ in tiers], quantity) - 1][1]
+
+
+class PortfolioEngine:
+    def __init__(self, schedule_service, resource_service, cost_service, schedule_engine):
+        self.schedule_service = schedule_service
+        self.resource_service = resource_service
+        self.cost_service = cost_service
+        self.schedule_engine = schedule_engine
+
+    def group(self, buildings):
+        """
+        Normalizes buildings and groups identical ones. Each entry may carry a
+        "count". Returns (types, building_types): one dict per distinct type
+        and the type id of every building, in input order.
+        Raises ValueError naming the first invalid building.
+        """
+        types = {}
+        building_types = []
+        for i, raw in enumerate(buildings):
+            try:
+                inputs = DataPreprocessor.normalize_project(raw)
+                count = int(raw.get('count', 1))
+            except (ValueError, TypeError, AttributeError) as e:
+                raise ValueError(f"Building {i}: {e}")
+            if count < 1:
+                raise ValueError(f"Building {i}: count must be at least 1")
+
+            key = (inputs['area'], inputs['floors'], inputs['daily_wage'], inputs['cost_per_sq_yard'], inputs['user_days'])
+            entry = types.get(key)
+            if entry is None:
+                entry = types[key] = {"type_id": len(types), "inputs": inputs, "count": 0}
+            if len(building_types) + count > Config.MAX_PORTFOLIO_BUILDINGS:
+                raise ValueError(f"Portfolio size exceeds limit of {Config.MAX_PORTFOLIO_BUILDINGS} buildings")
+            entry["count"] += count
+            building_types.extend([entry["type_id"]] * count)
+        return list(types.values()), building_types
+
+    def _plan(self, inputs):
+        """The /api/calculate stages for one building type, without blueprints or AI."""
+        area, floors = inputs['area'], inputs['floors']
+        schedule = self.schedule_service.generate_schedule(area, floors, inputs['user_days'])
+        materials = self.resource_service.calculate_materials(area, floors)
+        labor = self.resource_service.calculate_labor(area, schedule['duration_days'])
+        costs = self.cost_service.calculate_costs(
+            area, inputs['cost_per_sq_yard'], labor['total_labor_days'], inputs['daily_wage']
+        )
+        crew = ConstructionCalculator(area, floors, custom_days=inputs['user_days']).get_worker_distribution()
+        return {
+            "timeline": {
+                "duration_days": schedule['duration_days'],
+                "duration_weeks": schedule['duration_weeks'],
+                "duration_months": schedule['duration_months']
+            },
+            "materials": materials,
+            "labor": labor,
+            "costs": costs,
+            "crew": crew
+        }
+
+    def estimate(self, buildings, crews=None, teams=None, schedule=True):
+        """
+        Per-type plans, per-building deployment and portfolio totals.
+        crews: {role: size} shared pool; teams: pool size in multiples of the
+        largest building's crew when crews is not given.
+        """
+        types, building_types = self.group(buildings)
+
+        # 1. One pipeline run per distinct building type
+        for entry in types:
+            entry.update(self._plan(entry["inputs"]))
+
+        # 2. Roll-ups: each type's numbers times its count
+        materials = {}
+        costs = dict.fromkeys(COST_FIELDS, 0.0)
+        total_area = 0.0
+        labor_days = 0
+        for entry in types:
+            count = entry["count"]
+            total_area += entry["inputs"]['area'] * count
+            labor_days += entry["labor"]['total_labor_days'] * count
+            for name, value in entry["materials"].items():
+                materials[name] = materials.get(name, 0) + value * count
+            for name in COST_FIELDS:
+                costs[name] += entry["costs"][name] * count
+
+        procurement = self._procurement(materials, costs["material_cost"])
+        totals = {
+            "built_up_area": round(total_area, 2),
+            "materials": {name: round(value, 1) for name, value in materials.items()},
+            "total_labor_days": labor_days,
+            "costs": {name: round(value, 2) for name, value in costs.items()},
+            "bulk_discount": procurement["total_discount"],
+            "total_after_discounts": round(costs["total_project_cost"] - procurement["total_discount"], 2)
+        }
+
+        response = {
+            "building_count": len(building_types),
+            "type_count": len(types),
+            "building_types": [
+                {
+                    "type_id": entry["type_id"],
+                    "count": entry["count"],
+                    "built_up_area": entry["inputs"]['area'],
+                    "floors": entry["inputs"]['floors'],
+                    "timeline": entry["timeline"],
+                    "materials": entry["materials"],
+                    "labor": entry["labor"],
+                    "costs": entry["costs"]
+                }
+                for entry in types
+            ],
+            "totals": totals,
+            "procurement": procurement
+        }
+
+        # 3. Staggered deployment of the shared crews
+        if schedule:
+            response["deployment"], response["buildings"] = self._deploy(types, building_types, crews, teams)
+        else:
+            response["buildings"] = [{"building": i, "type_id": t} for i, t in enumerate(building_types)]
+        return response
+
+    def _procurement(self, materials, material_cost):
+        """
+        Discounts on the combined order. The plan quantities at rate table
+        prices only split the material budget between materials; each
+        material's discount applies to its share of material_cost, the
+        figure that is actually in total_project_cost.
+        """
+        rates = rate_table.current()
+        list_values = {
+            material: materials.get(material, 0) * getattr(rates, rate_field)
+            for material, rate_field in MATERIAL_RATES.items()
+        }
+        list_total = sum(list_values.values())
+        lines = {}
+        total_discount = 0.0
+        for material, rate_field in MATERIAL_RATES.items():
+            quantity = materials.get(material, 0)
+            share = material_cost * list_values[material] / list_total if list_total else 0.0
+            discount_rate = bulk_discount(material, quantity)
+            discount = share * discount_rate
+            total_discount += discount
+            lines[material] = {
+                "quantity": round(quantity, 1),
+                "unit_rate": getattr(rates, rate_field),
+                "list_value": round(list_values[material], 2),
+                "budget_share": round(share, 2),
+                "discount_rate": discount_rate,
+                "discount": round(discount, 2)
+            }
+        return {"materials": lines, "total_discount": round(total_discount, 2)}
+
+    def _deploy(self, types, building_types, crews, teams):
+        if not crews:
+            teams = int(teams or Config.PORTFOLIO_CREW_TEAMS)
+            if teams < 1:
+                raise ValueError("teams must be at least 1")
+            crews = {role: teams * max(entry["crew"][role] for entry in types) for role in ROLES}
+
+        by_type = {entry["type_id"]: entry["inputs"] for entry in types}
+        projects = [
+            {
+                "built_up_area": by_type[t]['area'],
+                "floors": by_type[t]['floors'],
+                "construction_days": by_type[t]['user_days']
+            }
+            for t in building_types
+        ]
+        network, result = self.schedule_engine.schedule(projects, crews=crews)
+        summary = self.schedule_engine.to_response(network, result, include_activities=False)
+
+        buildings = [
+            {
+                "building": project["project"],
+                "type_id": building_types[project["project"]],
+                "start_day": project["start_day"],
+                "finish_day": project["finish_day"],
+                "start_week": project["start_day"] // 7 + 1,
+                "delay_days": project["delay_days"]
+            }
+            for project in summary["projects"]
+        ]
+        deployment = {
+            "crews": crews,
+            "makespan_days": summary["makespan_days"],
+            "makespan_weeks": summary["makespan_weeks"],
+            "activity_count": summary["activity_count"],
+            "crew_usage": summary["crews"]
+        }
+        return deployment, buildings
@@ -1,4 +1,8 @@
+import math
 import re
+from functools import lru_cache
+
+import rate_table
 
 class DataPreprocessor:
     """
@@ -22,6 +26,16 @@ class DataPreprocessor:
             
         return s
 
+    @staticmethod
+    def count_floors(floors):
+        """
+        Number of floors for 'G+2' (3), '2' (2) or an int. Anything unparseable counts as 1.
+        Every estimator uses this one parser; results are memoized per input.
+        """
+        if isinstance(floors, int) and not isinstance(floors, bool):
+            return floors
+        return _count_floors(str(floors))
+
     @staticmethod
     def validate_area(area):
         """Ensures the area is within realistic bounds for the AI model."""
@@ -31,4 +45,59 @@ class DataPreprocessor:
             if val > 10000: return 10000 # Model limit
             return val
         except ValueError:
-            return 100.0
\ No newline at end of file
+            return 100.0
+
+    @staticmethod
+    def normalize_project(raw_data):
+        """
+        Applies the standard cleaning to one /api/calculate payload.
+        Raises ValueError if wage, cost or days are not numeric, or if any
+        number is NaN or infinite.
+        """
+        raw_area = raw_data.get('built_up_area', 0)
+        if not _is_finite(raw_area):
+            raise ValueError("Invalid numeric input: area must be a finite number")
+        area = DataPreprocessor.validate_area(raw_area)
+        floors = DataPreprocessor.clean_floor_input(raw_data.get('floors', 'G+0'))
+
+        rates = rate_table.current()
+        try:
+            daily_wage = float(raw_data.get('daily_wage_per_worker', rates.default_daily_wage))
+            cost_per_sq_yard = float(raw_data.get('cost_per_sq_yard', rates.default_cost_per_sq_yard))
+            user_days = raw_data.get('construction_days')
+            if user_days is not None:
+                user_days = int(user_days)
+        except (ValueError, TypeError, OverflowError):
+            raise ValueError("Invalid numeric input for wages, costs, or days")
+        if not (math.isfinite(daily_wage) and math.isfinite(cost_per_sq_yard)):
+            raise ValueError("Invalid numeric input: wages and costs must be finite numbers")
+
+        return {
+            "area": area,
+            "floors": floors,
+            "daily_wage": daily_wage,
+            "cost_per_sq_yard": cost_per_sq_yard,
+            "user_days": user_days
+        }
+
+
+def _is_finite(value):
+    """False for NaN and infinities; text that is not a number is left to validate_area."""
+    try:
+        return math.isfinite(float(value))
+    except (ValueError, TypeError):
+        return True
+
+
+@lru_cache(maxsize=256)
+def _count_floors(floor_str):
+    s = floor_str.upper().replace(" ", "")
+    if "G+" in s:
+        try:
+            return int(s.split('+')[1]) + 1  # G(1) + 2 = 3 floors
+        except ValueError:
+            return 1
+    try:
+        return int(s)
+    except ValueError:
+        return 1
\ No newline at end of file
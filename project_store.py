@@ -0,0 +1,220 @@
+"""
+SQLite-backed store of every plan returned by /api/calculate, so results can
+be listed and fetched again without recomputing.
+
+The database runs in WAL mode, so readers never block the writer. Connections
+are opened lazily and kept in a small pool; a forked server worker starts
+with an empty pool rather than sharing the parent's handles. Each row keeps
+the full response as JSON text and serves it back verbatim. The indexed
+columns (area, floors, total cost, creation time) are only used for listing.
+Creation times have microsecond precision, so rows created in the same
+second still list in creation order.
+"""
+import base64
+import datetime
+import json
+import os
+import queue
+import sqlite3
+from contextlib import contextmanager
+
+from preprocessing import DataPreprocessor
+from utils import generate_project_id
+
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS projects (
+        id TEXT PRIMARY KEY,
+        created_at TEXT NOT NULL,
+        area REAL NOT NULL,
+        floors TEXT NOT NULL,
+        num_floors INTEGER NOT NULL,
+        total_cost REAL NOT NULL,
+        duration_days INTEGER NOT NULL,
+        inputs TEXT NOT NULL,
+        result TEXT NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_projects_created ON projects (created_at, id)",
+    "CREATE INDEX IF NOT EXISTS idx_projects_area ON projects (area, id)",
+    "CREATE INDEX IF NOT EXISTS idx_projects_floors ON projects (num_floors, id)",
+    "CREATE INDEX IF NOT EXISTS idx_projects_cost ON projects (total_cost, id)"
+)
+
+# Listing sort keys -> indexed column
+SORT_COLUMNS = {"created_at": "created_at", "area": "area", "floors": "num_floors", "total_cost": "total_cost"}
+
+SUMMARY_COLUMNS = "id, created_at, area, floors, num_floors, total_cost, duration_days"
+
+INSERT = (
+    "INSERT INTO projects (id, created_at, area, floors, num_floors, total_cost, duration_days, inputs, result) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+class ProjectStore:
+    def __init__(self, path, pool_size=4, timeout=5.0):
+        self.path = path
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = self._connect()
+        try:
+            with conn:
+                for statement in SCHEMA:
+                    conn.execute(statement)
+        finally:
+            conn.close()
+        _stores.append(self)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL: durable across app crashes, one fsync per checkpoint instead of per commit
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def _row(self, project_id, created_at, inputs, response):
+        costs = response.get('costs', {})
+        return (
+            project_id,
+            created_at,
+            inputs['area'],
+            inputs['floors'],
+            DataPreprocessor.count_floors(inputs['floors']),
+            costs.get('total_project_cost', 0.0),
+            response.get('timeline', {}).get('duration_days', 0),
+            json.dumps(inputs),
+            json.dumps(response)
+        )
+
+    def save(self, inputs, response):
+        """
+        Stores one /api/calculate response under its project_id. On the rare id
+        collision a fresh id is written into the response. Returns the id used.
+        """
+        for _ in range(5):
+            row = self._row(response['project_id'], _created_at(), inputs, response)
+            try:
+                with self.connection() as conn:
+                    conn.execute(INSERT, row)
+                return response['project_id']
+            except sqlite3.IntegrityError:
+                response['project_id'] = generate_project_id()
+        raise sqlite3.IntegrityError("Could not allocate a unique project id")
+
+    def save_many(self, items):
+        """Bulk insert of (inputs, response) pairs in one transaction."""
+        created_at = _created_at()
+        rows = [self._row(response['project_id'], created_at, inputs, response) for inputs, response in items]
+        with self.connection() as conn:
+            conn.execute("BEGIN")
+            try:
+                conn.executemany(INSERT, rows)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def get_raw(self, project_id):
+        """Stored response as JSON text, or None."""
+        with self.connection() as conn:
+            row = conn.execute("SELECT result FROM projects WHERE id = ?", (project_id,)).fetchone()
+        return row["result"] if row else None
+
+    def list(self, limit=50, cursor=None, sort="created_at", descending=True,
+             min_area=None, max_area=None, floors=None, min_cost=None, max_cost=None):
+        """
+        One page of project summaries. Pages are keyset-paginated on (sort
+        column, id), so deep pages cost the same as the first. Returns
+        (rows, next_cursor); next_cursor is None on the last page.
+        """
+        column = SORT_COLUMNS.get(sort)
+        if column is None:
+            raise ValueError(f"sort must be one of: {', '.join(SORT_COLUMNS)}")
+
+        clauses, params = [], []
+        for sql, value in (
+            ("area >= ?", min_area), ("area <= ?", max_area), ("num_floors = ?", floors),
+            ("total_cost >= ?", min_cost), ("total_cost <= ?", max_cost)
+        ):
+            if value is not None:
+                clauses.append(sql)
+                params.append(value)
+        if cursor:
+            value, last_id = _decode_cursor(cursor)
+            clauses.append(f"({column}, id) {'<' if descending else '>'} (?, ?)")
+            params.extend([value, last_id])
+
+        direction = "DESC" if descending else "ASC"
+        sql = f"SELECT {SUMMARY_COLUMNS} FROM projects"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {column} {direction}, id {direction} LIMIT ?"
+        params.append(limit + 1)
+
+        with self.connection() as conn:
+            rows = [dict(row) for row in conn.execute(sql, params).fetchall()]
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_cursor(rows[-1][column], rows[-1]["id"])
+        return rows, next_cursor
+
+    def count(self):
+        with self.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM projects").fetchone()[0]
+
+    def _reset_after_fork(self):
+        # Never use a parent's SQLite handles in a child; drop them without closing
+        self._pool = queue.LifoQueue(maxsize=self.pool_size)
+
+
+def _encode_cursor(value, project_id):
+    """Opaque, URL-safe page token holding the last row's sort value and id."""
+    return base64.urlsafe_b64encode(json.dumps([value, project_id]).encode()).decode()
+
+
+def _decode_cursor(cursor):
+    try:
+        value, project_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    # Only what _encode_cursor writes may reach the query parameters
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)) or not isinstance(project_id, str):
+        raise ValueError("Invalid cursor")
+    return value, project_id
+
+
+def _created_at():
+    return datetime.datetime.now().isoformat(timespec='microseconds')
+
+
+_stores = []
+
+
+def _after_fork_in_child():
+    for store in _stores:
+        store._reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,308 @@
+"""
+Daily material rate series per region, for pricing each schedule phase at
+the rates of the dates it runs.
+
+The series live in one binary file: an 8-byte magic, a JSON header (first
+date, day count, regions, materials) and a float64 array of shape
+(regions, materials, days + 1) holding running sums of the daily rates.
+The file is memory-mapped, so opening it reads only the header, and pages
+are loaded as lookups touch them. With running sums the average rate over
+any date window is two reads, whatever its length, and a batch of projects
+is priced with a few array gathers.
+
+Windows that run past the last date use the last known rate (a flat
+forecast); windows that start before the first date or after the last one
+are an error.
+
+    python rate_history.py build rates.csv data/rate_history.bin
+    python rate_history.py synth data/rate_history.bin --regions 50 --years 10
+    python rate_history.py info data/rate_history.bin
+"""
+import argparse
+import csv
+import datetime
+import json
+import os
+import struct
+import threading
+
+import numpy as np
+
+from config import Config
+from schedule_service import ScheduleService
+
+
+MAGIC = b"RHST0001"
+ALIGNMENT = 64
+MATERIALS = ("steel_per_ton", "cement_per_bag", "sand_per_ton")
+
+PHASE_NAMES = [phase["name"] for phase in ScheduleService.PHASES]
+PHASE_WEIGHTS = np.array([phase["weight"] for phase in ScheduleService.PHASES])
+PHASE_OFFSETS = np.concatenate(([0.0], np.cumsum(PHASE_WEIGHTS)))
+
+# Share of each material bought in each phase (rows follow ScheduleService.PHASES)
+PHASE_MATERIAL_SHARES = np.array([
+    # steel, cement, sand
+    [0.00, 0.00, 0.05],  # Site Preparation
+    [0.25, 0.30, 0.25],  # Foundation Work
+    [0.65, 0.40, 0.30],  # Structure Development
+    [0.05, 0.25, 0.30],  # Brickwork & Plastering
+    [0.05, 0.05, 0.10]   # Finishing
+])
+
+
+def _parse_date(value):
+    if isinstance(value, datetime.date):
+        return value
+    try:
+        return datetime.date.fromisoformat(str(value))
+    except ValueError:
+        raise ValueError(f"Invalid date '{value}'; expected YYYY-MM-DD")
+
+
+class RateHistory:
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a rate history file")
+            (header_length,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(header_length))
+        self.start_date = _parse_date(header['start_date'])
+        self.days = header['days']
+        self.regions = header['regions']
+        self.materials = tuple(header['materials'])
+        self._region_index = {region: i for i, region in enumerate(self.regions)}
+        self._material_index = [self.materials.index(m) for m in MATERIALS]
+        self._sums = np.memmap(
+            path, dtype="<f8", mode="r", offset=header['data_offset'],
+            shape=(len(self.regions), len(self.materials), self.days + 1)
+        )
+
+    @property
+    def end_date(self):
+        return self.start_date + datetime.timedelta(days=self.days - 1)
+
+    def region_index(self, region):
+        try:
+            return self._region_index[region]
+        except KeyError:
+            raise ValueError(f"Unknown region '{region}'")
+
+    def day_index(self, date):
+        index = (_parse_date(date) - self.start_date).days
+        if index < 0:
+            raise ValueError(f"No rates before {self.start_date.isoformat()}")
+        if index >= self.days:
+            raise ValueError(f"No rates after {self.end_date.isoformat()}")
+        return index
+
+    def window_average(self, region_idx, material_idx, start, end):
+        """
+        Mean daily rate over the day windows [start, end), elementwise. All
+        arguments are integer arrays of one shape; end must exceed start.
+        """
+        last = self.days
+        inside_start = np.minimum(start, last)
+        inside_end = np.minimum(end, last)
+        total = self._sums[region_idx, material_idx, inside_end] - self._sums[region_idx, material_idx, inside_start]
+        # Days past the end of the series are priced at the last daily rate
+        beyond = end - np.maximum(start, last)
+        if np.any(beyond > 0):
+            last_rate = self._sums[region_idx, material_idx, last] - self._sums[region_idx, material_idx, last - 1]
+            total = total + np.maximum(beyond, 0) * last_rate
+        return total / (end - start)
+
+    def phase_rates(self, start_days, durations, region_indices):
+        """
+        Average rate of each material in each phase window, for many projects.
+        Returns an array of shape (projects, phases, materials). Raises
+        ValueError for a start day outside the series or a duration below
+        one day, which would otherwise index the sums from the end.
+        """
+        start_days = np.asarray(start_days, dtype=np.int64)
+        durations = np.asarray(durations, dtype=np.int64)
+        region_indices = np.asarray(region_indices, dtype=np.int64)
+        if np.any((start_days < 0) | (start_days >= self.days)):
+            raise ValueError(f"Start dates must fall between {self.start_date.isoformat()} and {self.end_date.isoformat()}")
+        if np.any(durations < 1):
+            raise ValueError("Durations must be at least 1 day")
+
+        # Phase boundaries in days; every phase spans at least one day
+        bounds = start_days[:, None] + np.round(durations[:, None] * PHASE_OFFSETS[None, :]).astype(np.int64)
+        starts = bounds[:, :-1]
+        ends = np.maximum(bounds[:, 1:], starts + 1)
+
+        n, phases = starts.shape
+        materials = np.array(self._material_index)
+        shape = (n, phases, len(materials))
+        return self.window_average(
+            np.broadcast_to(region_indices[:, None, None], shape),
+            np.broadcast_to(materials[None, None, :], shape),
+            np.broadcast_to(starts[:, :, None], shape),
+            np.broadcast_to(ends[:, :, None], shape)
+        )
+
+    @staticmethod
+    def weighted_rates(per_phase):
+        """
+        One rate per material from phase_rates() output: the phase averages
+        weighted by how much of the material each phase uses.
+        """
+        return (per_phase * PHASE_MATERIAL_SHARES).sum(axis=-2) / PHASE_MATERIAL_SHARES.sum(axis=0)
+
+    def effective_rates(self, start_date, duration_days, region):
+        """
+        Per-unit rates for one project over its phases. Returns (rates dict in
+        RateTable field names, per-phase rate list).
+        """
+        per_phase = self.phase_rates(
+            [self.day_index(start_date)], [int(duration_days)], [self.region_index(region)]
+        )[0]
+        weighted = self.weighted_rates(per_phase)
+        start = _parse_date(start_date)
+        phases = []
+        for i, name in enumerate(PHASE_NAMES):
+            phase_start = start + datetime.timedelta(days=int(round(duration_days * PHASE_OFFSETS[i])))
+            phases.append({
+                "phase_name": name,
+                "start_date": phase_start.isoformat(),
+                "rates": {m: round(float(v), 2) for m, v in zip(MATERIALS, per_phase[i])}
+            })
+        return {m: float(v) for m, v in zip(MATERIALS, weighted)}, phases
+
+    def info(self):
+        return {
+            "path": self.path,
+            "start_date": self.start_date.isoformat(),
+            "end_date": self.end_date.isoformat(),
+            "days": self.days,
+            "regions": len(self.regions),
+            "materials": list(self.materials),
+            "bytes": os.path.getsize(self.path)
+        }
+
+
+def write_history(path, start_date, regions, daily_rates):
+    """
+    Writes a history file. daily_rates has shape (regions, len(MATERIALS),
+    days) and holds every material's rate for every day, in MATERIALS order.
+    """
+    daily_rates = np.asarray(daily_rates, dtype=np.float64)
+    if daily_rates.shape[:2] != (len(regions), len(MATERIALS)):
+        raise ValueError("daily_rates must have shape (regions, materials, days)")
+    if not np.all(np.isfinite(daily_rates)):
+        raise ValueError("daily_rates has missing values")
+
+    sums = np.zeros(daily_rates.shape[:2] + (daily_rates.shape[2] + 1,), dtype="<f8")
+    np.cumsum(daily_rates, axis=2, out=sums[:, :, 1:])
+
+    header = {
+        "start_date": _parse_date(start_date).isoformat(),
+        "days": int(daily_rates.shape[2]),
+        "regions": list(regions),
+        "materials": list(MATERIALS)
+    }
+    # The data offset is part of the header; repeat until it stops changing
+    header["data_offset"] = 0
+    while True:
+        encoded = json.dumps(header).encode()
+        offset = -(-(len(MAGIC) + 4 + len(encoded)) // ALIGNMENT) * ALIGNMENT
+        if offset == header["data_offset"]:
+            break
+        header["data_offset"] = offset
+    padding = offset - len(MAGIC) - 4 - len(encoded)
+
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(encoded) + padding))
+        f.write(encoded + b" " * padding)
+        f.write(sums.tobytes())
+    os.replace(tmp_path, path)
+    return header
+
+
+def build_from_csv(csv_path, out_path):
+    """
+    CSV with columns date, region, steel_per_ton, cement_per_bag, sand_per_ton.
+    Days missing for a region carry the previous day's rates forward.
+    """
+    rows = {}
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            rows[(row['region'], _parse_date(row['date']))] = [float(row[m]) for m in MATERIALS]
+    if not rows:
+        raise ValueError(f"{csv_path} has no rows")
+
+    regions = sorted({region for region, _ in rows})
+    start = min(date for _, date in rows)
+    days = (max(date for _, date in rows) - start).days + 1
+    daily_rates = np.full((len(regions), len(MATERIALS), days), np.nan)
+    for (region, date), values in rows.items():
+        daily_rates[regions.index(region), :, (date - start).days] = values
+
+    for r, region in enumerate(regions):
+        series = daily_rates[r]
+        if np.isnan(series[:, 0]).any():
+            raise ValueError(f"Region '{region}' has no rates on the first date {start.isoformat()}")
+        # Forward fill along the day axis
+        valid = np.where(~np.isnan(series), np.arange(days)[None, :], 0)
+        np.maximum.accumulate(valid, axis=1, out=valid)
+        daily_rates[r] = np.take_along_axis(series, valid, axis=1)
+    return write_history(out_path, start, regions, daily_rates)
+
+
+def synthesize(out_path, regions=10, years=5, start_date="2022-01-01", seed=7):
+    """Random-walk rates around the Config rates, for demos and benchmarks."""
+    rng = np.random.default_rng(seed)
+    days = int(years * 365)
+    base = np.array([Config.RATE_STEEL_PER_TON, Config.RATE_CEMENT_PER_BAG, Config.RATE_SAND_PER_TON], dtype=np.float64)
+    drift = rng.normal(0.00015, 0.00005, size=(regions, len(MATERIALS), 1))
+    steps = rng.normal(0, 0.004, size=(regions, len(MATERIALS), days)) + drift
+    level = rng.uniform(0.9, 1.1, size=(regions, len(MATERIALS), 1))
+    daily_rates = base[None, :, None] * level * np.exp(np.cumsum(steps, axis=2))
+    names = [f"region-{i:03d}" for i in range(regions)]
+    return write_history(out_path, start_date, names, daily_rates)
+
+
+_shared_history = None
+_shared_lock = threading.Lock()
+
+
+def get_rate_history():
+    """The history at Config.RATE_HISTORY_PATH, opened on first use, or None."""
+    global _shared_history
+    if not Config.RATE_HISTORY_PATH:
+        return None
+    with _shared_lock:
+        if _shared_history is None:
+            _shared_history = RateHistory(Config.RATE_HISTORY_PATH)
+        return _shared_history
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build and inspect material rate history files")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="convert a CSV of daily rates")
+    build.add_argument('csv')
+    build.add_argument('output')
+    synth = commands.add_parser('synth', help="write a synthetic random-walk history")
+    synth.add_argument('output')
+    synth.add_argument('--regions', type=int, default=10)
+    synth.add_argument('--years', type=float, default=5)
+    synth.add_argument('--start-date', default="2022-01-01")
+    show = commands.add_parser('info', help="print a file's header")
+    show.add_argument('path')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        build_from_csv(args.csv, args.output)
+        print(json.dumps(RateHistory(args.output).info(), indent=2))
+    elif args.command == 'synth':
+        synthesize(args.output, args.regions, args.years, args.start_date)
+        print(json.dumps(RateHistory(args.output).info(), indent=2))
+    else:
+        print(json.dumps(RateHistory(args.path).info(), indent=2))
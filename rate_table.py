@@ -0,0 +1,137 @@
+"""
+Single source for every rate and thumb-rule coefficient used by the estimators.
+
+The table is built once from Config (optionally overridden by a JSON file at
+Config.RATE_TABLE_PATH) and is immutable. Repricing means building a new
+table and swapping it in with set_current() or reload(); readers take the
+current table once per call and use plain slot attributes after that.
+"""
+import hashlib
+import json
+import threading
+
+import numpy as np
+
+from config import Config
+
+
+RATE_FIELDS = (
+    # Material rates (INR)
+    "steel_per_ton",
+    "cement_per_bag",
+    "sand_per_ton",
+    # Thumb rules used by ConstructionCalculator (per sq yard of construction)
+    "steel_kg_per_sq_yard",
+    "cement_bags_per_sq_yard",
+    "sand_tons_per_sq_yard",
+    "water_liters_per_sq_yard",
+    # Calibrated planning coefficients used by ResourceService (per sq yard)
+    "plan_steel_tons_per_sq_yard",
+    "plan_cement_bags_per_sq_yard",
+    "plan_sand_tons_per_sq_yard",
+    "plan_water_liters_per_sq_yard",
+    # Labor and schedule
+    "man_days_per_sq_yard",
+    "default_construction_days",
+    "base_schedule_days",
+    "schedule_days_per_floor",
+    # Cost defaults
+    "overhead_rate",
+    "default_daily_wage",
+    "default_cost_per_sq_yard"
+)
+
+
+class RateTable:
+    __slots__ = RATE_FIELDS + ("version", "_vector")
+
+    def __init__(self, **values):
+        missing = set(RATE_FIELDS) - set(values)
+        unknown = set(values) - set(RATE_FIELDS)
+        if missing or unknown:
+            raise ValueError(
+                f"Rate table fields missing: {sorted(missing)}, unknown: {sorted(unknown)}"
+            )
+        for name in RATE_FIELDS:
+            value = values[name]
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f"Rate table field '{name}' must be a number")
+            # ints stay ints so day counts and defaults keep their JSON type
+            object.__setattr__(self, name, value)
+
+        vector = np.array([values[name] for name in RATE_FIELDS], dtype=np.float64)
+        vector.setflags(write=False)
+        object.__setattr__(self, "_vector", vector)
+        # Short content hash; cached results are keyed on it
+        object.__setattr__(self, "version", hashlib.sha256(vector.tobytes()).hexdigest()[:12])
+
+    def __setattr__(self, name, value):
+        raise AttributeError("RateTable is immutable; build a new table and swap it in")
+
+    @classmethod
+    def from_config(cls):
+        return cls(
+            steel_per_ton=Config.RATE_STEEL_PER_TON,
+            cement_per_bag=Config.RATE_CEMENT_PER_BAG,
+            sand_per_ton=Config.RATE_SAND_PER_TON,
+            steel_kg_per_sq_yard=Config.QTY_STEEL_PER_SQ_YARD,
+            cement_bags_per_sq_yard=Config.QTY_CEMENT_PER_SQ_YARD,
+            sand_tons_per_sq_yard=Config.QTY_SAND_PER_SQ_YARD,
+            water_liters_per_sq_yard=Config.QTY_WATER_PER_SQ_YARD,
+            plan_steel_tons_per_sq_yard=0.0035,
+            plan_cement_bags_per_sq_yard=0.4,
+            plan_sand_tons_per_sq_yard=0.6,
+            plan_water_liters_per_sq_yard=500,
+            man_days_per_sq_yard=0.5,
+            default_construction_days=180,
+            base_schedule_days=60,
+            schedule_days_per_floor=24,
+            overhead_rate=Config.DEFAULT_OVERHEAD_PERCENTAGE / 100,
+            default_daily_wage=Config.DEFAULT_DAILY_WAGE,
+            default_cost_per_sq_yard=Config.DEFAULT_COST_PER_SQ_YARD
+        )
+
+    @classmethod
+    def from_file(cls, path):
+        """Config defaults, overridden by the fields present in a JSON file."""
+        with open(path, 'r', encoding='utf-8') as f:
+            overrides = json.load(f)
+        return cls.from_config().replace(**overrides)
+
+    def replace(self, **changes):
+        values = self.as_dict()
+        values.update(changes)
+        return RateTable(**values)
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in RATE_FIELDS}
+
+    def as_array(self):
+        """Read-only float64 vector in RATE_FIELDS order, for vectorized callers."""
+        return self._vector
+
+
+_current = None
+_swap_lock = threading.Lock()
+
+
+def current():
+    """The active rate table. Take it once per calculation."""
+    return _current
+
+
+def set_current(table):
+    global _current
+    with _swap_lock:
+        _current = table
+    return table
+
+
+def reload(path=None):
+    """Rebuilds the table from Config plus the override file and swaps it in."""
+    path = path or Config.RATE_TABLE_PATH
+    table = RateTable.from_file(path) if path else RateTable.from_config()
+    return set_current(table)
+
+
+reload()
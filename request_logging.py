@@ -0,0 +1,252 @@
+"""
+Structured, non-blocking logging with per-request traces.
+
+Records are put on a bounded queue by a QueueHandler and written as one
+JSON object per line by a QueueListener thread, so a request thread only
+pays for building the record. When the queue is full, records are dropped
+and counted instead of blocking.
+
+Every request gets a trace: an id (from the X-Request-Id header or newly
+generated, echoed in the response) and the timings of its stages. The
+trace lives in a context variable, so log records from the schedule,
+resource, cost and AI stages carry its id, as do records from work handed
+to the LLM pool (llm_client.spawn copies the context).
+
+A request summary is logged for a head-sampled LOG_SAMPLE_RATE share of
+requests, decided when the request starts. Requests slower than
+LOG_SLOW_REQUEST_MS are always logged, with their stage timings and
+inputs, to the "construction.slow" logger.
+"""
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+
+from flask import g, request
+
+from config import Config
+from metrics import STAGE_LATENCY
+
+
+_current_trace = contextvars.ContextVar("trace", default=None)
+
+access_logger = logging.getLogger("construction.access")
+slow_logger = logging.getLogger("construction.slow")
+
+
+class Trace:
+    __slots__ = ("trace_id", "sampled", "started", "stages")
+
+    def __init__(self, trace_id, sampled):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.started = time.perf_counter()
+        self.stages = []
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+def new_trace_id():
+    return os.urandom(8).hex()
+
+
+class _Stage:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.started
+        STAGE_LATENCY.observe(elapsed, stage=self.name)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.stages.append((self.name, elapsed))
+        return False
+
+
+def stage(name):
+    """Times a pipeline stage into STAGE_LATENCY and the current trace."""
+    return _Stage(name)
+
+
+class _TraceFilter(logging.Filter):
+    """Stamps records with the trace id while still on the logging thread."""
+
+    def filter(self, record):
+        trace = _current_trace.get()
+        record.trace_id = trace.trace_id if trace is not None else None
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "trace_id": getattr(record, "trace_id", None)
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Drops records when the queue is full, so logging never blocks a request."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # The base class formats the record here, folding the traceback into
+        # the message. Only merge msg and args; exc_info is kept for
+        # JSONFormatter on the listener thread to render as "exception".
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_handler = None
+_listener = None
+_lock = threading.Lock()
+_slow_lock = threading.Lock()
+_slow_requests = 0
+
+
+def setup_logging():
+    """Routes the root logger through the queue. Safe to call more than once."""
+    global _handler, _listener
+    with _lock:
+        if _handler is not None:
+            return
+        _handler = _DroppingQueueHandler(queue.Queue(Config.LOG_QUEUE_SIZE))
+        _handler.addFilter(_TraceFilter())
+        root = logging.getLogger()
+        root.addHandler(_handler)
+        root.setLevel(Config.LOG_LEVEL)
+        _listener = _start_listener(_handler.queue)
+        atexit.register(_stop_listener)
+
+
+def _start_listener(log_queue):
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JSONFormatter())
+    listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def _stop_listener():
+    # Flushes what is queued; called at interpreter exit
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+
+
+def _after_fork_in_child():
+    # The listener thread did not survive the fork; give the child its own
+    global _listener
+    if _handler is not None:
+        _handler.queue = queue.Queue(Config.LOG_QUEUE_SIZE)
+        _listener = _start_listener(_handler.queue)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def init_app(app):
+    """Starts a trace per request and logs sampled and slow requests."""
+    setup_logging()
+    header = Config.REQUEST_ID_HEADER
+
+    @app.before_request
+    def _start_trace():
+        trace = Trace(
+            request.headers.get(header) or new_trace_id(),
+            Config.LOG_SAMPLE_RATE > 0 and random.random() < Config.LOG_SAMPLE_RATE
+        )
+        g.trace_token = _current_trace.set(trace)
+
+    @app.after_request
+    def _finish_trace(response):
+        trace = _current_trace.get()
+        if trace is None:
+            return response
+        response.headers[header] = trace.trace_id
+        duration_ms = (time.perf_counter() - trace.started) * 1000
+        slow = duration_ms >= Config.LOG_SLOW_REQUEST_MS
+        if trace.sampled or slow:
+            _log_request(trace, response, duration_ms, slow)
+        return response
+
+    @app.teardown_request
+    def _end_trace(exc):
+        token = g.pop('trace_token', None)
+        if token is not None:
+            _current_trace.reset(token)
+
+
+def _log_request(trace, response, duration_ms, slow):
+    global _slow_requests
+    fields = {
+        "method": request.method,
+        "path": request.path,
+        "endpoint": request.endpoint,
+        "status": response.status_code,
+        "duration_ms": round(duration_ms, 3),
+        "stages_ms": [[name, round(elapsed * 1000, 3)] for name, elapsed in trace.stages]
+    }
+    if not slow:
+        access_logger.info("request", extra={"fields": fields})
+        return
+
+    with _slow_lock:
+        _slow_requests += 1
+    if request.args:
+        fields["query"] = request.args.to_dict()
+    if request.content_length and request.content_length > Config.LOG_SLOW_INPUT_BYTES:
+        fields["body_bytes"] = request.content_length
+    elif request.is_json:
+        fields["body"] = request.get_json(silent=True)
+    slow_logger.warning("slow request", extra={"fields": fields})
+
+
+def stats():
+    return {
+        "queued": _handler.queue.qsize() if _handler is not None else 0,
+        "dropped": _handler.dropped if _handler is not None else 0,
+        "slow_requests": _slow_requests,
+        "sample_rate": Config.LOG_SAMPLE_RATE,
+        "slow_request_ms": Config.LOG_SLOW_REQUEST_MS
+    }
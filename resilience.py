@@ -0,0 +1,177 @@
+"""
+Protection for the service and the model server behind it.
+
+CircuitBreaker: after failure_threshold consecutive failures the breaker
+opens, and callers are refused immediately instead of waiting out a
+connection timeout. While it is open, a background thread runs probe()
+every probe_interval seconds and closes the breaker on the first success.
+Requests never act as the trial call, so none of them pays for an
+unhealthy backend.
+
+RateLimiter: one token bucket per client id, refilled at rate tokens per
+second up to burst. The least recently seen clients are dropped once
+max_clients buckets exist.
+"""
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+
+
+class CircuitBreaker:
+    def __init__(self, name, probe, failure_threshold=3, probe_interval=5.0):
+        self.name = name
+        self.probe = probe
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._last_error = None
+        self._prober = None
+        self.trips = 0
+        self.short_circuited = 0
+        _breakers.add(self)
+
+    @property
+    def state(self):
+        return self._state
+
+    def allow(self):
+        """True if a call may go to the backend. Never blocks."""
+        if self._state == CLOSED:
+            return True
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            self.short_circuited += 1
+            # A forked child inherits an open breaker but not its probe thread
+            self._ensure_prober()
+            return False
+
+    def record_success(self):
+        if self._state == CLOSED and self._failures == 0:
+            return
+        with self._lock:
+            self._close()
+
+    def record_failure(self, error=None):
+        with self._lock:
+            self._failures += 1
+            self._last_error = str(error) if error is not None else None
+            if self._state == CLOSED and self._failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = time.time()
+                self.trips += 1
+                logger.warning(
+                    "Circuit '%s' opened after %d consecutive failures (%s)", self.name, self._failures, self._last_error
+                )
+                self._ensure_prober()
+
+    def _close(self):
+        if self._state == OPEN:
+            logger.info("Circuit '%s' closed; backend is healthy again", self.name)
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = None
+
+    def _ensure_prober(self):
+        if self._prober is None or not self._prober.is_alive():
+            self._prober = threading.Thread(target=self._probe_loop, name=f"probe-{self.name}", daemon=True)
+            self._prober.start()
+
+    def _probe_loop(self):
+        while self._state == OPEN:
+            time.sleep(self.probe_interval)
+            try:
+                healthy = self.probe()
+            except Exception as e:
+                healthy = False
+                with self._lock:
+                    self._last_error = str(e)
+            if healthy:
+                with self._lock:
+                    self._close()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "failure_threshold": self.failure_threshold,
+                "open_seconds": round(time.time() - self._opened_at, 1) if self._opened_at else 0.0,
+                "trips": self.trips,
+                "short_circuited": self.short_circuited,
+                "last_error": self._last_error
+            }
+
+    def _reset_after_fork(self):
+        self._lock = threading.Lock()
+        self._prober = None
+
+
+class RateLimiter:
+    def __init__(self, rate, burst, max_clients=10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()  # client -> [tokens, updated_at]
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    @property
+    def enabled(self):
+        return self.rate > 0
+
+    def acquire(self, client):
+        """Takes one token for client. Returns (allowed, seconds until the next token)."""
+        if not self.enabled:
+            return True, 0.0
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                bucket = self._buckets[client] = [float(self.burst), now]
+                while len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client)
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return True, 0.0
+            self.rejected += 1
+            return False, (1 - bucket[0]) / self.rate
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "rate_per_second": self.rate,
+                "burst": self.burst,
+                "clients": len(self._buckets),
+                "rejected": self.rejected
+            }
+
+
+_breakers = weakref.WeakSet()
+
+
+def _after_fork_in_child():
+    for breaker in _breakers:
+        breaker._reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -1,20 +1,18 @@
 import math
 
+import rate_table
+from preprocessing import DataPreprocessor
+
 class ResourceService:
     def calculate_materials(self, built_up_area, floors):
         """
         Estimates material quantities using civil engineering thumb rules 
         adjusted to match the output examples in the PDF.
         """
+        rates = rate_table.current()
+
         # Clean floor input (e.g., "G+2" -> 3 floors)
-        num_floors = 1
-        if isinstance(floors, str) and "G+" in floors.upper():
-            try:
-                num_floors = int(floors.upper().split('+')[1]) + 1
-            except:
-                num_floors = 1
-        elif isinstance(floors, int):
-            num_floors = floors
+        num_floors = DataPreprocessor.count_floors(floors)
 
         # Total Construction Area (Area * Floors)
         total_area = built_up_area * num_floors
@@ -24,16 +22,16 @@ class ResourceService:
         
         # Steel: approx 3.5 to 4 kg per sq yard per floor? 
         # Logic: 10.5 tons / 3 floors = 3.5 tons per floor. 
-        steel_tons = (total_area * 0.0035) 
+        steel_tons = (total_area * rates.plan_steel_tons_per_sq_yard) 
         
         # Cement: approx 0.4 bags per sq yard per floor
-        cement_bags = int(total_area * 0.4)
+        cement_bags = int(total_area * rates.plan_cement_bags_per_sq_yard)
         
         # Sand: approx 0.6 tons per sq yard per floor
-        sand_tons = total_area * 0.6
+        sand_tons = total_area * rates.plan_sand_tons_per_sq_yard
         
         # Water: approx 500 liters per sq yard
-        water_liters = total_area * 500
+        water_liters = total_area * rates.plan_water_liters_per_sq_yard
 
         return {
             "steel_tons": round(steel_tons, 1),
@@ -49,11 +47,12 @@ class ResourceService:
         # Rule of thumb: ~0.05 to 0.1 worker-days per sq foot approx.
         # Simple logic: Area / 20 = Total Man Days required?
         
-        total_man_days = int(built_up_area * 0.5) # Heuristic for calculation
+        rates = rate_table.current()
+        total_man_days = int(built_up_area * rates.man_days_per_sq_yard) # Heuristic for calculation
         
         # If days are not provided, estimate them
         if not construction_days:
-            construction_days = 180 # Default 6 months
+            construction_days = rates.default_construction_days # Default 6 months
             
         avg_workers_per_day = math.ceil(total_man_days / construction_days)
         
@@ -0,0 +1,170 @@
+"""
+Monte Carlo cost risk for the /api/calculate cost model.
+
+CostService gives one number per project. Here the inputs that actually
+vary on site are sampled instead:
+
+- steel, cement and sand rates, which move the material cost through a
+  price index weighted the way ConstructionCalculator prices a sq yard
+  (its "other" materials are half of those three, so they move with them)
+- labor productivity, which scales the man-days
+- the daily wage
+
+Each one is a triangular multiplier (low, mode, high) around the point
+estimate. Every project's total is linear in two sampled vectors, the
+material index and the labor factor. Those vectors are drawn once per
+(seed, draws, distributions) and shared across projects (common random
+numbers), so a batch costs one multiply-add and one percentile pass per
+project, and a project's result is the same alone or in any batch.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+import rate_table
+from config import Config
+
+
+# (low, mode, high) multipliers on the point-estimate value
+DEFAULT_DISTRIBUTIONS = {
+    "steel_rate": (0.85, 1.0, 1.30),
+    "cement_rate": (0.90, 1.0, 1.20),
+    "sand_rate": (0.85, 1.0, 1.35),
+    "productivity": (0.90, 1.0, 1.35),  # > 1 means more man-days than planned
+    "daily_wage": (0.95, 1.0, 1.15)
+}
+
+PERCENTILES = (50, 80, 95)
+
+
+def _parse_distributions(overrides):
+    """Defaults updated with {"name": [low, mode, high]}; raises ValueError."""
+    distributions = dict(DEFAULT_DISTRIBUTIONS)
+    if overrides is None:
+        overrides = {}
+    if not isinstance(overrides, dict):
+        raise ValueError("'distributions' must be an object of {name: [low, mode, high]}")
+    for name, value in overrides.items():
+        if name not in DEFAULT_DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution '{name}'; expected one of: {', '.join(DEFAULT_DISTRIBUTIONS)}")
+        try:
+            if not isinstance(value, (list, tuple)):
+                raise TypeError
+            low, mode, high = (float(v) for v in value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Distribution '{name}' must be [low, mode, high]")
+        if not all(np.isfinite((low, mode, high))) or not 0 < low <= mode <= high or low == high:
+            raise ValueError(f"Distribution '{name}' needs finite 0 < low <= mode <= high and low < high")
+        distributions[name] = (low, mode, high)
+    return tuple(sorted(distributions.items()))
+
+
+def _material_weights(rates):
+    """Share of a sq yard's steel/cement/sand cost taken by each, at current rates."""
+    costs = np.array([
+        rates.steel_kg_per_sq_yard / 1000 * rates.steel_per_ton,
+        rates.cement_bags_per_sq_yard * rates.cement_per_bag,
+        rates.sand_tons_per_sq_yard * rates.sand_per_ton
+    ])
+    return costs / costs.sum()
+
+
+@lru_cache(maxsize=4)
+def _draws(seed, draws, distributions, weights):
+    """
+    The shared sample: (material index, labor factor), each of length draws.
+    Cached because a batch, and repeated requests with the same seed, reuse it.
+    """
+    rng = np.random.default_rng(seed)
+    params = dict(distributions)
+    sample = {name: rng.triangular(*params[name], size=draws) for name in sorted(params)}
+    material_index = (
+        weights[0] * sample["steel_rate"]
+        + weights[1] * sample["cement_rate"]
+        + weights[2] * sample["sand_rate"]
+    )
+    labor_factor = sample["productivity"] * sample["daily_wage"]
+    material_index.setflags(write=False)
+    labor_factor.setflags(write=False)
+    return material_index, labor_factor
+
+
+class RiskService:
+    def __init__(self, estimation_engine):
+        self.engine = estimation_engine
+
+    def simulate(self, normalized, draws=None, seed=None, bins=None, distributions=None):
+        """Risk profile for one project from DataPreprocessor.normalize_project."""
+        return self.simulate_many([normalized], draws, seed, bins, distributions)[0]
+
+    def simulate_many(self, normalized, draws=None, seed=None, bins=None, distributions=None):
+        """
+        One risk profile per normalized project: total cost percentiles, a
+        histogram, the component percentiles and the probability of staying
+        within the point estimate. Raises ValueError for invalid options.
+        """
+        draws = Config.RISK_DRAWS if draws is None else int(draws)
+        seed = Config.RISK_SEED if seed is None else int(seed)
+        bins = Config.RISK_HISTOGRAM_BINS if bins is None else int(bins)
+        if not 1000 <= draws <= Config.RISK_MAX_DRAWS:
+            raise ValueError(f"draws must be between 1000 and {Config.RISK_MAX_DRAWS}")
+        if not 1 <= bins <= 200:
+            raise ValueError("bins must be between 1 and 200")
+
+        rates = rate_table.current()
+        weights = tuple(_material_weights(rates).tolist())
+        material_index, labor_factor = _draws(seed, draws, _parse_distributions(distributions), weights)
+
+        # Point estimates, exactly as /api/calculate computes them
+        inputs = self.engine.columns_from_inputs(normalized)
+        point = self.engine.estimate(inputs, rates)
+        overhead = 1 + rates.overhead_rate
+
+        # Each component is its factor times a positive constant, so its
+        # percentiles are the factor's percentiles scaled; only the total
+        # needs a pass per project
+        material_quantiles = np.percentile(material_index, PERCENTILES)
+        labor_quantiles = np.percentile(labor_factor, PERCENTILES)
+
+        results = []
+        total = np.empty(draws)
+        for i in range(len(normalized)):
+            material_cost = float(point['material_cost'][i])
+            labor_cost = float(point['labor_cost'][i])
+            point_total = float(point['total_project_cost'][i])
+
+            np.multiply(material_index, material_cost * overhead, out=total)
+            total += labor_factor * (labor_cost * overhead)
+
+            quantiles = np.percentile(total, PERCENTILES)
+            counts, edges = np.histogram(total, bins=bins)
+            results.append({
+                "point_estimate": round(point_total, 2),
+                "mean": round(float(total.mean()), 2),
+                "std": round(float(total.std()), 2),
+                "percentiles": self._percentiles(quantiles),
+                "contingency_p80": round(float(quantiles[PERCENTILES.index(80)]) - point_total, 2),
+                "probability_within_estimate": round(np.count_nonzero(total <= point_total) / draws, 4),
+                "components": {
+                    "material_cost": self._percentiles(material_quantiles * material_cost),
+                    "labor_cost": self._percentiles(labor_quantiles * labor_cost)
+                },
+                "histogram": {
+                    "bin_edges": [round(edge, 2) for edge in edges.tolist()],
+                    "counts": counts.tolist()
+                }
+            })
+        return results
+
+    @staticmethod
+    def _percentiles(quantiles):
+        return {f"p{p}": round(v, 2) for p, v in zip(PERCENTILES, quantiles.tolist())}
+
+    @staticmethod
+    def settings(draws=None, seed=None, distributions=None):
+        """Echo of the sampling settings used, for the response."""
+        return {
+            "draws": Config.RISK_DRAWS if draws is None else int(draws),
+            "seed": Config.RISK_SEED if seed is None else int(seed),
+            "distributions": {name: list(params) for name, params in _parse_distributions(distributions)}
+        }
@@ -1,6 +1,18 @@
 import math
 
+import rate_table
+from preprocessing import DataPreprocessor
+
 class ScheduleService:
+    # Standard construction phases and their share of the total duration
+    PHASES = [
+        {"name": "Site Preparation", "weight": 0.10, "activities": ["Site Cleaning", "Soil Testing", "Marking"]},
+        {"name": "Foundation Work", "weight": 0.20, "activities": ["Excavation", "PCC Bedding", "Footing Concrete"]},
+        {"name": "Structure Development", "weight": 0.30, "activities": ["Column Raising", "Slab Casting", "Staircase"]},
+        {"name": "Brickwork & Plastering", "weight": 0.20, "activities": ["Wall Construction", "Internal Plastering", "External Plastering"]},
+        {"name": "Finishing", "weight": 0.20, "activities": ["Flooring", "Painting", "Electrical & Plumbing", "Final Cleanup"]}
+    ]
+
     def generate_schedule(self, built_up_area, floors, user_days=None):
         """
         Generates a week-by-week construction schedule.
@@ -11,37 +23,23 @@ class ScheduleService:
         else:
             # Heuristic: 1 day per 10 sq yards + 30 days per floor?
             # Simplified: Base 60 days + 30 days per floor
-            num_floors = 1
-            if isinstance(floors, str) and "G+" in floors.upper():
-                try:
-                    num_floors = int(floors.upper().split('+')[1]) + 1
-                except:
-                    pass
-            duration_days = 60 + (num_floors * 24) # e.g. G+2 = 60 + 72 = 132 days
+            rates = rate_table.current()
+            num_floors = DataPreprocessor.count_floors(floors)
+            duration_days = rates.base_schedule_days + (num_floors * rates.schedule_days_per_floor) # e.g. G+2 = 60 + 72 = 132 days
 
         duration_weeks = math.ceil(duration_days / 7)
         duration_months = round(duration_days / 30, 1)
 
-        # 2. Define Phases and allocate weeks
-        # We assume standard phases and distribute weeks proportionally
-        
-        phases = [
-            {"name": "Site Preparation", "weight": 0.10, "activities": ["Site Cleaning", "Soil Testing", "Marking"]},
-            {"name": "Foundation Work", "weight": 0.20, "activities": ["Excavation", "PCC Bedding", "Footing Concrete"]},
-            {"name": "Structure Development", "weight": 0.30, "activities": ["Column Raising", "Slab Casting", "Staircase"]},
-            {"name": "Brickwork & Plastering", "weight": 0.20, "activities": ["Wall Construction", "Internal Plastering", "External Plastering"]},
-            {"name": "Finishing", "weight": 0.20, "activities": ["Flooring", "Painting", "Electrical & Plumbing", "Final Cleanup"]}
-        ]
-
+        # 2. Allocate weeks to the standard phases
+        # Each phase starts at its cumulative share of the total, so the phase
+        # lengths add up to duration_weeks instead of losing the floored parts.
+        # Every phase still gets at least one week.
         construction_schedule = []
-        current_week = 1
+        elapsed_weight = 0.0
+        current_week = 0
         
-        for phase in phases:
-            phase_duration_weeks = max(1, math.floor(duration_weeks * phase["weight"]))
-            
-            # Add entry for this phase
-            # If a phase takes multiple weeks, we might list it once or expand it.
-            # Here we just map the start week.
+        for phase in self.PHASES:
+            current_week = max(current_week + 1, 1 + math.floor(round(duration_weeks * elapsed_weight, 9)))
             
             construction_schedule.append({
                 "week_number": current_week,
@@ -49,7 +47,7 @@ class ScheduleService:
                 "activities": phase["activities"]
             })
             
-            current_week += phase_duration_weeks
+            elapsed_weight += phase["weight"]
 
         return {
             "duration_days": duration_days,
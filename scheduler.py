@@ -0,0 +1,424 @@
+"""
+Activity-level scheduler: precedence network, critical path and resource
+leveling for one building or a whole portfolio.
+
+Each building expands into the activities of ScheduleService.PHASES. The
+structure and finishing trades repeat per floor, e.g. slab casting on floor
+k+1 waits for floor k's slab to cure. Work content comes from the same
+labour-intensity factor as ConstructionCalculator. Crew capacities come from
+its get_worker_distribution(), or from one shared pool for a portfolio.
+
+1. critical_path() does a forward/backward pass in topological order, with
+   resources unconstrained.
+2. level() runs a parallel schedule generation pass driven by a heap of
+   events. Activities are started in order of least late start, whenever their
+   trade has crew free. Every step is a heap operation, so thousands of
+   activities take milliseconds.
+"""
+import heapq
+import math
+from collections import deque
+from functools import lru_cache
+
+from blueprint_renderer import floor_name
+from config import Config
+from dependencies import ConstructionCalculator
+from preprocessing import DataPreprocessor
+
+
+ROLES = ("masons", "helpers", "steel_workers", "carpenters", "supervisors")
+
+# Days a slab cures before anything is built on it
+CURING_DAYS = 7
+
+# key, name, phase, role, share of the building's man-days, per floor, crew share,
+# predecessors as (key, relation, lag days). Relations: "same" floor, "prev" floor,
+# "first" (only floor 0 depends on a building-level activity), "all" floors.
+ACTIVITY_TEMPLATE = (
+    ("site_cleaning", "Site Cleaning", "Site Preparation", "helpers", 0.02, False, 1.0, ()),
+    ("soil_testing", "Soil Testing", "Site Preparation", "supervisors", 0.01, False, 1.0, (("site_cleaning", "same", 0),)),
+    ("marking", "Marking", "Site Preparation", "masons", 0.01, False, 1.0, (("soil_testing", "same", 0),)),
+    ("excavation", "Excavation", "Foundation Work", "helpers", 0.06, False, 1.0, (("marking", "same", 0),)),
+    ("pcc_bedding", "PCC Bedding", "Foundation Work", "masons", 0.04, False, 1.0, (("excavation", "same", 0),)),
+    ("footing_concrete", "Footing Concrete", "Foundation Work", "masons", 0.10, False, 1.0, (("pcc_bedding", "same", 0),)),
+    ("column_raising", "Column Raising", "Structure Development", "steel_workers", 0.10, True, 1.0,
+     (("footing_concrete", "first", CURING_DAYS), ("slab_casting", "prev", CURING_DAYS))),
+    ("slab_casting", "Slab Casting", "Structure Development", "carpenters", 0.12, True, 1.0, (("column_raising", "same", 0),)),
+    ("staircase", "Staircase", "Structure Development", "masons", 0.03, True, 0.5, (("slab_casting", "same", 0),)),
+    ("wall_construction", "Wall Construction", "Brickwork & Plastering", "masons", 0.14, True, 0.5,
+     (("slab_casting", "same", CURING_DAYS),)),
+    ("internal_plastering", "Internal Plastering", "Brickwork & Plastering", "masons", 0.08, True, 0.5,
+     (("wall_construction", "same", 0),)),
+    ("electrical_plumbing", "Electrical & Plumbing", "Finishing", "helpers", 0.06, True, 0.5, (("wall_construction", "same", 0),)),
+    ("external_plastering", "External Plastering", "Brickwork & Plastering", "masons", 0.05, False, 1.0,
+     (("wall_construction", "all", 0),)),
+    ("flooring", "Flooring", "Finishing", "masons", 0.08, True, 0.5,
+     (("internal_plastering", "same", 0), ("electrical_plumbing", "same", 0))),
+    ("painting", "Painting", "Finishing", "helpers", 0.07, True, 0.5, (("flooring", "same", 0),)),
+    ("final_cleanup", "Final Cleanup", "Finishing", "helpers", 0.03, False, 1.0,
+     (("painting", "all", 0), ("staircase", "all", 0), ("external_plastering", "same", 0)))
+)
+
+# Labour intensity used by ConstructionCalculator (man-days per sq yard of construction)
+MAN_DAYS_PER_SQ_YARD = 1.5
+
+# Activities per building: the building-level ones plus the per-floor ones for each floor
+BUILDING_ACTIVITIES = sum(1 for entry in ACTIVITY_TEMPLATE if not entry[5])
+FLOOR_ACTIVITIES = len(ACTIVITY_TEMPLATE) - BUILDING_ACTIVITIES
+
+
+class ActivityNetwork:
+    """Activities of one or more buildings, stored as parallel lists indexed by activity id."""
+
+    def __init__(self):
+        self.project = []
+        self.key = []
+        self.floor = []
+        self.duration = []
+        self.crew = []
+        self.resource = []
+        self.successors = []   # per activity: list of (successor id, lag)
+        self.pred_count = []
+        self.resources = []    # resource id -> (pool, role)
+        self.capacity = []     # resource id -> crew size
+        self._resource_ids = {}
+
+    def __len__(self):
+        return len(self.duration)
+
+    def add_resource(self, pool, role, capacity):
+        rid = self._resource_ids.get((pool, role))
+        if rid is None:
+            rid = self._resource_ids[(pool, role)] = len(self.resources)
+            self.resources.append((pool, role))
+            self.capacity.append(capacity)
+        return rid
+
+    def add_activity(self, project, key, floor, duration, crew, resource):
+        self.project.append(project)
+        self.key.append(key)
+        self.floor.append(floor)
+        self.duration.append(duration)
+        self.crew.append(crew)
+        self.resource.append(resource)
+        self.successors.append([])
+        self.pred_count.append(0)
+        return len(self.duration) - 1
+
+    def add_dependency(self, before, after, lag=0):
+        self.successors[before].append((after, lag))
+        self.pred_count[after] += 1
+
+    def topological_order(self):
+        remaining = list(self.pred_count)
+        queue = deque(i for i, count in enumerate(remaining) if count == 0)
+        order = []
+        while queue:
+            i = queue.popleft()
+            order.append(i)
+            for j, _ in self.successors[i]:
+                remaining[j] -= 1
+                if remaining[j] == 0:
+                    queue.append(j)
+        if len(order) != len(self.duration):
+            raise ValueError("Activity network has a dependency cycle")
+        return order
+
+
+class ScheduleEngine:
+    TEMPLATE = {entry[0]: entry for entry in ACTIVITY_TEMPLATE}
+
+    def build(self, projects, crews=None):
+        """
+        projects: dicts with built_up_area, floors and optional construction_days
+        and workers. crews: optional {role: size} pool shared by all buildings
+        (roles left out get the largest single building's crew); by default each
+        building has its own crew from get_worker_distribution(). Projects go
+        through DataPreprocessor.normalize_project. Raises ValueError for an
+        invalid project, crew sizes outside 1..MAX_CREW_SIZE or more than
+        MAX_SCHEDULE_ACTIVITIES activities.
+        """
+        calcs = []
+        for i, project in enumerate(projects):
+            try:
+                calcs.append(self._calculator(project))
+            except (ValueError, TypeError, AttributeError) as e:
+                raise ValueError(f"Project {i}: {e}")
+        activities = sum(BUILDING_ACTIVITIES + FLOOR_ACTIVITIES * max(calc.floors, 0) for calc in calcs)
+        if activities > Config.MAX_SCHEDULE_ACTIVITIES:
+            raise ValueError(
+                f"Schedule would have {activities} activities, above the limit of {Config.MAX_SCHEDULE_ACTIVITIES}"
+            )
+        distributions = [calc.get_worker_distribution() for calc in calcs]
+
+        network = ActivityNetwork()
+        shared = None
+        if crews:
+            if not isinstance(crews, dict):
+                raise ValueError("'crews' must be an object of {role: size}")
+            unknown = set(crews) - set(ROLES)
+            if unknown:
+                raise ValueError(f"Unknown crew roles: {', '.join(sorted(unknown))}")
+            sizes = {role: _crew_size(size, f"Crew size for {role}") for role, size in crews.items()}
+            shared = {
+                role: network.add_resource(
+                    "shared", role,
+                    sizes[role] if role in sizes else max(d[role] for d in distributions)
+                )
+                for role in ROLES
+            }
+
+        for index, (calc, distribution) in enumerate(zip(calcs, distributions)):
+            if shared is None:
+                resource_ids = {role: network.add_resource(index, role, distribution[role]) for role in ROLES}
+            else:
+                resource_ids = shared
+            self._add_building(network, index, calc, distribution, resource_ids)
+        return network
+
+    @staticmethod
+    def _calculator(project):
+        inputs = DataPreprocessor.normalize_project({"built_up_area": 100, **project})
+        if inputs['user_days'] is not None and inputs['user_days'] < 1:
+            raise ValueError("construction_days must be at least 1")
+        workers = project.get('workers')
+        return ConstructionCalculator(
+            inputs['area'],
+            inputs['floors'],
+            custom_days=inputs['user_days'],
+            custom_workers=_crew_size(workers, "workers") if workers is not None else None
+        )
+
+    def _add_building(self, network, project, calc, distribution, resource_ids):
+        floors = calc.floors
+        man_days = calc.total_construction_area * MAN_DAYS_PER_SQ_YARD
+        ids = {}
+
+        # 1. Activities with their crew (the building's own crew size, never more than the pool)
+        for key, _, _, role, share, per_floor, crew_share, _ in ACTIVITY_TEMPLATE:
+            rid = resource_ids[role]
+            crew = min(network.capacity[rid], max(1, math.ceil(distribution[role] * crew_share)))
+            work = man_days * share / (floors if per_floor else 1)
+            duration = max(1, math.ceil(work / crew))
+            for floor in (range(floors) if per_floor else (None,)):
+                ids[key, floor] = network.add_activity(project, key, floor, duration, crew, rid)
+
+        # 2. Precedence
+        for key, _, _, _, _, per_floor, _, predecessors in ACTIVITY_TEMPLATE:
+            for floor in (range(floors) if per_floor else (None,)):
+                after = ids[key, floor]
+                for pred_key, relation, lag in predecessors:
+                    pred_per_floor = self.TEMPLATE[pred_key][5]
+                    if relation == "same":
+                        before = [ids[pred_key, floor if pred_per_floor else None]]
+                    elif relation == "prev":
+                        before = [ids[pred_key, floor - 1]] if floor else []
+                    elif relation == "first":
+                        before = [ids[pred_key, None]] if floor == 0 else []
+                    else:
+                        before = [ids[pred_key, f] for f in range(floors)]
+                    for b in before:
+                        network.add_dependency(b, after, lag)
+
+    def critical_path(self, network):
+        """Early/late starts and total float with unlimited crews."""
+        order = network.topological_order()
+        duration = network.duration
+        successors = network.successors
+
+        early_start = [0] * len(network)
+        for i in order:
+            finish = early_start[i] + duration[i]
+            for j, lag in successors[i]:
+                if finish + lag > early_start[j]:
+                    early_start[j] = finish + lag
+
+        # Late finish is bounded by the end of the activity's own building
+        project_end = {}
+        for i, project in enumerate(network.project):
+            finish = early_start[i] + duration[i]
+            if finish > project_end.get(project, 0):
+                project_end[project] = finish
+
+        late_start = [0] * len(network)
+        for i in reversed(order):
+            late_finish = project_end[network.project[i]]
+            for j, lag in successors[i]:
+                if late_start[j] - lag < late_finish:
+                    late_finish = late_start[j] - lag
+            late_start[i] = late_finish - duration[i]
+
+        total_float = [ls - es for es, ls in zip(early_start, late_start)]
+        return early_start, late_start, total_float, project_end
+
+    def level(self, network, late_start):
+        """
+        Resource-constrained start days. An activity starts once its
+        predecessors (plus lags) are done and its trade has enough free crew;
+        among ready activities of a trade the smallest late start goes first.
+        """
+        duration = network.duration
+        crew = network.crew
+        resource = network.resource
+        successors = network.successors
+        available = list(network.capacity)
+        remaining = list(network.pred_count)
+        release = [0] * len(network)
+        start = [None] * len(network)
+        ready = [[] for _ in network.capacity]
+
+        # (time, kind, activity): kind 0 = finish (frees crew), 1 = precedence satisfied
+        events = [(0, 1, i) for i, count in enumerate(remaining) if count == 0]
+        heapq.heapify(events)
+        peak = [0] * len(available)
+
+        while events:
+            now = events[0][0]
+            touched = set()
+            while events and events[0][0] == now:
+                _, kind, i = heapq.heappop(events)
+                if kind == 0:
+                    available[resource[i]] += crew[i]
+                    touched.add(resource[i])
+                    for j, lag in successors[i]:
+                        if now + lag > release[j]:
+                            release[j] = now + lag
+                        remaining[j] -= 1
+                        if remaining[j] == 0:
+                            heapq.heappush(events, (release[j], 1, j))
+                else:
+                    heapq.heappush(ready[resource[i]], (late_start[i], i))
+                    touched.add(resource[i])
+
+            for rid in touched:
+                queue = ready[rid]
+                while queue and crew[queue[0][1]] <= available[rid]:
+                    _, i = heapq.heappop(queue)
+                    start[i] = now
+                    available[rid] -= crew[i]
+                    heapq.heappush(events, (now + duration[i], 0, i))
+                used = network.capacity[rid] - available[rid]
+                if used > peak[rid]:
+                    peak[rid] = used
+
+        return start, peak
+
+    def schedule(self, projects, crews=None):
+        """Builds the network, computes the critical path and levels resources."""
+        network = self.build(projects, crews)
+        early_start, late_start, total_float, project_end = self.critical_path(network)
+        start, peak = self.level(network, late_start)
+        return network, {
+            "early_start": early_start,
+            "late_start": late_start,
+            "total_float": total_float,
+            "project_end": project_end,
+            "start": start,
+            "peak": peak
+        }
+
+    def to_response(self, network, result, include_activities=True):
+        """JSON-ready summary per building and per crew, optionally with every activity."""
+        duration = network.duration
+        start = result['start']
+        total_float = result['total_float']
+
+        projects = {}
+        for i, project in enumerate(network.project):
+            summary = projects.get(project)
+            if summary is None:
+                summary = projects[project] = {
+                    "project": project,
+                    "critical_path_days": result['project_end'][project],
+                    "start_day": start[i],
+                    "finish_day": 0,
+                    "critical_path": []
+                }
+            summary["start_day"] = min(summary["start_day"], start[i])
+            summary["finish_day"] = max(summary["finish_day"], start[i] + duration[i])
+            if total_float[i] == 0:
+                summary["critical_path"].append(i)
+        for summary in projects.values():
+            critical = sorted(summary["critical_path"], key=lambda i: (result['early_start'][i], i))
+            summary["critical_path"] = [self._label(network, i) for i in critical]
+            summary["leveled_days"] = summary["finish_day"] - summary["start_day"]
+            summary["delay_days"] = summary["leveled_days"] - summary["critical_path_days"]
+
+        makespan = max((s + d for s, d in zip(start, duration)), default=0)
+        # Utilization is measured over the span in which the crew has work
+        busy = [0] * len(network.resources)
+        first = [makespan] * len(network.resources)
+        last = [0] * len(network.resources)
+        for s, crew, dur, rid in zip(start, network.crew, duration, network.resource):
+            busy[rid] += crew * dur
+            first[rid] = min(first[rid], s)
+            last[rid] = max(last[rid], s + dur)
+        crews = []
+        for rid, (pool, role) in enumerate(network.resources):
+            capacity = network.capacity[rid]
+            span = last[rid] - first[rid]
+            crews.append({
+                "pool": pool,
+                "role": role,
+                "capacity": capacity,
+                "peak": result['peak'][rid],
+                "utilization": round(busy[rid] / (capacity * span), 3) if span > 0 else 0.0
+            })
+
+        response = {
+            "activity_count": len(network),
+            "makespan_days": makespan,
+            "makespan_weeks": math.ceil(makespan / 7),
+            "projects": list(projects.values()),
+            "crews": crews
+        }
+        if include_activities:
+            response["activities"] = [
+                {
+                    "id": i,
+                    "project": network.project[i],
+                    "name": self._label(network, i),
+                    "phase": self.TEMPLATE[network.key[i]][2],
+                    "role": network.resources[network.resource[i]][1],
+                    "crew": network.crew[i],
+                    "duration_days": duration[i],
+                    "early_start": result['early_start'][i],
+                    "late_start": result['late_start'][i],
+                    "total_float": total_float[i],
+                    "critical": total_float[i] == 0,
+                    "start_day": start[i],
+                    "finish_day": start[i] + duration[i],
+                    "start_week": start[i] // 7 + 1
+                }
+                for i in range(len(network))
+            ]
+        return response
+
+    def _label(self, network, i):
+        name = self.TEMPLATE[network.key[i]][1]
+        floor = network.floor[i]
+        return name if floor is None else f"{name} ({floor_name(floor)})"
+
+
+def _crew_size(size, label):
+    """size as a whole number of workers; ValueError unless it is finite and within 1..MAX_CREW_SIZE."""
+    try:
+        value = float(size)
+    except (ValueError, TypeError):
+        raise ValueError(f"{label} must be a number")
+    if not math.isfinite(value) or not 1 <= value <= Config.MAX_CREW_SIZE:
+        raise ValueError(f"{label} must be between 1 and {Config.MAX_CREW_SIZE}")
+    return int(value)
+
+
+@lru_cache(maxsize=64)
+def minimum_duration(num_floors):
+    """
+    Shortest possible build of a num_floors building in days: one day per
+    activity plus the curing lags, i.e. the critical path with unlimited crews.
+    """
+    engine = ScheduleEngine()
+    network = engine.build([{"built_up_area": 100, "floors": f"G+{num_floors - 1}"}])
+    network.duration = [1] * len(network)
+    _, _, _, project_end = engine.critical_path(network)
+    return project_end[0]
@@ -0,0 +1,82 @@
+"""
+Single-flight de-duplication: concurrent calls with the same key share one
+execution. The first caller runs the function; callers that arrive while it
+is in flight wait for it and get the same result (or the same exception).
+A caller that has waited wait_timeout seconds stops waiting and runs the
+function itself, so one stuck call cannot hold every later caller with it.
+Nothing is kept once the call finishes; caching is ResultCache's job.
+"""
+import logging
+import threading
+
+from config import Config
+from metrics import COALESCED
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self, name, wait_timeout=None):
+        self.name = name
+        if wait_timeout is None:
+            wait_timeout = Config.SINGLE_FLIGHT_WAIT_TIMEOUT
+        self.wait_timeout = wait_timeout if wait_timeout > 0 else None
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._executions = 0
+        self._coalesced = 0
+        self._wait_timeouts = 0
+
+    def do(self, key, fn, *args):
+        """Returns (result, shared); shared is True if another caller did the work."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self._executions += 1
+                leader = True
+
+        if not leader:
+            COALESCED.inc(call=self.name)
+            if call.done.wait(self.wait_timeout):
+                if call.error is not None:
+                    raise call.error
+                return call.result, True
+            with self._lock:
+                self._wait_timeouts += 1
+            logger.warning("%s call still in flight after %.1fs, running it again", self.name, self.wait_timeout)
+            return fn(*args), False
+
+        try:
+            call.result = fn(*args)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def stats(self):
+        with self._lock:
+            return {
+                "executions": self._executions,
+                "coalesced": self._coalesced,
+                "wait_timeouts": self._wait_timeouts,
+                "in_flight": len(self._calls)
+            }
@@ -0,0 +1,249 @@
+"""
+Parameter sweeps over ConstructionCalculator, split across a process pool.
+
+Every point of the grid (the cartesian product of the parameter lists) is
+evaluated with the same arithmetic as ConstructionCalculator, vectorized per
+chunk. Workers write straight into one shared-memory result buffer, so only
+the grid, (start, end) ranges and timing stats cross process boundaries.
+
+The pool is started on the first sweep and reused by later ones, so a
+request does not pay for interpreter startup in every worker.
+"""
+import math
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from config import Config
+from dependencies import ConstructionCalculator
+import rate_table
+from rate_table import RateTable
+
+
+SWEEP_PARAMS = ("built_up_area", "floors", "custom_days", "custom_workers", "daily_wage", "cost_per_sq_yard")
+SWEEP_OUTPUTS = ("days", "workers", "material_cost", "labor_cost", "overhead_cost", "total_cost", "rate_based_cost")
+
+# Per pool worker: the ScenarioSweep of the run it last worked on, keyed by result buffer
+_worker_state = {}
+
+_pool = None
+_pool_key = None
+_pool_lock = threading.Lock()
+
+
+class ScenarioSweep:
+    """
+    grid maps each name in SWEEP_PARAMS to a list of values. Missing parameters
+    use the calculator defaults; None (or 0) for custom_days/custom_workers means
+    "auto", exactly as in ConstructionCalculator.
+    """
+
+    def __init__(self, grid, rates=None):
+        self.rates = rates or rate_table.current()
+        unknown = set(grid) - set(SWEEP_PARAMS)
+        if unknown:
+            raise ValueError(f"Unknown sweep parameters: {', '.join(sorted(unknown))}")
+
+        self.grid = {
+            "built_up_area": list(grid.get("built_up_area", [100])),
+            "floors": list(grid.get("floors", ["G+0"])),
+            "custom_days": list(grid.get("custom_days", [None])),
+            "custom_workers": list(grid.get("custom_workers", [None])),
+            "daily_wage": list(grid.get("daily_wage", [None])),
+            "cost_per_sq_yard": list(grid.get("cost_per_sq_yard", [None]))
+        }
+        for name, values in self.grid.items():
+            if not values:
+                raise ValueError(f"Sweep parameter '{name}' has no values")
+
+        self.shape = tuple(len(self.grid[name]) for name in SWEEP_PARAMS)
+        self.size = math.prod(self.shape)
+        self._axes = self._build_axes()
+
+    def _build_axes(self):
+        """Per-axis arrays, with the calculator's defaults and int() casts applied."""
+        # Area and floors are combined into one "site" axis; materials depend only on it
+        sites = [
+            ConstructionCalculator(area, floors, rates=self.rates)
+            for area in self.grid["built_up_area"]
+            for floors in self.grid["floors"]
+        ]
+        site_area = np.array([site.total_construction_area for site in sites], dtype=np.float64)
+        # Material cost depends only on rounded quantities, so it is computed with the scalar code
+        site_material = np.array(
+            [self._material_cost(site.calculate_materials()) for site in sites],
+            dtype=np.float64
+        )
+        return {
+            "site_area": site_area,
+            "site_material": site_material,
+            "custom_days": np.array([int(v) if v else 0 for v in self.grid["custom_days"]], dtype=np.int64),
+            "custom_workers": np.array([int(v) if v else 0 for v in self.grid["custom_workers"]], dtype=np.int64),
+            "daily_wage": np.array(
+                [float(v) if v else self.rates.default_daily_wage for v in self.grid["daily_wage"]],
+                dtype=np.float64
+            ),
+            "cost_per_sq_yard": np.array(
+                [float(v) if v else self.rates.default_cost_per_sq_yard for v in self.grid["cost_per_sq_yard"]],
+                dtype=np.float64
+            )
+        }
+
+    def _material_cost(self, materials):
+        steel_cost = materials['steel_tons'] * self.rates.steel_per_ton
+        cement_cost = materials['cement_bags'] * self.rates.cement_per_bag
+        sand_cost = materials['sand_tons'] * self.rates.sand_per_ton
+        other_material_cost = (steel_cost + cement_cost + sand_cost) * 0.5
+        return steel_cost + cement_cost + sand_cost + other_material_cost
+
+    def evaluate(self, start, end, out=None):
+        """Evaluates grid points [start, end) into out, shape (len(SWEEP_OUTPUTS), end - start)."""
+        if out is None:
+            out = np.empty((len(SWEEP_OUTPUTS), end - start), dtype=np.float64)
+
+        axes = self._axes
+        flat_shape = (self.shape[0] * self.shape[1],) + self.shape[2:]
+        i_site, i_days, i_workers, i_wage, i_rate = np.unravel_index(np.arange(start, end), flat_shape)
+
+        # Timeline and crew (ConstructionCalculator.__init__)
+        total_area = axes["site_area"][i_site]
+        custom_days = axes["custom_days"][i_days]
+        days = np.where(custom_days != 0, custom_days, np.maximum(60, np.ceil((total_area / 100) * 10)))
+        custom_workers = axes["custom_workers"][i_workers]
+        workers = np.where(custom_workers != 0, custom_workers, np.maximum(5, np.ceil((total_area * 1.5) / days)))
+
+        # Costs (ConstructionCalculator.calculate_costs)
+        material_cost = axes["site_material"][i_site]
+        labor_cost = days * workers * axes["daily_wage"][i_wage]
+        overhead_cost = (material_cost + labor_cost) * self.rates.overhead_rate
+
+        out[0] = days
+        out[1] = workers
+        np.rint(material_cost, out=out[2])
+        np.rint(labor_cost, out=out[3])
+        np.rint(overhead_cost, out=out[4])
+        np.rint(material_cost + labor_cost + overhead_cost, out=out[5])
+        np.rint(total_area * axes["cost_per_sq_yard"][i_rate], out=out[6])
+        return out
+
+    def scenario(self, index):
+        """Parameter values of one flat grid index."""
+        position = np.unravel_index(index, self.shape)
+        return {name: self.grid[name][i] for name, i in zip(SWEEP_PARAMS, position)}
+
+    def run(self, workers=None, chunk_size=None, start_method=None):
+        """
+        Evaluates the whole grid on a pool of `workers` processes and returns
+        the result columns plus per-worker throughput.
+        """
+        chunk_size = max(1, chunk_size or Config.SWEEP_CHUNK_SIZE)
+        ranges = [(start, min(start + chunk_size, self.size)) for start in range(0, self.size, chunk_size)]
+        # No point starting more processes than there are chunks
+        workers = max(1, min(workers or Config.SWEEP_WORKERS, len(ranges)))
+        started = time.perf_counter()
+
+        if workers == 1:
+            results = np.empty((len(SWEEP_OUTPUTS), self.size), dtype=np.float64)
+            stats = [_timed_evaluate(self, results, start, end) for start, end in ranges]
+        else:
+            buffer = shared_memory.SharedMemory(create=True, size=max(1, len(SWEEP_OUTPUTS) * self.size * 8))
+            try:
+                pool = get_sweep_pool(workers, start_method or Config.SWEEP_START_METHOD)
+                run = (buffer.name, self.size, self.grid, self.rates.as_dict())
+                try:
+                    stats = list(pool.map(_sweep_chunk, [(run, start, end) for start, end in ranges]))
+                except BrokenProcessPool:
+                    _discard_pool(pool)
+                    raise
+                shared = np.ndarray((len(SWEEP_OUTPUTS), self.size), dtype=np.float64, buffer=buffer.buf)
+                results = shared.copy()
+                del shared
+            finally:
+                buffer.close()
+                buffer.unlink()
+
+        elapsed = time.perf_counter() - started
+        return {
+            "size": self.size,
+            "shape": dict(zip(SWEEP_PARAMS, self.shape)),
+            "seconds": elapsed,
+            "throughput": self.size / elapsed if elapsed else 0.0,
+            "workers": _summarize_workers(stats),
+            "outputs": dict(zip(SWEEP_OUTPUTS, results))
+        }
+
+
+def _timed_evaluate(sweep, results, start, end):
+    started = time.perf_counter()
+    sweep.evaluate(start, end, out=results[:, start:end])
+    return os.getpid(), end - start, time.perf_counter() - started
+
+
+def get_sweep_pool(workers, start_method):
+    """
+    Process pool shared by all sweeps in this process, started on first use.
+    A sweep asking for another size or start method replaces it.
+    """
+    global _pool, _pool_key
+    with _pool_lock:
+        if _pool is None or _pool_key != (workers, start_method):
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(start_method))
+            _pool_key = (workers, start_method)
+        return _pool
+
+
+def _discard_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+
+def _sweep_chunk(task):
+    (buffer_name, size, grid, rates), start, end = task
+    # Chunks of one run share the sweep; its axes are built once per worker
+    if _worker_state.get("run") != buffer_name:
+        _worker_state["run"] = buffer_name
+        _worker_state["sweep"] = ScenarioSweep(grid, RateTable(**rates))
+    buffer = shared_memory.SharedMemory(name=buffer_name)
+    try:
+        results = np.ndarray((len(SWEEP_OUTPUTS), size), dtype=np.float64, buffer=buffer.buf)
+        stats = _timed_evaluate(_worker_state["sweep"], results, start, end)
+        del results
+    finally:
+        buffer.close()
+    return stats
+
+
+def _after_fork_in_child():
+    # The parent's pool processes belong to the parent; a forked server worker starts its own
+    global _pool, _pool_key, _pool_lock
+    _pool = None
+    _pool_key = None
+    _pool_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def _summarize_workers(stats):
+    per_worker = {}
+    for pid, count, seconds in stats:
+        entry = per_worker.setdefault(pid, {"pid": pid, "scenarios": 0, "chunks": 0, "busy_seconds": 0.0})
+        entry["scenarios"] += count
+        entry["chunks"] += 1
+        entry["busy_seconds"] += seconds
+    for entry in per_worker.values():
+        busy = entry["busy_seconds"]
+        entry["throughput"] = entry["scenarios"] / busy if busy else 0.0
+    return list(per_worker.values())
@@ -0,0 +1,11 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Keep test runs off the real database, cache files and rate limits
+os.environ.setdefault('PROJECT_DB_PATH', '')
+os.environ.setdefault('INSIGHT_CACHE_PATH', '')
+os.environ.setdefault('RESULT_CACHE_SIZE', '0')
+os.environ.setdefault('RATE_LIMIT_PER_SECOND', '0')
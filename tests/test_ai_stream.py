@@ -0,0 +1,100 @@
+import json
+import time
+
+import pytest
+
+import insight_cache
+import llm_client
+import main
+from fake_ollama import FakeOllamaServer
+from insight_cache import InsightCache
+from llm_client import LLMClient
+
+URL = '/api/ai-analysis/stream?built_up_area=1000&floors=G%2B1'
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(insight_cache, '_shared_cache', InsightCache(save_delay=60))
+
+
+@pytest.fixture
+def model(monkeypatch):
+    """Points the shared LLM client at a fake server built with the given options."""
+    started = []
+
+    def start(**options):
+        server = FakeOllamaServer(**options).__enter__()
+        client = LLMClient(url=server.url)
+        started.append((server, client))
+        monkeypatch.setattr(llm_client, '_shared_client', client)
+        return server
+
+    yield start
+    for server, client in started:
+        client.close()
+        server.__exit__(None, None, None)
+
+
+def events(body):
+    """(event, data) pairs of a Server-Sent Events body."""
+    parsed = []
+    for frame in body.strip().split("\n\n"):
+        event, data = frame.split("\n")
+        parsed.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return parsed
+
+
+def test_tokens_are_streamed_then_done(model):
+    model(response_text="Check soil bearing early")
+    response = main.app.test_client().get(URL)
+    assert response.mimetype == "text/event-stream"
+    assert response.headers["Cache-Control"] == "no-cache"
+    received = events(response.get_data(as_text=True))
+    assert received[-1] == ("done", {"cached": False})
+    assert "".join(data["text"] for event, data in received[:-1]) == "Check soil bearing early "
+    assert {event for event, _ in received[:-1]} == {"token"}
+
+
+def test_first_token_is_sent_before_the_model_finishes(model):
+    server = model(response_text="one two three four", chunk_delay=0.2)
+    response = main.app.test_client().get(URL, buffered=False)
+    body = iter(response.response)
+    assert events(next(body).decode())[0] == ("token", {"text": "one "})
+    assert server.completed_streams == 0
+    assert events("".join(chunk.decode() for chunk in body))[-1][0] == "done"
+    response.close()
+
+
+def test_complete_answer_is_cached_for_the_next_caller(model):
+    server = model(response_text="Order steel before the monsoon")
+    client = main.app.test_client()
+    client.get(URL).get_data()
+    received = events(client.get(URL).get_data(as_text=True))
+    assert received == [("token", {"text": "Order steel before the monsoon "}), ("done", {"cached": True})]
+    assert server.completed_streams == 1
+
+
+def test_model_failure_is_an_error_event_and_not_cached(model):
+    model(error_rate=1.0)
+    client = main.app.test_client()
+    assert events(client.get(URL).get_data(as_text=True))[-1][0] == "error"
+    assert insight_cache.get_insight_cache().stats()["entries"] == 0
+
+
+def test_client_disconnect_cancels_the_model_request(model):
+    server = model(response_text=" ".join(["word"] * 200), chunk_delay=0.02)
+    response = main.app.test_client().get(URL, buffered=False)
+    next(iter(response.response))
+    response.close()
+    deadline = time.monotonic() + 5
+    while server.cancelled_streams == 0 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert server.cancelled_streams == 1
+    assert server.completed_streams == 0
+
+
+def test_bad_query_is_a_400_before_streaming():
+    response = main.app.test_client().get('/api/ai-analysis/stream?built_up_area=1000&daily_wage_per_worker=lots')
+    assert response.status_code == 400
+    assert "error" in response.get_json()
@@ -0,0 +1,89 @@
+import base64
+import xml.etree.ElementTree as ET
+
+import pytest
+
+import main
+from blueprint_renderer import LAYOUT_ROWS, PLAN_H, PLAN_W, BlueprintRenderer
+from config import Config
+from dependencies import ConstructionCalculator
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+
+@pytest.fixture
+def renderer():
+    return BlueprintRenderer()
+
+
+def rooms(svg):
+    """(name, width, height) of each room drawn in the plan."""
+    root = ET.fromstring(svg)
+    rects = root.findall(f"{SVG}rect")[1:]
+    names = [text.text for text in root.findall(f"{SVG}text")][0::2]
+    return [(name, float(rect.get("width")), float(rect.get("height"))) for name, rect in zip(names, rects)]
+
+
+def test_rooms_are_scaled_to_their_areas(renderer):
+    drawn = rooms(renderer.render_floor(1000, "G+1"))
+    assert [name for name, _, _ in drawn] == [name.upper() for row in LAYOUT_ROWS for name in row]
+
+    layout = ConstructionCalculator(1000, "G+1").generate_blueprint_data()["layout"]
+    room_sqft = {room["room"].upper(): room["area_sqft"] for room in layout}
+    total_sqft = sum(room_sqft.values())
+    for name, w, h in drawn:
+        assert w * h / (PLAN_W * PLAN_H) == pytest.approx(room_sqft[name] / total_sqft, abs=1e-3)
+    assert sum(w * h for _, w, h in drawn) == pytest.approx(PLAN_W * PLAN_H, rel=1e-3)
+
+
+def test_dimensions_follow_the_area(renderer):
+    small, large = renderer.render_floor(100, "G+0"), renderer.render_floor(4000, "G+0")
+    assert small != large
+    assert "900 SQ FT" in small and "36000 SQ FT" in large
+
+
+def test_one_plan_per_floor(renderer):
+    plans = renderer.render_all(800, "G+2")
+    assert len(plans) == 3
+    assert ["GROUND FLOOR" in plans[0], "FLOOR 1 |" in plans[1], "FLOOR 2 |" in plans[2]] == [True] * 3
+
+
+def test_tall_buildings_end_with_a_typical_floor(renderer, monkeypatch):
+    monkeypatch.setattr(Config, 'MAX_BLUEPRINT_FLOORS', 4)
+    plans = renderer.plan_floors(800, "G+9")
+    assert [name for _, name, _ in plans] == ["Ground Floor", "Floor 1", "Floor 2", "Floors 3-9 (Typical)"]
+    assert sum(covered for _, _, covered in plans) == 10
+
+
+def test_output_is_well_formed_and_escaped(renderer):
+    svg = renderer.render_floor(500, "G+1<&>")
+    assert ET.fromstring(svg).tag == f"{SVG}svg"
+    assert "G+1&lt;&amp;&gt;" in svg
+
+
+def test_data_uri_holds_the_same_drawing(renderer):
+    uri = renderer.render_floor_data_uri(1000, "G+1", 1)
+    assert uri.startswith("data:image/svg+xml;base64,")
+    assert base64.b64decode(uri.split(",", 1)[1]).decode("utf-8") == renderer.render_floor(1000, "G+1", 1)
+
+
+def test_blueprint_url_serves_raw_svg(renderer):
+    client = main.app.test_client()
+    response = client.get(renderer.url_for(1000, "G+2", 2))
+    assert response.status_code == 200
+    assert response.mimetype == "image/svg+xml"
+    assert "max-age" in response.headers["Cache-Control"]
+    assert response.get_data(as_text=True) == renderer.render_floor(1000, "G+2", 2)
+
+    assert client.get(renderer.url_for(1000, "G+2", 3)).status_code == 404
+    assert client.get('/api/blueprint.svg?area=1000&floor=top').status_code == 400
+
+
+def test_calculate_can_link_or_omit_blueprints():
+    client = main.app.test_client()
+    body = {"built_up_area": 600, "floors": "G+1"}
+    linked = client.post('/api/calculate', json={**body, "blueprint_mode": "url"}).get_json()
+    assert [b["image_url"] for b in linked["blueprints"]] == [
+        BlueprintRenderer.url_for(600.0, "G+1", index) for index in range(2)
+    ]
+    assert "blueprints" not in client.post('/api/calculate', json={**body, "blueprint_mode": "none"}).get_json()
@@ -0,0 +1,67 @@
+import io
+import json
+
+from bulk_estimation import estimate_stream, iter_rows
+
+
+def strict_json(line):
+    def reject(constant):
+        raise ValueError(f"{constant} is not valid JSON")
+    return json.loads(line, parse_constant=reject)
+
+
+def stream_lines(text, fmt="csv", chunk_size=2):
+    rows = iter_rows(io.StringIO(text), fmt)
+    return [strict_json(line) for chunk in estimate_stream(rows, chunk_size) for line in chunk.splitlines()]
+
+
+def test_bad_rows_get_inline_errors_and_the_stream_continues():
+    text = (
+        "id,built_up_area,floors,daily_wage_per_worker\n"
+        "a,1000,G+1,500\n"
+        "b,nan,G+1,500\n"
+        "c,1000,G+1,inf\n"
+        "d,abc,G+2,oops\n"
+        "e,800,G+0,450\n"
+    )
+    lines = stream_lines(text)
+    assert [line["row"] for line in lines] == [1, 2, 3, 4, 5]
+    assert [line["status"] for line in lines] == ["success", "error", "error", "error", "success"]
+    assert [line["id"] for line in lines] == ["a", "b", "c", "d", "e"]
+
+
+def test_invalid_utf8_fails_only_its_row():
+    from main import app
+
+    body = (
+        b"built_up_area,floors,daily_wage_per_worker\n"
+        b"1000,G+1,500\n"
+        b"1000,G+1,5\xff0\n"
+        b"900,G+2,500\n"
+    )
+    response = app.test_client().post('/api/calculate/bulk?chunk_size=1', data=body, content_type='text/csv')
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert response.status_code == 200
+    assert [line["status"] for line in lines] == ["success", "error", "success"]
+
+
+def test_output_is_strict_json():
+    lines = stream_lines("built_up_area,floors\nNaN,G+1\n1e400,G+1\n", chunk_size=10)
+    assert [line["status"] for line in lines] == ["error", "error"]
+
+
+def test_chunk_size_is_clamped(monkeypatch):
+    import bulk_estimation
+    from config import Config
+    from main import app
+
+    seen = []
+    original = bulk_estimation.estimate_stream
+
+    def spy(rows, chunk_size, *args):
+        seen.append(chunk_size)
+        return original(rows, chunk_size, *args)
+
+    monkeypatch.setattr("main.estimate_stream", spy)
+    app.test_client().post('/api/calculate/bulk?chunk_size=100000000', data=b"built_up_area\n1000\n", content_type='text/csv').get_data()
+    assert seen == [Config.MAX_BULK_CHUNK_SIZE]
@@ -0,0 +1,97 @@
+import gzip
+import json
+
+import numpy as np
+import pytest
+
+import encoding
+import main
+from config import Config
+
+BATCH = {"projects": [{"built_up_area": 500 + 10 * i, "floors": "G+1"} for i in range(20)]}
+
+
+@pytest.fixture
+def client():
+    return main.app.test_client()
+
+
+def batch(client, **headers):
+    return client.post('/api/calculate/batch', json=BATCH, headers=headers)
+
+
+def test_json_provider_matches_the_standard_library():
+    payload = {"b": [1.5, "é", None], "a": {"z": True, "y": 2}}
+    with main.app.app_context():
+        body = main.app.json.dumps(payload)
+        assert json.loads(body) == payload
+        assert list(json.loads(body)) == ["a", "b"]
+        assert json.loads(main.app.json.dumps({"n": np.float64(2.5), "v": np.arange(3)})) == {"n": 2.5, "v": [0, 1, 2]}
+
+
+def test_msgpack_is_served_when_preferred(client):
+    msgpack = pytest.importorskip("msgpack")
+    as_json = batch(client).get_json()
+    response = batch(client, Accept="application/msgpack")
+    assert response.mimetype == "application/msgpack"
+    assert "Accept" in response.headers["Vary"]
+    assert msgpack.unpackb(response.get_data(), raw=False) == as_json
+
+
+@pytest.mark.parametrize("accept", [
+    "application/json",
+    "application/json, application/msgpack;q=0.5",
+    "*/*"
+])
+def test_json_is_served_unless_msgpack_is_preferred(client, accept):
+    assert batch(client, Accept=accept).mimetype == "application/json"
+
+
+def test_json_is_served_without_msgpack_installed(client, monkeypatch):
+    monkeypatch.setattr(encoding, 'msgpack', None)
+    assert batch(client, Accept="application/msgpack").mimetype == "application/json"
+
+
+def test_gzip_round_trips(client, monkeypatch):
+    monkeypatch.setattr(encoding, 'brotli', None)
+    plain = batch(client)
+    response = batch(client, **{"Accept-Encoding": "gzip, br"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert gzip.decompress(response.get_data()) == plain.get_data()
+    assert len(response.get_data()) < len(plain.get_data())
+
+
+def test_brotli_is_preferred_when_installed(client):
+    brotli = pytest.importorskip("brotli")
+    plain = batch(client)
+    response = batch(client, **{"Accept-Encoding": "gzip, br"})
+    assert response.headers["Content-Encoding"] == "br"
+    assert brotli.decompress(response.get_data()) == plain.get_data()
+
+
+def test_compressed_msgpack_round_trips(client):
+    msgpack = pytest.importorskip("msgpack")
+    response = batch(client, Accept="application/msgpack", **{"Accept-Encoding": "gzip;q=1.0, br;q=0"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert msgpack.unpackb(gzip.decompress(response.get_data()), raw=False) == batch(client).get_json()
+
+
+def test_small_and_unaccepted_responses_stay_uncompressed(client, monkeypatch):
+    assert "Content-Encoding" not in client.get('/api/ai-analysis/missing', headers={"Accept-Encoding": "gzip"}).headers
+    assert "Content-Encoding" not in batch(client).headers
+    assert "Content-Encoding" not in batch(client, **{"Accept-Encoding": "identity"}).headers
+
+    monkeypatch.setattr(Config, 'COMPRESSION_MIN_BYTES', 0)
+    assert "Content-Encoding" not in batch(client, **{"Accept-Encoding": "gzip"}).headers
+
+
+def test_streams_are_not_compressed(client):
+    body = "\n".join(json.dumps(project) for project in BATCH["projects"] * 10)
+    response = client.post(
+        '/api/calculate/bulk', data=body, content_type='application/x-ndjson',
+        headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.status_code == 200
+    assert "Content-Encoding" not in response.headers
+    assert len(response.get_data(as_text=True).splitlines()) == 200
@@ -0,0 +1,49 @@
+import pytest
+
+import estimate_grid
+import main
+from config import Config
+from estimate_grid import EstimateGrid, compute_preview
+
+
+@pytest.fixture(scope="module")
+def grid():
+    return EstimateGrid.build(max_floors=3)
+
+
+def project(area, floors="G+1", wage=650.0, rate=1800.0):
+    return {"area": area, "floors": floors, "daily_wage": wage, "cost_per_sq_yard": rate, "user_days": None}
+
+
+@pytest.mark.parametrize("area", [50.0, 51.0, 777.0, 4321.0, 10000.0])
+@pytest.mark.parametrize("floors", ["G+0", "G+2"])
+def test_node_areas_match_the_full_computation(grid, area, floors):
+    inputs = project(area, floors)
+    assert grid.lookup(inputs) == compute_preview(inputs)
+
+
+@pytest.mark.parametrize("area", [50.5, 777.25, 4321.9, 9999.999])
+def test_off_node_areas_are_not_answered(grid, area):
+    assert grid.lookup(project(area)) is None
+
+
+def test_off_node_preview_is_computed(grid, monkeypatch):
+    monkeypatch.setattr(Config, 'ESTIMATE_GRID', True)
+    monkeypatch.setattr(estimate_grid, '_shared_grid', grid)
+    client = main.app.test_client()
+    query = {"built_up_area": 777.25, "floors": "G+1", "daily_wage_per_worker": 650, "cost_per_sq_yard": 1800}
+    data = client.get('/api/estimate/preview', query_string=query).get_json()
+    assert data.pop("status") == "success"
+    assert data.pop("source") == "computed"
+    assert data == compute_preview(project(777.25))
+
+    query["built_up_area"] = 777
+    assert client.get('/api/estimate/preview', query_string=query).get_json()["source"] == "grid"
+
+
+def test_health_reports_the_grid_without_building_it(monkeypatch):
+    monkeypatch.setattr(Config, 'ESTIMATE_GRID', True)
+    monkeypatch.setattr(estimate_grid, '_shared_grid', None)
+    data = main.app.test_client().get('/health').get_json()
+    assert data["estimate_grid"] == {"enabled": True, "built": False}
+    assert estimate_grid._shared_grid is None
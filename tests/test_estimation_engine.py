@@ -0,0 +1,89 @@
+import math
+import random
+
+import pytest
+
+from cost_service import CostService
+from estimation_engine import EstimationEngine
+from preprocessing import DataPreprocessor
+from resource_service import ResourceService
+from schedule_service import ScheduleService
+
+
+def random_payload(rng):
+    payload = {
+        "built_up_area": rng.choice([rng.uniform(10, 12000), rng.randint(50, 10000), str(rng.randint(50, 5000))]),
+        "floors": rng.choice(["G+0", "G+1", "g + 2", "3", "G+7", "Ground+1", 5]),
+        "daily_wage_per_worker": rng.uniform(200, 1500),
+        "cost_per_sq_yard": rng.randint(500, 5000)
+    }
+    if rng.random() < 0.3:
+        payload["construction_days"] = rng.randint(30, 900)
+    return payload
+
+
+def scalar_plan(inputs):
+    """The schedule -> resource -> cost sections of /api/calculate, from the scalar services."""
+    area, floors = inputs['area'], inputs['floors']
+    sched = ScheduleService().generate_schedule(area, floors, inputs['user_days'])
+    resources = ResourceService()
+    labor = resources.calculate_labor(area, sched['duration_days'])
+    return {
+        "timeline": {key: sched[key] for key in ("duration_days", "duration_weeks", "duration_months")},
+        "costs": CostService().calculate_costs(area, inputs['cost_per_sq_yard'], labor['total_labor_days'], inputs['daily_wage']),
+        "materials": resources.calculate_materials(area, floors),
+        "labor": labor,
+        "schedule": sched['schedule']
+    }
+
+
+def test_batch_matches_scalar_on_random_inputs():
+    rng = random.Random(1)
+    payloads = [random_payload(rng) for _ in range(2000)]
+    engine = EstimationEngine()
+    records = engine.to_records(engine.run(payloads))
+    for payload, record in zip(payloads, records):
+        assert record == scalar_plan(DataPreprocessor.normalize_project(payload)), payload
+
+
+@pytest.mark.parametrize("field, value", [
+    ("built_up_area", float("nan")),
+    ("built_up_area", "nan"),
+    ("built_up_area", float("inf")),
+    ("daily_wage_per_worker", float("nan")),
+    ("cost_per_sq_yard", "-inf"),
+    ("construction_days", float("inf"))
+])
+def test_non_finite_inputs_are_rejected(field, value):
+    payload = {"built_up_area": 1000, "floors": "G+1", field: value}
+    with pytest.raises(ValueError):
+        DataPreprocessor.normalize_project(payload)
+    with pytest.raises(ValueError, match="Project 1"):
+        EstimationEngine().normalize([{"built_up_area": 1000}, payload])
+
+
+def test_columns_from_inputs_rejects_non_finite():
+    inputs = DataPreprocessor.normalize_project({"built_up_area": 1000, "floors": "G+1"})
+    with pytest.raises(ValueError, match="Project 0"):
+        EstimationEngine().columns_from_inputs([{**inputs, "area": math.nan}])
+
+
+def test_batch_and_scalar_endpoints_agree_on_nan():
+    from main import app
+
+    client = app.test_client()
+    body = '{"built_up_area": NaN, "floors": "G+1"}'
+    scalar = client.post('/api/calculate', data=body, content_type='application/json')
+    batch = client.post('/api/calculate/batch', data='{"projects": [%s]}' % body, content_type='application/json')
+    assert scalar.status_code == batch.status_code == 400
+
+
+@pytest.mark.parametrize("body", ['[{"built_up_area": 1000}]', '"G+1"', '42', 'true'])
+def test_non_object_bodies_are_a_400(body):
+    from main import app
+
+    client = app.test_client()
+    for url in ('/api/calculate', '/api/calculate/batch'):
+        response = client.post(url, data=body, content_type='application/json')
+        assert response.status_code == 400
+        assert "error" in response.get_json()
@@ -0,0 +1,29 @@
+import json
+import time
+
+from insight_cache import InsightCache
+
+PROJECT = {"area": 1000, "floors": "G+1", "days": 120}
+
+
+def test_put_does_not_write_on_the_calling_thread(tmp_path, monkeypatch):
+    path = tmp_path / "insights.json"
+    cache = InsightCache(path=str(path), save_delay=60)
+    writes = []
+    monkeypatch.setattr(cache, "save", lambda: writes.append(time.time()))
+    for area in range(1000, 2000, 100):
+        cache.put({**PROJECT, "area": area}, f"Plan for {area} sq yards")
+    assert writes == []
+    cache.flush()
+    assert len(writes) == 1
+
+
+def test_entries_reach_the_file_after_the_delay(tmp_path):
+    path = tmp_path / "insights.json"
+    cache = InsightCache(path=str(path), save_delay=0.05)
+    cache.put(PROJECT, "1000 sq yards over 120 days")
+    deadline = time.time() + 5
+    while not path.exists() and time.time() < deadline:
+        time.sleep(0.01)
+    assert len(json.loads(path.read_text())["entries"]) == 1
+    assert InsightCache(path=str(path)).get(PROJECT) == "1000 sq yards over 120 days"
@@ -0,0 +1,101 @@
+import time
+from concurrent.futures import wait
+
+import pytest
+
+from ai_service import AIService
+from fake_ollama import FakeOllamaServer
+from llm_client import LLMClient, LLMError
+
+
+@pytest.fixture
+def server():
+    with FakeOllamaServer(response_text="Pour the slab in one go") as server:
+        yield server
+
+
+def count_connections(server):
+    """Counts TCP connections the fake server accepts."""
+    accepted = []
+    process_request = server.httpd.process_request
+
+    def counting(request, client_address):
+        accepted.append(client_address)
+        return process_request(request, client_address)
+
+    server.httpd.process_request = counting
+    return accepted
+
+
+def test_calls_reuse_one_keep_alive_session(server):
+    connections = count_connections(server)
+    client = LLMClient(url=server.url)
+    session = client._get_session()
+    for i in range(5):
+        assert client.generate(f"prompt {i}", timeout=2) == "Pour the slab in one go"
+    assert client._get_session() is session
+    assert len(connections) == 1
+    client.close()
+
+
+def test_concurrency_toward_the_server_is_bounded():
+    with FakeOllamaServer(delay=0.2) as server:
+        client = LLMClient(url=server.url, max_concurrency=2)
+        started = time.perf_counter()
+        futures = [client.submit(f"prompt {i}", 5) for i in range(6)]
+        wait(futures, timeout=10)
+        elapsed = time.perf_counter() - started
+        assert all(future.result().startswith("Fake analysis") for future in futures)
+        # Six 0.2 s calls, two at a time
+        assert elapsed >= 0.55
+        client.close()
+
+
+def test_slow_model_times_out():
+    with FakeOllamaServer(delay=2.0) as server:
+        client = LLMClient(url=server.url)
+        started = time.perf_counter()
+        with pytest.raises(LLMError):
+            client.generate("prompt", timeout=0.1)
+        assert time.perf_counter() - started < 1.0
+        client.close()
+
+
+def test_stream_yields_chunks_as_they_arrive():
+    with FakeOllamaServer(response_text="one two three four", chunk_delay=0.1) as server:
+        client = LLMClient(url=server.url)
+        started = time.perf_counter()
+        chunks = client.stream("prompt", timeout=5)
+        first = next(chunks)
+        first_token = time.perf_counter() - started
+        rest = list(chunks)
+        total = time.perf_counter() - started
+        assert "".join([first] + rest) == "one two three four "
+        assert first_token < total / 2
+        assert server.completed_streams == 1
+        client.close()
+
+
+def test_closing_a_stream_cancels_it_upstream():
+    with FakeOllamaServer(response_text=" ".join(["word"] * 200), chunk_delay=0.02) as server:
+        client = LLMClient(url=server.url)
+        chunks = client.stream("prompt", timeout=5)
+        next(chunks)
+        chunks.close()
+        deadline = time.time() + 5
+        while server.cancelled_streams == 0 and time.time() < deadline:
+            time.sleep(0.02)
+        assert server.cancelled_streams == 1
+        assert server.completed_streams == 0
+        client.close()
+
+
+def test_blueprints_do_not_call_the_model():
+    class FailingLLM:
+        url = "stub://ollama"
+
+        def generate(self, prompt, timeout=30, model=None):
+            raise AssertionError("blueprints must not wait on the model")
+
+    blueprints = AIService(llm_client=FailingLLM()).generate_blueprints("G+2", 1200)
+    assert [b["floor_name"] for b in blueprints] == ["Ground Floor", "Floor 1", "Floor 2"]
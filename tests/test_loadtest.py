@@ -0,0 +1,99 @@
+import importlib.util
+import os
+import random
+import threading
+
+import pytest
+import requests
+from werkzeug.serving import make_server
+
+import main
+from fake_ollama import FakeOllamaServer, parse_latency
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_spec = importlib.util.spec_from_file_location("loadtest", os.path.join(ROOT, "benchmarks", "loadtest.py"))
+loadtest = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(loadtest)
+
+
+@pytest.mark.parametrize("spec, low, high", [
+    ("fixed:0.2", 0.2, 0.2),
+    ("uniform:0.1,0.3", 0.1, 0.3),
+    ("normal:0.05,1.0", 0.0, float("inf")),
+    ("lognormal:0.8,0.5", 0.0, float("inf")),
+    ("exponential:0.5", 0.0, float("inf"))
+])
+def test_latency_profiles_draw_in_range(spec, low, high):
+    draw = parse_latency(spec)
+    draws = [draw(random.Random(7)) for _ in range(3)] + [draw(random.Random(i)) for i in range(200)]
+    assert draws[0] == draws[1] == draws[2]
+    assert all(low <= value <= high for value in draws)
+
+
+@pytest.mark.parametrize("spec", ["gamma:1,2", "uniform:0.1", "fixed:fast", "fixed"])
+def test_bad_latency_specs_are_rejected(spec):
+    with pytest.raises(ValueError):
+        parse_latency(spec)
+
+
+def generate(server, timeout=2):
+    return requests.post(server.url, json={"prompt": "p", "stream": False}, timeout=timeout)
+
+
+def test_injected_errors_and_timeouts():
+    with FakeOllamaServer(error_rate=1.0) as server:
+        assert generate(server).status_code == 500
+        assert requests.get(server.url.replace("/generate", "/tags"), timeout=2).status_code == 200
+        assert server.stats()["errors_injected"] == 1
+
+    with FakeOllamaServer(timeout_rate=1.0, hang=1.0) as server:
+        with pytest.raises(requests.Timeout):
+            generate(server, timeout=0.1)
+        assert server.stats()["timeouts_injected"] == 1
+
+
+def test_seeded_server_injects_the_same_failures():
+    def outcomes():
+        with FakeOllamaServer(error_rate=0.5, seed=3) as server:
+            return [generate(server).status_code for _ in range(20)]
+
+    first = outcomes()
+    assert first == outcomes()
+    assert {200, 500} == set(first)
+
+
+def test_send_times():
+    assert len(loadtest.send_times(10, 2, "fixed", random.Random(0))) == 20
+    poisson = loadtest.send_times(200, 5, "poisson", random.Random(0))
+    assert 900 < len(poisson) < 1100
+    assert poisson == sorted(poisson) and poisson[-1] < 5
+
+
+def test_summary_and_saturation():
+    results = [(200, 0.010, 0.0)] * 97 + [(500, 0.020, 0.0), ("timeout", 1.0, 0.0), ("exception", 0.5, 0.0)]
+    summary = loadtest.summarize(results, elapsed=10.0, rate=10, duration=10)
+    assert (summary["sent"], summary["ok"], summary["error_rate"]) == (100, 97, 0.03)
+    assert summary["failed"] == {"500": 1, "timeout": 1, "exception": 1}
+    assert summary["achieved_rps"] == 9.7
+    assert summary["latency_ms"]["p50"] == 10.0 and summary["latency_ms"]["max"] == 1000.0
+    assert loadtest.is_saturated(summary, slo_p99_ms=2000, max_error_rate=0.05) == []
+    assert loadtest.is_saturated(summary, slo_p99_ms=100, max_error_rate=0.01) == ["p99", "errors"]
+    assert "throughput" in loadtest.is_saturated({**summary, "achieved_rps": 5.0}, 2000, 0.05)
+
+
+@pytest.mark.parametrize("endpoint", ["calculate", "batch", "preview"])
+def test_load_generator_against_the_app(endpoint):
+    server = make_server("127.0.0.1", 0, main.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        rng = random.Random(1)
+        offsets = loadtest.send_times(50, 0.2, "fixed", rng)
+        calls = [loadtest.make_request(endpoint, rng, batch_size=5) for _ in offsets]
+        generator = loadtest.LoadGenerator(f"http://127.0.0.1:{server.server_port}", timeout=10, max_in_flight=4)
+        results, elapsed = generator.run(calls, offsets)
+    finally:
+        server.shutdown()
+    summary = loadtest.summarize(results, elapsed, 50, 0.2)
+    assert (summary["sent"], summary["ok"], summary["failed"]) == (10, 10, {})
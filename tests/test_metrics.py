@@ -0,0 +1,101 @@
+import math
+import re
+
+import pytest
+
+import main
+from metrics import MetricsRegistry
+
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})? (\S+)$')
+LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\\n]|\\.)*)"(?:,|$)')
+
+
+def parse(text):
+    """Checks the text exposition format; returns {family: (type, [(name, labels, value)])}."""
+    assert text.endswith("\n")
+    families, current = {}, None
+    for line in text.splitlines():
+        if line.startswith("# HELP "):
+            current = line.split()[2]
+            assert current not in families, f"{current} exposed twice"
+        elif line.startswith("# TYPE "):
+            _, _, name, kind = line.split()
+            assert name == current and kind in ("counter", "gauge", "histogram")
+            families[name] = (kind, [])
+        else:
+            name, labels, value = SAMPLE.match(line).groups()
+            assert name == current or name.rsplit("_", 1)[0] == current, line
+            pairs = LABEL.findall(labels or "")
+            assert "".join(f'{k}="{v}",' for k, v in pairs)[:-1] == (labels or "")
+            families[current][1].append((name, dict(pairs), float(value)))
+    return families
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry(enabled=True)
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    latency = registry.histogram("test_seconds", "Test latency", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value, stage="cost")
+    kind, samples = parse(registry.render())["test_seconds"]
+    assert kind == "histogram"
+    buckets = [(labels["le"], value) for name, labels, value in samples if name == "test_seconds_bucket"]
+    assert buckets == [("0.1", 2), ("1.0", 3), ("+Inf", 4)]
+    values = {name: value for name, _, value in samples if name != "test_seconds_bucket"}
+    assert values == {"test_seconds_sum": pytest.approx(3.65), "test_seconds_count": 4}
+
+
+def test_counters_gauges_and_collectors(registry):
+    requests = registry.counter("test_requests_total", "Requests", ("endpoint", "status"))
+    in_flight = registry.gauge("test_in_flight", "In flight")
+    requests.inc(endpoint="calculate", status=200)
+    requests.inc(2, endpoint="calculate", status=200)
+    requests.inc(endpoint="calculate", status=500)
+    in_flight.inc()
+    in_flight.inc()
+    in_flight.dec()
+    registry.register_collector(lambda: [("test_cache_entries", "gauge", "Entries", 7)])
+
+    families = parse(registry.render())
+    assert sorted((labels["status"], value) for _, labels, value in families["test_requests_total"][1]) == [
+        ("200", 3), ("500", 1)
+    ]
+    assert families["test_in_flight"][1] == [("test_in_flight", {}, 1)]
+    assert families["test_cache_entries"] == ("gauge", [("test_cache_entries", {}, 7)])
+
+
+def test_label_values_are_escaped(registry):
+    registry.counter("test_total", "Test", ("path",)).inc(path='a"b\\c\nd')
+    [(_, labels, _)] = parse(registry.render())["test_total"][1]
+    assert labels["path"] == 'a\\"b\\\\c\\nd'
+
+
+def test_disabled_registry_records_nothing(registry):
+    registry.enabled = False
+    latency = registry.histogram("test_seconds", "Test latency")
+    with latency.time():
+        pass
+    latency.observe(1.0)
+    assert parse(registry.render())["test_seconds"] == ("histogram", [])
+
+
+def test_metrics_endpoint_exposes_request_and_stage_metrics():
+    client = main.app.test_client()
+    assert client.post('/api/calculate', json={"built_up_area": 700, "floors": "G+1"}).status_code == 200
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    families = parse(response.get_data(as_text=True))
+
+    requests = {
+        (labels["endpoint"], labels["status"]): value
+        for _, labels, value in families["construction_http_requests_total"][1]
+    }
+    assert requests[("calculate_construction_plan", "200")] >= 1
+    stages = {labels["stage"] for name, labels, _ in families["construction_stage_seconds"][1]}
+    assert {"preprocessing", "schedule", "serialization"} <= stages
+    for name in ("construction_result_cache_hits_total", "construction_llm_circuit_open", "construction_log_queue_depth"):
+        assert math.isfinite(families[name][1][0][2])
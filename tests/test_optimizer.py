@@ -0,0 +1,101 @@
+import math
+import random
+from fractions import Fraction
+
+import pytest
+
+import main
+import rate_table
+from optimizer import CrewOptimizer
+from preprocessing import DataPreprocessor
+from scheduler import minimum_duration
+
+
+def brute_force(optimizer, inputs, site_cost_per_day, sq_yards_per_worker, max_days=None):
+    """
+    Cheapest (objective, duration, workers) over every duration, straight from
+    the cost model, with the work per trade in exact fractions.
+    """
+    area = inputs['area']
+    num_floors = int(inputs['floors'].split('+')[1]) + 1
+    total_man_days = max(1, optimizer.resource_service.calculate_labor(area, None)['total_labor_days'])
+    shares = [Fraction(str(share)) for _, share in optimizer.TRADE_SHARES]
+    work = [total_man_days * share / sum(shares) for share in shares]
+    density_cap = max(len(work) + 1, math.floor(area * num_floors / sq_yards_per_worker))
+    min_days = minimum_duration(num_floors)
+    worker_day_cost = inputs['daily_wage'] * (1 + rate_table.current().overhead_rate)
+
+    best = None
+    for days in range(min_days, max(min_days, math.ceil(max(work))) + 2):
+        crew = [math.ceil(w / days) for w in work]
+        workers = sum(crew) + max(1, math.ceil(sum(crew) / optimizer.SUPERVISOR_SPAN))
+        duration = max(min_days, max(math.ceil(w / n) for w, n in zip(work, crew)))
+        if workers > density_cap or (max_days and duration > max_days):
+            continue
+        objective = float(duration) * (worker_day_cost * workers + site_cost_per_day)
+        if best is None or objective < best[0]:
+            best = (objective, duration, workers)
+    return best
+
+
+def objective(result, inputs, site_cost_per_day):
+    worker_day_cost = inputs['daily_wage'] * (1 + rate_table.current().overhead_rate)
+    return result['duration_days'] * (worker_day_cost * result['total_workers'] + site_cost_per_day)
+
+
+def project(area, floors, wage):
+    return {"area": area, "floors": floors, "daily_wage": wage, "cost_per_sq_yard": 1500.0, "user_days": None}
+
+
+def test_reported_counterexample_is_optimal():
+    optimizer = CrewOptimizer()
+    inputs = project(1189.9585619966476, "G+0", 405.34666874045433)
+    result = optimizer.optimize(inputs, site_cost_per_day=0, sq_yards_per_worker=50)
+    expected = brute_force(optimizer, inputs, 0, 50)
+    assert objective(result, inputs, 0) == pytest.approx(expected[0])
+    assert result['total_workers'] <= result['density_cap']
+
+
+def test_matches_brute_force_on_random_projects():
+    optimizer = CrewOptimizer()
+    rng = random.Random(14)
+    for _ in range(300):
+        inputs = project(rng.uniform(50, 5000), f"G+{rng.randint(0, 4)}", rng.uniform(300, 1200))
+        site_cost = rng.choice([0, rng.uniform(0, 20000)])
+        density = rng.uniform(10, 200)
+        expected = brute_force(optimizer, inputs, site_cost, density)
+        result = optimizer.optimize(inputs, site_cost_per_day=site_cost, sq_yards_per_worker=density)
+        assert objective(result, inputs, site_cost) == pytest.approx(expected[0]), inputs
+
+
+@pytest.mark.parametrize("options", [
+    {"site_cost_per_day": float("nan")},
+    {"site_cost_per_day": float("inf")},
+    {"site_cost_per_day": -1},
+    {"sq_yards_per_worker": 0},
+    {"sq_yards_per_worker": float("nan")},
+    {"max_days": float("inf")},
+    {"max_days": 0}
+])
+def test_bad_options_are_rejected(options):
+    inputs = DataPreprocessor.normalize_project({"built_up_area": 1000, "floors": "G+1"})
+    with pytest.raises(ValueError):
+        CrewOptimizer().optimize(inputs, **options)
+
+
+@pytest.mark.parametrize("options", [
+    {"site_cost_per_day": "nan"},
+    {"sq_yards_per_worker": 0},
+    {"max_days": "inf"}
+])
+def test_bad_options_are_a_400(options):
+    response = main.app.test_client().post('/api/optimize', json={"built_up_area": 1000, "floors": "G+1", **options})
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+@pytest.mark.parametrize("body", [[{"built_up_area": 1000}], "G+1", 3, {"projects": "all"}])
+def test_bad_bodies_are_a_400(body):
+    response = main.app.test_client().post('/api/optimize', json=body)
+    assert response.status_code == 400
+    assert "error" in response.get_json()
@@ -0,0 +1,27 @@
+import pytest
+
+from main import app
+
+
+@pytest.mark.parametrize("body", [
+    {"built_up_area": None},
+    {"built_up_area": [1]},
+    {"built_up_area": 1000, "daily_wage_per_worker": {"a": 1}},
+    [1]
+])
+def test_bad_fields_are_a_json_400(body):
+    response = app.test_client().post('/api/plan-sessions', json=body)
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+def test_bad_update_leaves_the_session_usable():
+    client = app.test_client()
+    created = client.post('/api/plan-sessions', json={"built_up_area": 1000, "floors": "G+1", "blueprint_mode": "url"})
+    assert created.status_code == 201
+    url = f"/api/plan-sessions/{created.get_json()['session_id']}"
+
+    assert client.patch(url, json={"built_up_area": None}).status_code == 400
+    updated = client.patch(url, json={"daily_wage_per_worker": 700})
+    assert updated.status_code == 200
+    assert "costs" in updated.get_json()["changed"]
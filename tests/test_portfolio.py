@@ -0,0 +1,64 @@
+import pytest
+
+import main
+from portfolio import BULK_DISCOUNT_TIERS
+
+MAX_DISCOUNT = max(rate for tiers in BULK_DISCOUNT_TIERS.values() for _, rate in tiers)
+
+
+@pytest.fixture
+def client():
+    return main.app.test_client()
+
+
+def estimate(client, buildings):
+    response = client.post('/api/portfolio', json={"buildings": buildings, "schedule": False})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+@pytest.mark.parametrize("buildings", [
+    [{"built_up_area": 1000, "floors": "G+2", "count": 2000}],
+    [{"built_up_area": 200, "floors": "G+0", "count": 3}, {"built_up_area": 5000, "floors": "G+10", "count": 40}],
+    [{"built_up_area": 1000, "floors": "G+2", "cost_per_sq_yard": 100, "count": 500}]
+])
+def test_bulk_discount_stays_within_the_material_cost(client, buildings):
+    data = estimate(client, buildings)
+    totals = data["totals"]
+    material_cost = totals["costs"]["material_cost"]
+    assert 0 <= totals["bulk_discount"] <= material_cost * MAX_DISCOUNT + 0.01
+    assert totals["total_after_discounts"] == pytest.approx(
+        totals["costs"]["total_project_cost"] - totals["bulk_discount"], abs=0.01
+    )
+    lines = data["procurement"]["materials"].values()
+    assert sum(line["budget_share"] for line in lines) == pytest.approx(material_cost, abs=0.05)
+    for line in lines:
+        assert line["discount"] == pytest.approx(line["budget_share"] * line["discount_rate"], abs=0.01)
+
+
+def test_identical_buildings_share_one_type(client):
+    single = estimate(client, [{"built_up_area": 800, "floors": "G+1"}])
+    data = estimate(client, [{"built_up_area": 800, "floors": "G+1"}] * 3 + [{"built_up_area": 800, "floors": "G+1", "count": 2}])
+    assert data["building_count"] == 5
+    assert data["type_count"] == 1
+    assert data["totals"]["costs"]["total_project_cost"] == pytest.approx(
+        5 * single["totals"]["costs"]["total_project_cost"], abs=0.05
+    )
+
+
+def test_deployment_staggers_buildings_on_a_shared_crew(client):
+    response = client.post('/api/portfolio', json={
+        "buildings": [{"built_up_area": 500, "floors": "G+1", "count": 3}], "teams": 1
+    })
+    data = response.get_json()
+    starts = sorted(building["start_day"] for building in data["buildings"])
+    assert starts[0] == 0
+    assert starts[-1] > 0
+    assert data["deployment"]["makespan_days"] >= max(building["finish_day"] for building in data["buildings"])
+
+
+@pytest.mark.parametrize("body", [[{"built_up_area": 500}], "G+1", 2, {"buildings": []}, {"buildings": {"built_up_area": 500}}])
+def test_bad_bodies_are_a_400(client, body):
+    response = client.post('/api/portfolio', json=body)
+    assert response.status_code == 400
+    assert "error" in response.get_json()
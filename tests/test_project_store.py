@@ -0,0 +1,61 @@
+import base64
+import json
+
+import pytest
+
+from project_store import ProjectStore
+from result_cache import ResultCache
+from utils import generate_project_id, get_current_timestamp
+
+
+def response(area):
+    return {
+        "status": "success",
+        "project_id": generate_project_id(),
+        "timestamp": get_current_timestamp(),
+        "costs": {"total_project_cost": area * 10.0},
+        "timeline": {"duration_days": 100}
+    }
+
+
+def inputs(area):
+    return {"area": area, "floors": "G+1", "daily_wage": 500.0, "cost_per_sq_yard": 1500.0, "user_days": None}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ProjectStore(str(tmp_path / "projects.db"))
+
+
+def cursor_of(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode()
+
+
+@pytest.mark.parametrize("value", [[{"a": 1}, "x"], [1, 2], [[1], "x"], [True, "x"], "x", [1, "x", 3]])
+def test_malformed_cursors_are_rejected(store, value):
+    with pytest.raises(ValueError):
+        store.list(cursor=cursor_of(value))
+
+
+def test_rows_created_in_one_second_list_in_creation_order(store):
+    ids = [store.save(inputs(1000), response(1000)) for _ in range(20)]
+    rows, _ = store.list(limit=50, descending=False)
+    assert [row["id"] for row in rows] == ids
+
+
+def test_calculate_stores_links_and_skips_cache_hits(tmp_path, monkeypatch):
+    import main
+
+    store = ProjectStore(str(tmp_path / "projects.db"))
+    monkeypatch.setattr(main, "project_store", store)
+    monkeypatch.setattr(main, "result_cache", ResultCache(max_entries=16))
+    client = main.app.test_client()
+    body = {"built_up_area": 1234, "floors": "G+2"}
+
+    first = client.post('/api/calculate', json=body).get_json()
+    client.post('/api/calculate', json=body)
+    assert store.count() == 1
+
+    stored = json.loads(store.get_raw(first["project_id"]))
+    assert first["blueprints"][0]["image_url"].startswith("data:")
+    assert all(b["image_url"].startswith("/api/blueprint.svg?") for b in stored["blueprints"])
@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+import main
+import rate_history
+from config import Config
+from rate_history import RateHistory, synthesize
+
+PROJECT = {"built_up_area": 1000, "floors": "G+1", "region": "region-000", "start_date": "2022-03-01"}
+
+
+@pytest.fixture
+def history(tmp_path, monkeypatch):
+    path = str(tmp_path / "rates.bin")
+    synthesize(path, regions=2, years=1, start_date="2022-01-01")
+    monkeypatch.setattr(Config, 'RATE_HISTORY_PATH', path)
+    monkeypatch.setattr(rate_history, '_shared_history', None)
+    yield RateHistory(path)
+    rate_history._shared_history = None
+
+
+def reprice(body):
+    return main.app.test_client().post('/api/reprice', data=json.dumps(body), content_type='application/json')
+
+
+def test_reprice_prices_every_phase(history):
+    response = reprice({**PROJECT, "construction_days": 90})
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["duration_days"] == 90
+    assert len(data["phase_rates"]) == len(rate_history.PHASE_NAMES)
+
+
+@pytest.mark.parametrize("changes", [
+    {"construction_days": -30},
+    {"construction_days": 0},
+    {"daily_wage_per_worker": float("nan")},
+    {"cost_per_sq_yard": float("inf")},
+    {"start_date": "2021-12-31"},
+    {"start_date": "2023-06-01"}
+])
+def test_bad_projects_are_rejected(history, changes):
+    response = reprice({**PROJECT, **changes})
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+def test_bad_project_in_a_batch_is_named(history):
+    response = reprice({"projects": [PROJECT, {**PROJECT, "construction_days": -5}]})
+    assert response.status_code == 400
+    assert response.get_json()["error"].startswith("Project 1:")
+
+
+@pytest.mark.parametrize("start_day, duration", [(0, -10), (0, 0), (-1, 30), (365, 30)])
+def test_phase_rates_never_wraps_around(history, start_day, duration):
+    with pytest.raises(ValueError):
+        history.phase_rates([start_day], [duration], [0])
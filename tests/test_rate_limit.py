@@ -0,0 +1,54 @@
+import main
+from config import Config
+from main import _client_id, app
+from resilience import RateLimiter
+
+
+def client_id(remote_addr, headers=None):
+    with app.test_request_context('/api/calculate', method='POST', headers=headers or {},
+                                  environ_base={'REMOTE_ADDR': remote_addr}):
+        return _client_id()
+
+
+def test_client_header_is_ignored_from_untrusted_callers(monkeypatch):
+    monkeypatch.setattr(Config, 'RATE_LIMIT_TRUSTED_PROXIES', frozenset())
+    assert client_id('203.0.113.7', {'X-Forwarded-For': '198.51.100.1'}) == '203.0.113.7'
+    assert client_id('203.0.113.7', {'X-Client-Id': 'someone-else'}) == '203.0.113.7'
+
+
+def test_trusted_proxy_reports_the_client(monkeypatch):
+    monkeypatch.setattr(Config, 'RATE_LIMIT_TRUSTED_PROXIES', frozenset({'10.0.0.2'}))
+    # The client-supplied first hop is not trusted, only the one the proxy appended
+    assert client_id('10.0.0.2', {'X-Forwarded-For': 'spoofed, 198.51.100.1'}) == '198.51.100.1'
+    assert client_id('10.0.0.2') == '10.0.0.2'
+
+
+def test_changing_headers_does_not_reset_the_bucket(monkeypatch):
+    monkeypatch.setattr(Config, 'RATE_LIMIT_TRUSTED_PROXIES', frozenset())
+    limiter = RateLimiter(rate=0.001, burst=3)
+    allowed = [
+        limiter.acquire(client_id('203.0.113.7', {'X-Forwarded-For': f'10.1.0.{i}', 'X-Client-Id': str(i)}))[0]
+        for i in range(5)
+    ]
+    assert allowed == [True, True, True, False, False]
+
+
+def test_analysis_stream_is_rate_limited(monkeypatch):
+    monkeypatch.setattr(main, 'rate_limiter', RateLimiter(rate=0.001, burst=1))
+    client = app.test_client()
+    assert client.get('/api/ai-analysis/stream', query_string={"daily_wage_per_worker": "lots"}).status_code == 400
+    response = client.get('/api/ai-analysis/stream', query_string={"built_up_area": 1000, "floors": "G+1"})
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+
+
+def test_deferred_analysis_takes_its_own_token(monkeypatch):
+    monkeypatch.setattr(main, 'rate_limiter', RateLimiter(rate=0.001, burst=1))
+    submitted = []
+    monkeypatch.setattr(main.AIPlanner, 'submit_analysis', lambda project: submitted.append(project))
+    response = app.test_client().post('/api/calculate', json={
+        "built_up_area": 1000, "floors": "G+1", "ai_mode": "deferred"
+    })
+    assert response.status_code == 200
+    assert response.get_json()["ai_analysis"]["status"] == "rate_limited"
+    assert submitted == []
@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+import main
+import rate_table
+from dependencies import ConstructionCalculator
+from preprocessing import DataPreprocessor
+from rate_table import RATE_FIELDS, RateTable
+from resource_service import ResourceService
+from schedule_service import ScheduleService
+
+
+@pytest.fixture
+def restore_table():
+    original = rate_table.current()
+    yield original
+    rate_table.set_current(original)
+
+
+def test_table_is_immutable():
+    table = RateTable.from_config()
+    with pytest.raises(AttributeError):
+        table.steel_per_ton = 1
+    with pytest.raises(ValueError):
+        table.as_array()[0] = 1
+
+
+@pytest.mark.parametrize("change", [
+    {"gold_per_ton": 1},
+    {"steel_per_ton": "65000"},
+    {"overhead_rate": True}
+])
+def test_bad_fields_are_rejected(change):
+    with pytest.raises(ValueError):
+        RateTable.from_config().replace(**change)
+
+
+def test_missing_fields_are_rejected():
+    values = RateTable.from_config().as_dict()
+    del values["sand_per_ton"]
+    with pytest.raises(ValueError, match="sand_per_ton"):
+        RateTable(**values)
+
+
+def test_version_follows_the_content():
+    table = RateTable.from_config()
+    assert RateTable.from_config().version == table.version
+    assert table.replace(steel_per_ton=table.steel_per_ton + 1).version != table.version
+    assert list(table.as_array()) == [float(table.as_dict()[name]) for name in RATE_FIELDS]
+
+
+@pytest.mark.parametrize("floors", ["G+2", "g + 2", "3", 3])
+def test_every_estimator_counts_floors_the_same_way(floors):
+    assert DataPreprocessor.count_floors(floors) == 3
+    assert ConstructionCalculator(100, floors).floors == 3
+    assert ResourceService().calculate_materials(100, floors) == ResourceService().calculate_materials(300, 1)
+    assert ScheduleService().generate_schedule(100, floors) == ScheduleService().generate_schedule(100, "G+2")
+
+
+def test_reload_reprices_every_estimate(tmp_path, monkeypatch, restore_table):
+    client = main.app.test_client()
+    body = {"built_up_area": 1000, "floors": "G+1", "blueprint_mode": "none"}
+    before = client.post('/api/calculate', json=body).get_json()
+
+    path = tmp_path / "rates.json"
+    path.write_text(json.dumps({
+        "plan_steel_tons_per_sq_yard": restore_table.plan_steel_tons_per_sq_yard * 2,
+        "overhead_rate": 0.2
+    }))
+    monkeypatch.setattr(main.Config, 'RATE_TABLE_PATH', str(path))
+    reloaded = client.post('/api/rates/reload').get_json()
+    assert reloaded["rates"]["overhead_rate"] == 0.2
+    assert reloaded["rates"]["cement_per_bag"] == restore_table.cement_per_bag
+    assert client.get('/api/rates').get_json()["version"] == reloaded["version"] != restore_table.version
+
+    after = client.post('/api/calculate', json=body).get_json()
+    assert after["materials"]["steel_tons"] == pytest.approx(before["materials"]["steel_tons"] * 2, abs=0.1)
+    assert after["materials"]["cement_bags"] == before["materials"]["cement_bags"]
+    assert after["costs"]["overhead_cost"] > before["costs"]["overhead_cost"]
+    assert after["costs"]["labor_cost"] == before["costs"]["labor_cost"]
+
+
+def test_bad_override_file_keeps_the_current_table(tmp_path, monkeypatch, restore_table):
+    path = tmp_path / "rates.json"
+    path.write_text(json.dumps({"steel_per_ton": "cheap"}))
+    monkeypatch.setattr(main.Config, 'RATE_TABLE_PATH', str(path))
+    response = main.app.test_client().post('/api/rates/reload')
+    assert response.status_code == 400
+    assert rate_table.current() is restore_table
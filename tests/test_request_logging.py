@@ -0,0 +1,91 @@
+import json
+import logging
+import queue
+import threading
+
+import pytest
+
+import main
+import request_logging
+from config import Config
+from request_logging import JSONFormatter, Trace, _DroppingQueueHandler, _TraceFilter
+
+
+@pytest.fixture
+def capture():
+    """Logs through a dropping queue handler and returns the queued records as JSON."""
+    handler = _DroppingQueueHandler(queue.Queue(4))
+    handler.addFilter(_TraceFilter())
+    logger = logging.getLogger("test.request_logging")
+    logger.addHandler(handler)
+    logger.propagate = False
+
+    def records():
+        formatter = JSONFormatter()
+        entries = []
+        while not handler.queue.empty():
+            entries.append(json.loads(formatter.format(handler.queue.get_nowait())))
+        return entries
+
+    yield logger, handler, records
+    logger.removeHandler(handler)
+    logger.propagate = True
+
+
+def test_exception_is_a_field_not_part_of_the_message(capture):
+    logger, _, records = capture
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        logger.exception("Error occurred: %s", "division")
+    [entry] = records()
+    assert entry["message"] == "Error occurred: division"
+    assert entry["level"] == "ERROR"
+    assert "ZeroDivisionError" in entry["exception"]
+    assert "Traceback" not in entry["message"]
+
+
+def test_records_carry_the_current_trace_id(capture):
+    logger, _, records = capture
+    token = request_logging._current_trace.set(Trace("abc123", sampled=False))
+    try:
+        logger.info("inside", extra={"fields": {"stage": "cost"}})
+    finally:
+        request_logging._current_trace.reset(token)
+    logger.info("outside")
+    inside, outside = records()
+    assert inside["trace_id"] == "abc123"
+    assert inside["stage"] == "cost"
+    assert outside["trace_id"] is None
+
+
+def test_full_queue_drops_instead_of_blocking(capture):
+    logger, handler, records = capture
+    for i in range(6):
+        logger.warning("record %d", i)
+    assert handler.dropped == 2
+    assert [entry["message"] for entry in records()] == [f"record {i}" for i in range(4)]
+
+
+def test_request_id_is_echoed():
+    response = main.app.test_client().get('/api/ai-analysis/missing', headers={Config.REQUEST_ID_HEADER: "req-42"})
+    assert response.headers[Config.REQUEST_ID_HEADER] == "req-42"
+    generated = main.app.test_client().get('/api/ai-analysis/missing')
+    assert len(generated.headers[Config.REQUEST_ID_HEADER]) == 16
+
+
+def test_slow_requests_are_counted_across_threads(monkeypatch):
+    monkeypatch.setattr(Config, 'LOG_SLOW_REQUEST_MS', 0)
+    before = request_logging.stats()["slow_requests"]
+
+    def hit():
+        client = main.app.test_client()
+        for _ in range(10):
+            client.get('/api/ai-analysis/missing')
+
+    threads = [threading.Thread(target=hit) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert request_logging.stats()["slow_requests"] - before == 40
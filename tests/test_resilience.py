@@ -0,0 +1,52 @@
+import time
+
+import pytest
+
+from fake_ollama import FakeOllamaServer
+from llm_client import LLMClient, LLMError, LLMUnavailable
+from resilience import CLOSED, OPEN
+
+
+def failing_calls(client, timeout):
+    for i in range(client.breaker.failure_threshold):
+        with pytest.raises(LLMError):
+            client.generate(f"prompt {i}", timeout=timeout)
+
+
+def test_hung_model_opens_the_breaker():
+    with FakeOllamaServer(timeout_rate=1.0, hang=2.0) as server:
+        client = LLMClient(url=server.url)
+        failing_calls(client, timeout=0.1)
+        assert client.breaker.state == OPEN
+
+        started = time.perf_counter()
+        with pytest.raises(LLMUnavailable):
+            client.generate("one more", timeout=0.1)
+        assert time.perf_counter() - started < 0.05
+        client.close()
+
+
+def test_slow_latency_profile_counts_as_failures():
+    with FakeOllamaServer(latency="uniform:0.3,0.5", seed=1) as server:
+        client = LLMClient(url=server.url)
+        failing_calls(client, timeout=0.1)
+        assert client.breaker.state == OPEN
+        client.close()
+
+
+def test_server_errors_open_the_breaker():
+    with FakeOllamaServer(error_rate=1.0) as server:
+        client = LLMClient(url=server.url)
+        failing_calls(client, timeout=2)
+        assert client.breaker.state == OPEN
+        assert server.stats()["errors_injected"] == client.breaker.failure_threshold
+        client.close()
+
+
+def test_latency_within_the_timeout_keeps_the_breaker_closed():
+    with FakeOllamaServer(latency="lognormal:0.01,0.3", seed=2) as server:
+        client = LLMClient(url=server.url)
+        for i in range(5):
+            assert client.generate(f"prompt {i}", timeout=2).startswith("Fake analysis")
+        assert client.breaker.state == CLOSED
+        client.close()
@@ -0,0 +1,76 @@
+import pytest
+
+import main
+import result_cache
+from preprocessing import DataPreprocessor
+from result_cache import ResultCache
+
+
+def key(**raw):
+    return ResultCache.make_key(DataPreprocessor.normalize_project({"built_up_area": 1000, **raw}), "inline", 1)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(result_cache.time, 'time', lambda: now[0])
+    return now
+
+
+def test_key_is_taken_after_normalization():
+    assert key(floors="g + 1") == key(floors="G+1") == key(floors="2")
+    assert key(floors="G+1") != key(floors="G+2")
+    assert key(floors="G+1", daily_wage_per_worker=800) != key(floors="G+1")
+    assert ResultCache.make_key(DataPreprocessor.normalize_project({"built_up_area": 1000}), "url", 1) != key()
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResultCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    stats = cache.stats()
+    assert (stats["entries"], stats["evictions"], stats["hits"], stats["misses"]) == (2, 1, 3, 1)
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = ResultCache(max_entries=4, ttl_seconds=60)
+    cache.put("a", 1)
+    clock[0] += 60
+    assert cache.get("a") == 1
+    clock[0] += 1
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_disk_store_survives_a_restart(tmp_path, clock):
+    ResultCache(max_entries=4, ttl_seconds=60, disk_path=str(tmp_path)).put("a", {"plan": [1, 2]})
+    restarted = ResultCache(max_entries=4, ttl_seconds=60, disk_path=str(tmp_path))
+    assert restarted.get("a") == {"plan": [1, 2]}
+    assert restarted.stats()["disk_hits"] == 1
+
+    clock[0] += 61
+    expired = ResultCache(max_entries=4, ttl_seconds=60, disk_path=str(tmp_path))
+    assert expired.get("a") is None
+    assert not list(tmp_path.iterdir())
+
+
+def test_zero_size_disables_the_cache():
+    cache = ResultCache(max_entries=0)
+    cache.put("a", 1)
+    assert cache.get("a") is None
+    assert cache.stats()["misses"] == 0
+
+
+def test_repeated_request_is_served_from_the_cache(monkeypatch):
+    monkeypatch.setattr(main, 'result_cache', ResultCache(max_entries=8))
+    client = main.app.test_client()
+    body = {"built_up_area": 900, "floors": "G+1", "blueprint_mode": "none"}
+    first = client.post('/api/calculate', json=body).get_json()
+    second = client.post('/api/calculate', json={**body, "floors": "2"}).get_json()
+    assert first["costs"] == second["costs"]
+    assert first["project_id"] != second["project_id"]
+    assert client.get('/health').get_json()["cache"]["hits"] == 1
@@ -0,0 +1,60 @@
+import pytest
+
+import main
+from preprocessing import DataPreprocessor
+
+PROJECTS = [
+    {"built_up_area": 200, "floors": "G+0"},
+    {"built_up_area": 1000, "floors": "G+2", "daily_wage_per_worker": 800},
+    {"built_up_area": 6000, "floors": "G+9", "cost_per_sq_yard": 2600, "construction_days": 400}
+]
+
+
+def simulate(project, **options):
+    return main.risk_service.simulate(DataPreprocessor.normalize_project(project), **options)
+
+
+@pytest.mark.parametrize("project", PROJECTS)
+@pytest.mark.parametrize("distributions", [None, {"steel_rate": [0.5, 0.6, 3.0], "productivity": [0.99, 1.0, 1.01]}])
+def test_percentiles_are_ordered(project, distributions):
+    result = simulate(project, draws=5000, seed=3, distributions=distributions)
+    percentiles = [result["percentiles"][key] for key in ("p50", "p80", "p95")]
+    assert percentiles == sorted(percentiles)
+    for component in result["components"].values():
+        assert component["p50"] <= component["p80"] <= component["p95"]
+    assert sum(result["histogram"]["counts"]) == 5000
+    assert result["histogram"]["bin_edges"][0] <= percentiles[0] <= result["histogram"]["bin_edges"][-1]
+
+
+def test_fixed_seed_is_deterministic():
+    first = simulate(PROJECTS[1], draws=4000, seed=11)
+    assert simulate(PROJECTS[1], draws=4000, seed=11) == first
+    assert simulate(PROJECTS[1], draws=4000, seed=12)["percentiles"] != first["percentiles"]
+
+
+def test_project_result_is_the_same_alone_or_in_a_batch():
+    normalized = [DataPreprocessor.normalize_project(p) for p in PROJECTS]
+    batch = main.risk_service.simulate_many(normalized, draws=4000, seed=5)
+    assert batch[2] == main.risk_service.simulate(normalized[2], draws=4000, seed=5)
+
+
+@pytest.mark.parametrize("distributions", [
+    ["steel_rate", [0.9, 1.0, 1.1]],
+    "steel_rate",
+    {"steel_rate": "123"},
+    {"steel_rate": [0.9, 1.0]},
+    {"steel_rate": [1.1, 1.0, 0.9]},
+    {"steel_rate": [0.9, 1.0, "inf"]},
+    {"gold_rate": [0.9, 1.0, 1.1]}
+])
+def test_bad_distributions_are_a_400(distributions):
+    response = main.app.test_client().post('/api/risk', json={**PROJECTS[0], "distributions": distributions})
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+@pytest.mark.parametrize("body", [PROJECTS, "G+1", 5, {"projects": "all"}])
+def test_bad_bodies_are_a_400(body):
+    response = main.app.test_client().post('/api/risk', json=body)
+    assert response.status_code == 400
+    assert "error" in response.get_json()
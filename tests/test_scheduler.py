@@ -0,0 +1,86 @@
+import pytest
+
+import main
+from config import Config
+from scheduler import BUILDING_ACTIVITIES, FLOOR_ACTIVITIES, ScheduleEngine, minimum_duration
+
+
+@pytest.fixture
+def engine():
+    return ScheduleEngine()
+
+
+def test_critical_path_runs_from_first_to_last_activity(engine):
+    network, result = engine.schedule([{"built_up_area": 600, "floors": "G+2"}])
+    assert len(network) == BUILDING_ACTIVITIES + 3 * FLOOR_ACTIVITIES
+    summary = engine.to_response(network, result)["projects"][0]
+    critical = summary["critical_path"]
+    assert critical[0] == "Site Cleaning"
+    assert critical[-1] == "Final Cleanup"
+
+    # Every critical activity is chained to the next with no slack
+    early = result["early_start"]
+    last = max(range(len(network)), key=lambda i: early[i] + network.duration[i])
+    assert early[last] + network.duration[last] == summary["critical_path_days"]
+    assert all(result["total_float"][i] >= 0 for i in range(len(network)))
+
+
+def test_leveling_respects_precedence_and_crew_capacity(engine):
+    projects = [{"built_up_area": 400, "floors": "G+1"}] * 3
+    network, result = engine.schedule(projects, crews={"masons": 4, "helpers": 4})
+    start = result["start"]
+    for i, successors in enumerate(network.successors):
+        for j, lag in successors:
+            assert start[j] >= start[i] + network.duration[i] + lag
+
+    makespan = max(s + d for s, d in zip(start, network.duration))
+    for rid, capacity in enumerate(network.capacity):
+        for day in range(makespan):
+            in_use = sum(
+                network.crew[i] for i in range(len(network))
+                if network.resource[i] == rid and start[i] <= day < start[i] + network.duration[i]
+            )
+            assert in_use <= capacity
+    assert max(result["project_end"].values()) <= makespan
+
+
+def test_shared_crew_delays_a_portfolio(engine):
+    one = engine.to_response(*engine.schedule([{"built_up_area": 400, "floors": "G+1"}]), include_activities=False)
+    many = engine.to_response(
+        *engine.schedule([{"built_up_area": 400, "floors": "G+1"}] * 4, crews={"masons": 2}), include_activities=False
+    )
+    assert many["makespan_days"] > one["makespan_days"]
+    assert any(project["delay_days"] > 0 for project in many["projects"])
+
+
+def test_minimum_duration_is_one_day_per_activity_plus_curing():
+    assert minimum_duration(2) < minimum_duration(3)
+
+
+def test_activity_cap(engine, monkeypatch):
+    monkeypatch.setattr(Config, 'MAX_SCHEDULE_ACTIVITIES', BUILDING_ACTIVITIES + 4 * FLOOR_ACTIVITIES)
+    engine.build([{"built_up_area": 100, "floors": "G+3"}])
+    with pytest.raises(ValueError, match="above the limit"):
+        engine.build([{"built_up_area": 100, "floors": "G+4"}])
+
+
+@pytest.mark.parametrize("body", [
+    {"built_up_area": 1e308, "floors": "G+1", "crews": {"masons": 0}},
+    {"built_up_area": "inf", "floors": "G+1"},
+    {"built_up_area": 500, "floors": "G+1", "construction_days": -10},
+    {"built_up_area": 500, "floors": "G+1", "workers": "nan"},
+    {"built_up_area": 500, "floors": "G+1", "crews": {"masons": 1e30}},
+    {"built_up_area": 500, "floors": "G+1", "crews": {"masons": "many"}},
+    {"built_up_area": 500, "floors": "G+1", "crews": ["masons"]},
+    {"projects": [{"built_up_area": 500}, "not a project"]},
+    ["not", "an", "object"]
+])
+def test_bad_input_is_a_400(body):
+    response = main.app.test_client().post('/api/schedule', json=body)
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+def test_huge_area_is_clamped_not_an_error():
+    response = main.app.test_client().post('/api/schedule', json={"built_up_area": 1e308, "floors": "G+0", "summary_only": True})
+    assert response.status_code == 200
@@ -0,0 +1,70 @@
+import os
+import runpy
+import signal
+import subprocess
+import sys
+
+import pytest
+
+import llm_client
+from fake_ollama import FakeOllamaServer
+from llm_client import LLMClient
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(code, **env):
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env={**os.environ, **env},
+        capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stdout.split()
+
+
+def test_importing_the_app_does_not_import_requests():
+    assert run_python("import sys, main; print('requests' in sys.modules)") == ["False"]
+
+
+def test_wsgi_entry_point_is_warm_and_serves():
+    code = (
+        "import sys, wsgi\n"
+        "print('requests' in sys.modules)\n"
+        "print(wsgi.application.test_client().get('/health').status_code)\n"
+    )
+    assert run_python(code) == ["True", "200"]
+
+
+def test_gunicorn_config_preloads_and_reads_the_environment(monkeypatch):
+    monkeypatch.setenv('WEB_CONCURRENCY', '3')
+    monkeypatch.setenv('BIND', '127.0.0.1:8123')
+    settings = runpy.run_path(os.path.join(ROOT, "gunicorn.conf.py"))
+    assert settings["preload_app"] is True
+    assert (settings["workers"], settings["bind"], settings["worker_class"]) == (3, "127.0.0.1:8123", "gthread")
+    assert settings["graceful_timeout"] > 0
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork()")
+def test_forked_worker_gets_a_working_llm_client(monkeypatch):
+    with FakeOllamaServer(response_text="ok") as server:
+        client = LLMClient(url=server.url)
+        monkeypatch.setattr(llm_client, '_shared_client', client)
+        assert client.generate("parent", timeout=5) == "ok"
+        parent_session = client._session
+
+        # Fork while the client lock is held, as a busy master thread might
+        with client._lock:
+            pid = os.fork()
+        if pid == 0:
+            signal.alarm(10)
+            try:
+                shared = llm_client.get_llm_client()
+                ok = shared._session is None and shared.generate("child", timeout=5) == "ok"
+            except BaseException:
+                ok = False
+            os._exit(0 if ok else 1)
+
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+        assert client._session is parent_session
+        client.close()
@@ -0,0 +1,53 @@
+import threading
+import time
+
+from single_flight import SingleFlight
+
+
+def test_followers_share_the_leaders_result():
+    flight = SingleFlight("test", wait_timeout=5)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "plan"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", slow)))
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=lambda: results.append(flight.do("k", slow)))
+    follower.start()
+    deadline = time.monotonic() + 5
+    while flight.stats()["coalesced"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert flight.stats()["coalesced"] == 1
+    release.set()
+    leader.join()
+    follower.join()
+    assert sorted(results) == [("plan", False), ("plan", True)]
+    assert len(calls) == 1
+
+
+def test_follower_stops_waiting_on_a_stuck_leader():
+    flight = SingleFlight("test", wait_timeout=0.05)
+    started, release = threading.Event(), threading.Event()
+
+    def stuck():
+        started.set()
+        release.wait(5)
+        return "late"
+
+    leader = threading.Thread(target=flight.do, args=("k", stuck))
+    leader.start()
+    started.wait(5)
+    try:
+        assert flight.do("k", lambda: "fresh") == ("fresh", False)
+        assert flight.stats()["wait_timeouts"] == 1
+    finally:
+        release.set()
+        leader.join()
+
@@ -0,0 +1,47 @@
+import numpy as np
+
+import sweep
+from config import Config
+from sweep import ScenarioSweep
+
+GRID = {
+    "built_up_area": list(range(100, 1100, 50)),
+    "floors": ["G+0", "G+2"],
+    "daily_wage": [400, 600],
+    "custom_days": [None, 120]
+}
+
+
+def test_pool_is_reused_and_matches_in_process_results():
+    single = ScenarioSweep(GRID).run(workers=1)
+    first = ScenarioSweep(GRID).run(workers=2, chunk_size=7, start_method="spawn")
+    pool = sweep._pool
+    second = ScenarioSweep(GRID).run(workers=2, chunk_size=11, start_method="spawn")
+    assert sweep._pool is pool
+    for result in (first, second):
+        for name, values in single["outputs"].items():
+            assert np.array_equal(result["outputs"][name], values)
+
+
+def test_api_returns_the_summary_by_default(monkeypatch):
+    from main import app
+
+    client = app.test_client()
+    summary = client.post('/api/sweep', json={"grid": GRID, "workers": 1}).get_json()
+    assert "outputs" not in summary and "cheapest" in summary
+
+    full = client.post('/api/sweep', json={"grid": GRID, "workers": 1, "summary_only": False}).get_json()
+    assert len(full["outputs"]["total_cost"]) == full["size"]
+
+    monkeypatch.setattr(Config, "MAX_SWEEP_OUTPUT_SIZE", 10)
+    assert client.post('/api/sweep', json={"grid": GRID, "summary_only": False}).status_code == 400
+
+
+def test_non_object_bodies_are_a_400():
+    from main import app
+
+    client = app.test_client()
+    for body in ([{"grid": GRID}], "grid", 7):
+        response = client.post('/api/sweep', json=body)
+        assert response.status_code == 400
+        assert "error" in response.get_json()
@@ -0,0 +1,12 @@
+import datetime
+import uuid
+
+
+def generate_project_id():
+    """Short unique project reference, e.g. 'CONST-A1B2C3D4'."""
+    return f"CONST-{uuid.uuid4().hex[:8].upper()}"
+
+
+def get_current_timestamp():
+    """Current local time in ISO 8601 format."""
+    return datetime.datetime.now().isoformat(timespec='seconds')
@@ -0,0 +1,67 @@
+"""
+Production entry point:
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+Importing this module builds the app and its services and runs warm_up(), so
+with preload_app the master does all of that once and every forked worker
+starts serving from shared copy-on-write memory.
+"""
+import importlib
+import logging
+
+import metrics
+from config import Config
+from dependencies import AIPlanner
+from estimate_grid import get_estimate_grid
+from insight_cache import get_insight_cache, load_warm_up_file
+from main import app, build_plan, estimation_engine
+from preprocessing import DataPreprocessor
+
+application = app
+
+# Representative requests run once before fork to fill the import, routing and
+# render caches the workers would otherwise fill on their first requests
+WARM_UP_PROJECTS = [
+    {"built_up_area": 100, "floors": "G+0"},
+    {"built_up_area": 1000, "floors": "G+2"}
+]
+
+
+def warm_up():
+    # 1. Modules that are otherwise imported lazily on first use
+    importlib.import_module("requests")
+
+    # 2. Routing table and JSON provider
+    app.url_map.bind("localhost").match("/health")
+
+    # 3. One pass through every pipeline stage, without touching the metrics
+    enabled = metrics.registry.enabled
+    metrics.registry.enabled = False
+    try:
+        with app.app_context():
+            for raw in WARM_UP_PROJECTS:
+                inputs = DataPreprocessor.normalize_project(raw)
+                plan = build_plan(inputs)
+                app.json.dumps(plan)
+            estimation_engine.run(WARM_UP_PROJECTS)
+    finally:
+        metrics.registry.enabled = enabled
+
+    # 4. Estimate grid for /api/estimate/preview (if ESTIMATE_GRID is on), so workers share one copy
+    get_estimate_grid()
+
+    # 5. AI analyses for the configured projects; buckets already in the
+    # persisted cache file cost nothing, so only the first start is slow
+    if Config.INSIGHT_WARMUP_FILE:
+        try:
+            projects = load_warm_up_file(Config.INSIGHT_WARMUP_FILE)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logging.getLogger(__name__).warning("Insight warm-up skipped (%s)", e)
+        else:
+            get_insight_cache().warm_up(projects, AIPlanner.generate_analysis)
+            # Written before the workers fork, so none of them starts from a stale file
+            get_insight_cache().flush()
+
+
+warm_up()